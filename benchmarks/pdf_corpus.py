@@ -0,0 +1,269 @@
+"""
+Speed, memory and correctness of parsing the seating arrangement pdfs and the holiday calendar
+
+Runs each table extraction engine of script.iter_table_rows over the real pdfs and over synthetic
+pdfs made by repeating the pages of each seating arrangement, and records for each:
+- Latency of each page (median and 95th percentile, each page read on its own)
+- Rows per second
+- Peak memory (growth of the peak RSS, so memory used by pdfium is included)
+- Cache modes: the first room number lookup (cold, parses the pdf) and later lookups (warm, served
+  from the prefetcher's cache of the compiled seating arrangement)
+
+The results are checked against the golden outputs in benchmarks/golden, and the script exits
+with status 1 if any differ. Each measurement runs in a fresh process, so caches and peak memory
+don't carry over between them
+
+Usage (from the repository root):
+    python benchmarks/pdf_corpus.py [pdf_path ...] [--engines words tables] [--scales 1 4]
+                                    [--json results.json] [--update-golden]
+"""
+
+import argparse
+import glob
+import json
+import multiprocessing
+import os
+import re
+import resource
+import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pypdfium2
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import script  # noqa: E402
+
+GOLDEN_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "golden")
+REFERENCE_ENGINE = "tables"  # Engine the golden outputs are made with
+SAMPLE_STUDENTS = 10  # Students per seating arrangement whose room numbers are checked
+COURSE_ID = re.compile(r"[A-Z]+ [A-Z]\d{3}")
+
+
+def is_calendar(path):
+    """Whether the pdf is the holiday calendar rather than a seating arrangement"""
+    return os.path.basename(path) == os.path.basename(script.HOLIDAY_LIST_PATH)
+
+
+def golden_path(path):
+    return os.path.join(
+        GOLDEN_DIR, os.path.splitext(os.path.basename(path))[0] + ".json"
+    )
+
+
+def month_days(holidays):
+    """Drops the year of each holiday, as get_holidays picks it from today's date"""
+    return [i[5:] for i in holidays]
+
+
+def make_golden(path):
+    """
+    Parses a pdf with the reference engine
+
+    Returns:
+        dict: Holidays (MM-DD) of the calendar, or the compiled seating arrangement
+            and the room numbers of a sample of students
+    """
+    script.PDF_ENGINE = REFERENCE_ENGINE
+    if is_calendar(path):
+        return {"holidays": month_days(script.get_holidays(path))}
+    index = script.compile_seating_index(path)
+    students = []
+    step = max(1, len(index) // SAMPLE_STUDENTS)
+    for cell, _, id_range in index[::step][:SAMPLE_STUDENTS]:
+        student_ID = id_range.split("to")[0].strip()
+        courses = COURSE_ID.findall(cell)
+        students.append(
+            {
+                "student_ID": student_ID,
+                "courses": courses,
+                "rooms": script.get_room_numbers(path, courses, student_ID),
+            }
+        )
+    return {"index": [list(i) for i in index], "students": students}
+
+
+def write_golden(path, golden):
+    """Writes a golden output with one row per line, so that changes diff readably"""
+    with open(path, "w") as f:
+        f.write("{\n")
+        for n, (key, value) in enumerate(golden.items()):
+            lines = ",\n".join(f"  {json.dumps(i)}" for i in value)
+            f.write(
+                f' "{key}": [\n{lines}\n ]' + (",\n" if n < len(golden) - 1 else "\n")
+            )
+        f.write("}\n")
+
+
+def scaled_pdf(path, scale, directory):
+    """Makes a pdf with the pages of the given pdf repeated scale times"""
+    source = pypdfium2.PdfDocument(path)
+    pdf = pypdfium2.PdfDocument.new()
+    for _ in range(scale):
+        pdf.import_pages(source)
+    name = f"{os.path.splitext(os.path.basename(path))[0]}_x{scale}.pdf"
+    out = os.path.join(directory, name)
+    pdf.save(out)
+    pdf.close()
+    source.close()
+    return out
+
+
+def peak_rss():
+    """Peak resident memory of this process in MiB"""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 2**10
+
+
+def measure(path, engine, golden, scale):
+    """
+    Parses a pdf with an engine and checks the result, run in a fresh process
+
+    Returns:
+        dict: Measurements
+    """
+    script.PDF_ENGINE = engine
+    pages = len(pypdfium2.PdfDocument(path))
+    base_rss = peak_rss()
+
+    latencies = []
+    rows = 0
+    for number in range(1, pages + 1):
+        begin = time.perf_counter()
+        rows += sum(1 for _ in script.iter_table_rows(path, [number]))
+        latencies.append(time.perf_counter() - begin)
+    memory = peak_rss() - base_rss
+
+    if is_calendar(path):
+        script.HOLIDAY_LIST_PATH = path
+        begin = time.perf_counter()
+        holidays = script.get_holiday_list()
+        cold = time.perf_counter() - begin
+        begin = time.perf_counter()
+        script.get_holiday_list()
+        warm = time.perf_counter() - begin
+        errors = []
+        if month_days(holidays) != golden["holidays"]:
+            errors.append(f"holidays {month_days(holidays)} != {golden['holidays']}")
+    else:
+        students = golden["students"]
+        begin = time.perf_counter()
+        results = [
+            script.get_room_numbers(
+                path, students[0]["courses"], students[0]["student_ID"]
+            )
+        ]
+        cold = time.perf_counter() - begin
+        begin = time.perf_counter()
+        for i in students[1:]:
+            results.append(script.get_room_numbers(path, i["courses"], i["student_ID"]))
+        warm = (time.perf_counter() - begin) / max(1, len(students) - 1)
+        errors = []
+        index = [list(i) for i in script.get_seating_index(path)]
+        expected = golden["index"] * scale
+        if index != expected:
+            at = next(
+                (i for i, (a, b) in enumerate(zip(index, expected)) if a != b),
+                min(len(index), len(expected)),
+            )
+            errors.append(
+                f"seating index differs at row {at} of {len(expected)}: "
+                f"{index[at] if at < len(index) else None} != "
+                f"{expected[at] if at < len(expected) else None}"
+            )
+        for i, result in zip(students, results):
+            if result != i["rooms"]:
+                errors.append(f"rooms of {i['student_ID']}: {result} != {i['rooms']}")
+
+    total = sum(latencies)
+    return {
+        "pdf": os.path.basename(path),
+        "engine": engine,
+        "pages": pages,
+        "rows": rows,
+        "page_ms_median": statistics.median(latencies) * 1000,
+        "page_ms_p95": (
+            statistics.quantiles(latencies, n=20)[-1] * 1000
+            if len(latencies) > 1
+            else latencies[0] * 1000
+        ),
+        "total_s": total,
+        "rows_per_s": rows / total if total else 0,
+        "peak_mib": memory,
+        "cold_ms": cold * 1000,
+        "warm_ms": warm * 1000,
+        "errors": errors,
+    }
+
+
+def in_fresh_process(fn, *args):
+    """Runs fn in a new process, so that it starts with empty caches and its own peak memory"""
+    with ProcessPoolExecutor(
+        max_workers=1, mp_context=multiprocessing.get_context("spawn")
+    ) as executor:
+        return executor.submit(fn, *args).result()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("paths", nargs="*")
+    parser.add_argument("--engines", nargs="+", default=["words", "tables"])
+    parser.add_argument(
+        "--scales",
+        nargs="+",
+        type=int,
+        default=[1, 4],
+        help="Times the pages of each seating arrangement are repeated",
+    )
+    parser.add_argument("--json", help="Also write the results to this file")
+    parser.add_argument(
+        "--update-golden",
+        action="store_true",
+        help=f"Rewrite the golden outputs with the {REFERENCE_ENGINE} engine",
+    )
+    args = parser.parse_args()
+    paths = args.paths or sorted(glob.glob("pdfs/*.pdf")) + [script.HOLIDAY_LIST_PATH]
+
+    if args.update_golden:
+        os.makedirs(GOLDEN_DIR, exist_ok=True)
+        for path in paths:
+            write_golden(golden_path(path), in_fresh_process(make_golden, path))
+            print(f"Golden output written: {golden_path(path)}")
+        return
+
+    print(
+        f"{'pdf':<28}{'engine':<8}{'pages':>6}{'rows':>7}{'page ms':>9}{'p95 ms':>8}"
+        f"{'rows/s':>9}{'peak MiB':>10}{'cold ms':>9}{'warm ms':>9}  golden"
+    )
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        for path in paths:
+            with open(golden_path(path), "r") as f:
+                golden = json.load(f)
+            for scale in args.scales:
+                if scale > 1 and is_calendar(path):
+                    continue
+                pdf = path if scale == 1 else scaled_pdf(path, scale, directory)
+                for engine in args.engines:
+                    result = in_fresh_process(measure, pdf, engine, golden, scale)
+                    results.append(result)
+                    print(
+                        f"{result['pdf']:<28}{engine:<8}{result['pages']:>6}{result['rows']:>7}"
+                        f"{result['page_ms_median']:>9.1f}{result['page_ms_p95']:>8.1f}"
+                        f"{result['rows_per_s']:>9.0f}{result['peak_mib']:>10.1f}"
+                        f"{result['cold_ms']:>9.0f}{result['warm_ms']:>9.2f}  "
+                        + ("ok" if not result["errors"] else "FAIL")
+                    )
+                    for i in result["errors"]:
+                        print(f"    {i}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=1)
+    if any(i["errors"] for i in results):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Peak memory of parsing the seating arrangement pdfs, for increasing page counts
+
+Compares collecting every table before processing (what the parsers used to do)
+with streaming rows one page at a time through script.iter_table_rows
+
+Usage (from the repository root):
+    python benchmarks/pdf_memory.py [pdf_path ...]
+"""
+
+import glob
+import os
+import sys
+import tracemalloc
+
+import pdfplumber
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import script  # noqa: E402
+
+
+def collect_all(filepath, pages):
+    """Reads every table of the pdf into memory before processing any row"""
+    pdf = pdfplumber.open(filepath, pages=pages)
+    tables = []
+    for i in pdf.pages:
+        tables.extend(i.extract_tables())
+    rows = sum(len(i) for i in tables)
+    pdf.close()
+    return rows
+
+
+def stream(filepath, pages):
+    """Processes rows as they are yielded, one page at a time"""
+    return sum(1 for _ in script.iter_table_rows(filepath, pages=pages))
+
+
+def peak_memory(fn, *args):
+    """
+    Runs fn and measures the peak traced memory
+
+    Returns:
+        (int, float): (Result of fn, Peak memory in MiB)
+    """
+    tracemalloc.start()
+    result = fn(*args)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, peak / 2**20
+
+
+def main(paths):
+    print(f"{'pdf':<20}{'pages':>6}{'rows':>7}{'collect MiB':>13}{'stream MiB':>12}")
+    for path in paths:
+        with pdfplumber.open(path) as pdf:
+            total = len(pdf.pages)
+        counts = sorted({min(total, n) for n in (1, 4, 8, 16, total)})
+        for n in counts:
+            pages = list(range(1, n + 1))
+            rows, collect_peak = peak_memory(collect_all, path, pages)
+            _, stream_peak = peak_memory(stream, path, pages)
+            print(
+                f"{os.path.basename(path):<20}{n:>6}{rows:>7}"
+                f"{collect_peak:>13.1f}{stream_peak:>12.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:] or sorted(glob.glob("pdfs/*.pdf")))
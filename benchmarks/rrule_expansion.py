@@ -0,0 +1,201 @@
+"""
+Cost of cancelling classes on holidays and during exams for a whole semester
+
+Compares listing the occurrences on each date through the API (what the script used to do)
+with expanding the recurrences locally and deleting the occurrences by their instance IDs,
+and the time taken to find the occurrences on those dates by expanding every series one by one
+against looking the dates up in the shared weekday spans of script.expand_weekly
+
+API calls go to a simulated service that only counts them, the wall time is estimated
+from a fixed latency per call
+
+Usage (from the repository root):
+    python benchmarks/rrule_expansion.py [classes ...]
+"""
+
+import collections
+import datetime
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import script  # noqa: E402
+
+LATENCY = 0.15  # Seconds per API call
+START_DATE = "2025-08-04"
+END_DATE = "2025-11-28"
+HOLIDAYS = ["2025-08-15", "2025-08-27", "2025-10-02", "2025-10-20", "2025-11-05"]
+EXAMS = {
+    "midsem_start_date": "2025-10-06",
+    "midsem_end_date": "2025-10-11",
+    "compre_start_date": "2025-11-24",
+    "compre_end_date": "2025-11-28",
+}
+
+
+class Request:
+    def __init__(self, service, method, result=None):
+        self.service, self.method, self.result = service, method, result
+
+    def execute(self):
+        self.service.calls[self.method] += 1
+        return self.result
+
+
+class CountingService:
+    """Answers the calls the script makes for a fixed set of master events, counting them"""
+
+    def __init__(self, masters):
+        self.masters = masters
+        self.calls = collections.Counter()
+
+    def events(self):
+        return self
+
+    def list(self, timeMin, timeMax, singleEvents=False, **kwargs):
+        low = datetime.datetime.fromisoformat(timeMin)
+        high = datetime.datetime.fromisoformat(timeMax)
+        masters = [i for i in self.masters if i.get("status") != "cancelled"]
+        if not singleEvents:
+            return Request(self, "list", {"items": masters})
+        items = []
+        for master in masters:
+            rule, exdates = script.parse_recurrence(master["recurrence"])
+            for i in script.expand_rrule(script.event_start(master), rule):
+                if low <= i < high and i not in exdates:
+                    items.append(
+                        {
+                            "id": script.instance_id(master["id"], i),
+                            "summary": master["summary"],
+                        }
+                    )
+        return Request(self, "list", {"items": items})
+
+    def delete(self, **kwargs):
+        return Request(self, "delete")
+
+    def patch(self, **kwargs):
+        return Request(self, "patch")
+
+
+def make_masters(n):
+    """Makes n classes spread over the week like a real timetable"""
+    random.seed(n)
+    masters = []
+    for i in range(n):
+        days = random.sample(script.WEEKDAYS[:6], random.choice((1, 2, 3)))
+        start = datetime.datetime.fromisoformat(f"{START_DATE}T08:00:00+05:30")
+        start += datetime.timedelta(hours=random.randint(0, 9))
+        while script.WEEKDAYS[start.weekday()] not in days:
+            start += datetime.timedelta(days=1)
+        masters.append(
+            {
+                "id": f"class{i}",
+                "summary": f"Course {i}",
+                "colorId": "10",
+                "start": {"dateTime": start.isoformat(), "timeZone": "Asia/Kolkata"},
+                "end": {
+                    "dateTime": (start + datetime.timedelta(hours=1)).isoformat(),
+                    "timeZone": "Asia/Kolkata",
+                },
+                "recurrence": [
+                    f"RRULE:FREQ=WEEKLY;BYDAY={','.join(days)};"
+                    f"UNTIL={END_DATE.replace('-', '')}T000000Z"
+                ],
+            }
+        )
+    return masters
+
+
+def listed(masters):
+    """Lists the classes on each holiday and in each exam window before deleting"""
+    service = CountingService(masters)
+    script.del_events(
+        service, EXAMS["midsem_start_date"], EXAMS["midsem_end_date"], force=True
+    )
+    script.del_events(
+        service, EXAMS["compre_start_date"], EXAMS["compre_end_date"], force=True
+    )
+    script.del_classes_on_holidays(service, HOLIDAYS)
+    return service.calls
+
+
+def local(masters):
+    """Expands the classes locally and deletes the occurrences by instance ID"""
+    service = CountingService(masters)
+    for exam_type in ("midsem", "compre"):
+        script.del_series_list_in_range(
+            service,
+            masters,
+            EXAMS[f"{exam_type}_start_date"],
+            EXAMS[f"{exam_type}_end_date"],
+        )
+    script.del_classes_on_holidays(service, HOLIDAYS, masters)
+    return service.calls
+
+
+def expand_each(masters, dates):
+    """Expands every series on its own and keeps the occurrences on the dates"""
+    return {
+        i["id"]: [
+            j
+            for j in script.expand_rrule(
+                script.event_start(i), script.parse_recurrence(i["recurrence"])[0]
+            )
+            if j.strftime("%Y-%m-%d") in dates
+        ]
+        for i in masters
+    }
+
+
+def timed(fn, *args):
+    """
+    Runs fn with its output silenced
+
+    Returns:
+        (object, float): (Result of fn, Time taken in ms)
+    """
+    stdout = sys.stdout
+    sys.stdout = open(os.devnull, "w")
+    try:
+        begin = time.perf_counter()
+        result = fn(*args)
+        return result, (time.perf_counter() - begin) * 1000
+    finally:
+        sys.stdout.close()
+        sys.stdout = stdout
+
+
+def main(sizes):
+    script.state.calendar_id = "benchmark"
+    print(
+        f"{'classes':>8}{'list calls':>12}{'local calls':>13}"
+        f"{'list est s':>12}{'local est s':>13}{'each ms':>9}{'weekly ms':>11}"
+    )
+    for n in sizes:
+        # Both ways change the master events, so each gets its own copy
+        listed_calls, _ = timed(listed, make_masters(n))
+        local_calls, _ = timed(local, make_masters(n))
+        masters = make_masters(n)
+        dates = set(HOLIDAYS)
+        for exam_type in ("midsem", "compre"):
+            day = datetime.date.fromisoformat(EXAMS[f"{exam_type}_start_date"])
+            while day.isoformat() <= EXAMS[f"{exam_type}_end_date"]:
+                dates.add(day.isoformat())
+                day += datetime.timedelta(days=1)
+        each, each_ms = timed(expand_each, masters, dates)
+        weekly, weekly_ms = timed(script.expand_weekly, masters, dates)
+        assert each == weekly
+        print(
+            f"{n:>8}{sum(listed_calls.values()):>12}{sum(local_calls.values()):>13}"
+            f"{sum(listed_calls.values()) * LATENCY:>12.1f}"
+            f"{sum(local_calls.values()) * LATENCY:>13.1f}"
+            f"{each_ms:>9.1f}{weekly_ms:>11.1f}"
+        )
+        print(f"{'':>8}list: {dict(listed_calls)}, local: {dict(local_calls)}")
+
+
+if __name__ == "__main__":
+    main([int(i) for i in sys.argv[1:]] or [10, 25, 100, 1000])
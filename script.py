@@ -1,16 +1,40 @@
-import calendar
+import argparse
+import base64
+import bisect
+import ctypes
 import datetime
+import functools
+import hashlib
 import json
+import math
 import os
 import random
+import re
+import sched
+import socket
+import socketserver
+import sys
+import threading
+import time
+import uuid
+from array import array
+from collections import OrderedDict, namedtuple
+from concurrent.futures import Future, ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from typing import Tuple
 
+import google_auth_httplib2
+import httplib2
 import pdfplumber
+import pypdfium2
+import pypdfium2.raw as pdfium_c
 import requests
 from google.auth.transport.requests import Request
 from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import InstalledAppFlow
 from googleapiclient.discovery import build as api_build
+from googleapiclient.errors import HttpError
+from googleapiclient.http import HttpRequest
 
 # If modifying these scopes, delete the file token.json.
 SCOPES = ["https://www.googleapis.com/auth/calendar"]
@@ -27,25 +51,120 @@ GOOGLE_CALENDAR_COLORS = {
     10: {"name": "Basil", "hex": "#0b8043"},
     11: {"name": "Tomato", "hex": "#d60000"},
 }
-usable_colors = list(map(str, GOOGLE_CALENDAR_COLORS.keys()))
-specified_colors = []
 
-CALENDAR_ID = None
+# Private extended properties on every event created by the script
+TOOL_TAGS = {"source": "chrono2gcal"}
+CLASS_TAGS = {**TOOL_TAGS, "kind": "class"}
+EXAM_TAGS = {**TOOL_TAGS, "kind": "exam"}
+
+IST = datetime.timezone(datetime.timedelta(hours=5, minutes=30))
+WEEKDAYS = ["MO", "TU", "WE", "TH", "FR", "SA", "SU"]
+
+
+class RunState(threading.local):
+    """
+    State of the current run (calendars and colors in use)
+    Kept per thread, so that runs for different students can share one process
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        """
+        Starts this thread's state over, so a run doesn't see anything left by the last run on the thread
+
+        Args:
+            None
+        Returns:
+            None
+        """
+        self.calendar_id = None
+        self.journal = None
+        self.dispatcher = None
+        self.progress = None
+        self.layout = "single"  # One of CALENDAR_LAYOUTS
+        self.calendars = (
+            None  # (Timetable calendar ID, its sub-calendars), see sub_calendars
+        )
+        self.usable_colors = list(map(str, GOOGLE_CALENDAR_COLORS.keys()))
+        self.specified_colors = []
+        self.course_colors = {}  # Course ID -> colorId given to its classes in this run
+        # (Timetable calendar ID, course, kind) -> whether the Timetable calendar has such events
+        self.in_timetable = {}
+
+
+state = RunState()
 HOLIDAY_LIST_PATH = "BITS_Calendar_2025-26.pdf"
 
+# Engine used to read the tables of the pdfs, "words" or "tables" (pdfplumber's table finder)
+PDF_ENGINE = "words"
+PDFIUM_LOCK = threading.Lock()  # PDFium isn't thread safe
+RULE_TOLERANCE = 1.5  # Rules closer than this (in points) are the same rule
+
+JOURNAL_PATH = "journal.jsonl"
 
-def auth():
+# Customisation last applied to the calendar (with the run's parameters), to re-apply changes against
+APPLIED_PATH = "applied.json"
+# Fields of events that follow the customisation, and can be re-applied with a patch
+CUSTOMISED_FIELDS = ("summary", "description", "colorId", "reminders")
+
+# Seating arrangements last applied to the calendar, to diff revised pdfs against
+SEATING_INDEX_PATH = "seating_index.json"
+SEATING_INDEX_LOCK = threading.Lock()
+
+# Sub-calendars of each Timetable calendar, by course (and kind of event)
+CALENDAR_MAP_PATH = "calendars.json"
+CALENDAR_MAP_LOCK = threading.Lock()
+CALENDAR_LAYOUTS = ("single", "course", "course_kind")
+
+# Fields of events not made by this script that are kept when the calendar is reset
+FOREIGN_EVENT_FIELDS = (
+    "summary",
+    "description",
+    "location",
+    "start",
+    "end",
+    "recurrence",
+    "reminders",
+    "colorId",
+    "transparency",
+    "visibility",
+    "extendedProperties",
+)
+# Copy of those events, written before the calendar is deleted and kept while any aren't copied back
+FOREIGN_EVENTS_PATH = "foreign_events.json"
+
+# Cost model of the Calendar API, used to pick how to send a run's changes
+STRATEGIES = ("serial", "batched", "parallel", "exdate")
+REQUEST_SECONDS = 0.3  # Round trip of one request
+BATCH_ITEM_SECONDS = (
+    0.02  # Time a batch request takes per request in it, on top of its round trip
+)
+BATCH_SIZE = 50  # Most requests Google Calendar takes in one batch
+WORKERS = 8  # Requests in flight at once when sending in parallel
+RATE_LIMIT = 600  # Requests per minute per user allowed by the default quota
+QUOTA_BUDGET = None  # Most quota units (requests) a run may use, no limit if None
+# Seconds a quota unit is worth when picking a strategy, its share of the rate limit
+QUOTA_UNIT_SECONDS = 60 / RATE_LIMIT
+
+# Seconds after which cached downloads are fetched again
+CATALOGUE_TTL = 3600
+TIMETABLE_TTL = 300
+
+
+def auth(token_path="token.json"):
     """
     Authorises the app to access the user's Google Calendar
 
     Args:
-        None
+        token_path (str): Path to the stored token
     Returns:
         google.oauth2.credentials.Credentials: Google Calendar API credentials
     """
     creds = None
-    if os.path.exists("token.json"):
-        creds = Credentials.from_authorized_user_file("token.json", SCOPES)
+    if os.path.exists(token_path):
+        creds = Credentials.from_authorized_user_file(token_path, SCOPES)
     if not creds or not creds.valid:
         if creds and creds.expired and creds.refresh_token:
             creds.refresh(Request())  # Refreshes the token if it is expired
@@ -54,1022 +173,5760 @@ def auth():
                 "credentials.json", SCOPES
             )  # Gets the user to login and authorise the app
             creds = flow.run_local_server(port=0)
-        with open("token.json", "w") as token:
+        with open(token_path, "w") as token:
             token.write(creds.to_json())
     return creds
 
 
-# region Google Calendar Helper Functions
+# region Prefetching
 
 
-def get_events(service, start_date, end_date):
+class Prefetcher:
     """
-    Gets all events in the given date range
+    Runs independent network and PDF work in the background and caches the results process-wide
+    Each job is keyed so that it is started only once, and its result is awaited only when needed
 
-    Args:
-        service (googleapiclient.discovery.Resource): Google Calendar API service
-        start_date (str): Start date in the format YYYY-MM-DD
-        end_date (str): End date in the format YYYY-MM-DD
-    Returns:
-        list: List of events
+    Least recently used results are evicted when there are more than max_entries of them
+    or they take up more than max_bytes, and results with a ttl are reloaded once they expire
     """
-    events_result = (
-        service.events()
-        .list(
-            calendarId=CALENDAR_ID,
-            timeMin=start_date + "T00:00:00+05:30",
-            timeMax=end_date + "T23:59:59+05:30",
-            singleEvents=True,
-            orderBy="startTime",
-        )
-        .execute()
-    )
-    return events_result.get("items", [])
 
+    def __init__(self, max_workers=4, max_entries=256, max_bytes=256 * 2**20):
+        self.executor = ThreadPoolExecutor(max_workers=max_workers)
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.futures = OrderedDict()  # Least recently used first
+        self.sizes = {}
+        self.expiry = {}
+        self.lock = threading.RLock()
 
-def del_events(
-    service,
-    start_date,
-    end_date,
-    excludeEvent=[],
-    excludeColorId=[],
-    onlyColorId=[],
-    force=False,
-):
-    """
-    Deletes all events in the given date range
-    Can exclude events by name or colorId
-    Can delete only events with a particular colorId
-    Can force delete without confirmation
+    def _lookup(self, key):
+        """
+        Gets the future of a job if it is cached
+        Expired and failed jobs are forgotten so that they are run again
 
-    Args:
-        service (googleapiclient.discovery.Resource): Google Calendar API service
-        start_date (str): Start date in the format YYYY-MM-DD
-        end_date (str): End date in the format YYYY-MM-DD
-        excludeEvent (list): List of event names to exclude
-        excludeColorId (list): List of colorIds to exclude
-        onlyColorId (list): List of colorIds to include
-        force (bool): Whether to force delete without confirmation
-    Returns:
-        None
-    """
-    # split date interval into months - [(start_date, end_date), ...)] - to avoid exceeding API quota
-    start_date = datetime.datetime.strptime(start_date, "%Y-%m-%d")
-    end_date = datetime.datetime.strptime(end_date, "%Y-%m-%d")
-    intervals = []
-    while start_date <= end_date:
-        if start_date.month == end_date.month:
-            intervals.append(
-                (start_date.strftime("%Y-%m-%d"), end_date.strftime("%Y-%m-%d"))
-            )
-            break
-        month_end = datetime.datetime(
-            start_date.year,
-            start_date.month,
-            calendar.monthrange(start_date.year, start_date.month)[1],
-        )
-        intervals.append(
-            (start_date.strftime("%Y-%m-%d"), month_end.strftime("%Y-%m-%d"))
-        )
-        start_date = month_end + datetime.timedelta(days=1)
+        Args:
+            key (tuple): Key identifying the job
+        Returns:
+            concurrent.futures.Future: Future of the job, or None
+        """
+        future = self.futures.get(key)
+        if future is None:
+            return None
+        if future.done() and (
+            future.exception() is not None
+            or self.expiry.get(key, math.inf) < time.monotonic()
+        ):
+            self._drop(key)
+            return None
+        self.futures.move_to_end(key)
+        return future
 
-    # delete events in each interval
-    for start_date, end_date in intervals:
-        events = get_events(service, start_date, end_date)
-        if not force:
-            f = input(
-                f"Are you sure you want to delete all events in the range {start_date} to {end_date}? (y/n): "
-            )
-            if f.lower() != "y":
-                continue
-        for event in events:
-            try:
-                if event["colorId"] in excludeColorId:
-                    continue
-                if onlyColorId and event["colorId"] not in onlyColorId:
-                    continue
-            except KeyError:
-                continue
-            if event["summary"] in excludeEvent:
-                continue
-            service.events().delete(
-                calendarId=CALENDAR_ID, eventId=event["id"]
-            ).execute()
-            print(f"Event deleted: {event['summary']}")
+    def _store(self, key, future, ttl):
+        self.futures[key] = future
+        self.sizes[key] = 0
+        if ttl:
+            self.expiry[key] = time.monotonic() + ttl
+        else:
+            self.expiry.pop(key, None)
+        future.add_done_callback(lambda f: self._on_done(key, f))
 
+    def _drop(self, key):
+        del self.futures[key]
+        self.sizes.pop(key, None)
+        self.expiry.pop(key, None)
 
-# endregion
+    def _on_done(self, key, future):
+        """
+        Records the size of a finished job's result and evicts least recently used results if over the limits
+        """
+        size = 0
+        if not future.cancelled() and future.exception() is None:
+            size = deep_sizeof(future.result())
+        with self.lock:
+            if self.futures.get(key) is not future:
+                return
+            self.sizes[key] = size
+            total = sum(self.sizes.values())
+            for k in list(self.futures):
+                if len(self.futures) <= self.max_entries and total <= self.max_bytes:
+                    break
+                if self.futures[k].done():
+                    total -= self.sizes[k]
+                    self._drop(k)
 
+    def submit(self, key, fn, *args, ttl=None):
+        """
+        Starts a job in the background if it hasn't been started already
 
-# region Creating and Modifying Events
+        Args:
+            key (tuple): Key identifying the job
+            fn (callable): Function to run
+            *args: Arguments for the function
+            ttl (float): Seconds after which the result expires, never if None
+        Returns:
+            concurrent.futures.Future: Future of the job
+        """
+        with self.lock:
+            future = self._lookup(key)
+            if future is None:
+                future = self.executor.submit(fn, *args)
+                self._store(key, future, ttl)
+            return future
 
+    def result(self, key, fn, *args, ttl=None):
+        """
+        Waits for the result of a job
+        If no worker has started the job yet, it is run in the calling thread instead,
+        so that waiting never depends on a free worker
 
-def add_classes(service, classes, start_date, end_date, custom: dict):
-    """
-    Adds all classes in the given date range
+        Args:
+            key (tuple): Key identifying the job
+            fn (callable): Function to run
+            *args: Arguments for the function
+            ttl (float): Seconds after which the result expires, never if None
+        Returns:
+            Any: Result of the job
+        """
+        with self.lock:
+            future = self._lookup(key)
+            run = future is None or future.cancel()
+            if run:
+                future = Future()
+                future.set_running_or_notify_cancel()
+                self._store(key, future, ttl)
+        if run:
+            try:
+                future.set_result(fn(*args))
+            except BaseException as e:
+                future.set_exception(e)
+        return future.result()
 
-    Args:
-        service (googleapiclient.discovery.Resource): Google Calendar API service
-        classes (list): List of classes
-        start_date (str): Start date in the format YYYY-MM-DD
-        end_date (str): End date in the format YYYY-MM-DD
-        custom (dict): Customisation dictionary
-    Returns:
-        None
-    """
-    start_date_original = start_date
-    classes_colors = {}
+    def start(self, fn, *args):
+        """
+        Runs a function in the background, for functions that cache their results through the prefetcher
 
-    def get_color(i):
+        Args:
+            fn (callable): Function to run
+            *args: Arguments for the function
+        Returns:
+            None
         """
-        Gets the colorId for the event
+        self.executor.submit(fn, *args)
+
+    def set(self, key, value, ttl=None):
+        """
+        Replaces the result of a job with a known value
 
         Args:
-            i (dict): Class dictionary
+            key (tuple): Key identifying the job
+            value (Any): New result
+            ttl (float): Seconds after which the result expires, never if None
         Returns:
-            str: ColorId
+            None
         """
-        if i["title"] in classes_colors:
-            return classes_colors[i["title"]]
-        if custom[i["title"]].get("color"):
-            classes_colors[i["title"]] = custom[i["title"]]["color"]
-            return custom[i["title"]]["color"]
-        elif custom["course_grouping"]:
-            # random unused color
-            l = [
-                x for x in usable_colors if str(x) not in list(classes_colors.values())
-            ]
-            if not l:
-                l = [
-                    x for x in classes_colors.values() if str(x) not in specified_colors
-                ]
-            x = str(random.choice(l))
-            classes_colors[i["title"]] = x
-            return x
-        else:
-            return custom["classes_color_ids"][i["type"]]
+        future = Future()
+        with self.lock:
+            self._store(key, future, ttl)
+            future.set_result(value)
 
-    for i in classes:
-        # Finding the first date of the class
-        start_date = datetime.datetime.strptime(start_date_original, "%Y-%m-%d")
-        while start_date.strftime("%A").upper()[:2] not in i["days"]:
-            start_date += datetime.timedelta(days=1)
-        start_date = start_date.strftime("%Y-%m-%d")
-
-        desc = (
-            custom[i["title"]]["desc"]
-            + ("<br>" if custom[i["title"]]["desc"] else "")
-            + f"<ul><li><b>{i['type']} - {i['section']}</b></li><li><b>{i['name']}</b></li>"
-            + (f"<li>{i['title']}</li>" if i["title"] != i["title"] else "")
-            + "<br><u>Instructors</u>:<li>"
-            + "</li><li>".join(i["instructors"])
-            + "</li></ul>"
-        )
-        event = {
-            "summary": custom[i["title"]]["title"]
-            + ((" - " + i["type"][0]) if custom["course_grouping"] else ""),
-            "location": i["location"],
-            "description": desc,
-            "start": {
-                "dateTime": f"{start_date}T{i['start']}+05:30",
-                "timeZone": "Asia/Kolkata",
-            },
-            "end": {
-                "dateTime": f"{start_date}T{i['end']}+05:30",
-                "timeZone": "Asia/Kolkata",
-            },
-            "recurrence": [
-                f"RRULE:FREQ=WEEKLY;BYDAY={','.join(i['days'])};UNTIL={end_date.replace('-','')}T000000Z"
-            ],
-            "reminders": {
-                "useDefault": False,
-                "overrides": [{"method": "popup", "minutes": custom["reminder"]}],
-            },
-            "colorId": get_color(i),
-        }
-        service.events().insert(calendarId=CALENDAR_ID, body=event).execute()
-        print(f"Classes Added: {event['summary']}")
+    def stats(self):
+        """
+        Gets the number of cached results and their approximate memory usage
+
+        Args:
+            None
+        Returns:
+            dict: Cache statistics
+        """
+        with self.lock:
+            return {"entries": len(self.futures), "bytes": sum(self.sizes.values())}
 
 
-def del_classes_on_holidays(service, holidays):
+def deep_sizeof(obj):
     """
-    Deletes all classes on holidays
+    Approximates the memory used by an object and everything it references
 
     Args:
-        service (googleapiclient.discovery.Resource): Google Calendar API service
-        holidays (list): List of holidays in the format YYYY-MM-DD
+        obj (Any): Object
     Returns:
-        None
+        int: Size in bytes
     """
-    print("\nDeleting classes on holidays...")
-    for i in holidays:
-        events = get_events(service, i, i)
-        for event in events:
-            try:
-                if event["colorId"] not in usable_colors + specified_colors:
-                    continue
-            except KeyError:
-                continue
-            service.events().delete(
-                calendarId=CALENDAR_ID, eventId=event["id"]
-            ).execute()
-            print(f"Event deleted: {event['summary']}")
+    seen = set()
+    stack = [obj]
+    size = 0
+    while stack:
+        o = stack.pop()
+        if id(o) in seen:
+            continue
+        seen.add(id(o))
+        size += sys.getsizeof(o)
+        if isinstance(o, dict):
+            stack.extend(o.keys())
+            stack.extend(o.values())
+        elif isinstance(o, (list, tuple, set, frozenset)):
+            stack.extend(o)
+        elif hasattr(o, "__slots__"):
+            stack.extend(getattr(o, i) for i in o.__slots__ if hasattr(o, i))
+        elif hasattr(o, "__dict__"):
+            stack.append(o.__dict__)
+    return size
 
 
-def add_exams(
-    service,
-    exams,
-    exams_start_end_dates: dict,
-    custom: dict,
-    timetable_ID,
-    student_ID,
-    increment_exam_year: Tuple[str, str] | None = None,
-):
+prefetcher = Prefetcher()
+
+
+def prefetch(timetable_ID):
     """
-    Adds all exams and deletes classes during exams
+    Starts all work that only depends on the timetable ID
+    (timetable, course catalogue and holidays)
 
     Args:
-        service (googleapiclient.discovery.Resource): Google Calendar API service
-        exams (list): List of exams
-        exams_start_end_dates (dict): Start and end dates of midsems and compres
-        custom (dict): Customisation dictionary
         timetable_ID: Chrono timetable ID
-        student_ID (str): Student ID
-        increment_exam_year (tuple): (from_year, to_year) to increment the year of the exam
     Returns:
         None
     """
-    exam_rooms = {}
-    for i in custom["exam_rooms"]:
-        exam_rooms[i] = get_room_numbers(
-            custom["exam_rooms"][i],
-            get_courses_enrolled(timetable_ID),
-            student_ID,
-        )
-    for i in exams:
-        code, exam_type, start_time, end_time = i.split("|")
-        cust_title = custom[code]["title"]
-        title = code if code == cust_title else f"{code} - {cust_title}"
-        if increment_exam_year:
-            start_time = start_time.replace(
-                increment_exam_year[0], increment_exam_year[1]
-            )
-            end_time = end_time.replace(increment_exam_year[0], increment_exam_year[1])
-        exam = {
-            "summary": title,
-            "start": {
-                "dateTime": start_time,
-                "timeZone": "Asia/Kolkata",
-            },
-            "end": {
-                "dateTime": end_time,
-                "timeZone": "Asia/Kolkata",
-            },
-            "description": exam_type,
-            "colorId": custom["exam_color_id"],
-            "reminders": {
-                "useDefault": False,
-                "overrides": [{"method": "popup", "minutes": custom["reminder"]}],
-            },
-        }
-        try:
-            exam["location"] = exam_rooms[exam_type.lower()][code]
-        except KeyError:
-            pass
-        service.events().insert(calendarId=CALENDAR_ID, body=exam).execute()
-        print(f"{exam_type} added: {title}")
-
-    print("\nDeleting Classes during Exams...")
-    if increment_exam_year:
-        for key, value in exams_start_end_dates.items():
-            exams_start_end_dates[key] = value.replace(
-                increment_exam_year[0], increment_exam_year[1]
-            )
-
-    del_events(
-        service,
-        exams_start_end_dates["midsem_start_date"],
-        exams_start_end_dates["midsem_end_date"],
-        excludeColorId=[custom["exam_color_id"]],
-        onlyColorId=usable_colors + specified_colors,
-        force=True,
-    )
-    del_events(
-        service,
-        exams_start_end_dates["compre_start_date"],
-        exams_start_end_dates["compre_end_date"],
-        excludeColorId=[custom["exam_color_id"]],
-        onlyColorId=usable_colors + specified_colors,
-        force=True,
-    )
+    prefetcher.start(load_timetable, timetable_ID)
+    prefetcher.start(get_course_catalogue)
+    prefetcher.start(get_holiday_list)
 
 
-def add_exam_rooms(
-    service,
-    room_numbers,
-    examtype,
-    increment_exam_year: Tuple[str, str] | None = None,
-):
+def exam_room_numbers(filepath, timetable_ID, student_ID, wait=True):
     """
-    Adds room numbers to the already created exam events
+    Gets the room numbers from the seating arrangement pdf,
+    or starts finding them in the background
 
     Args:
-        service (googleapiclient.discovery.Resource): Google Calendar API service
-        room_numbers (dict): Dictionary of course IDs and room numbers
-        examtype (str): midsem or compre
-        increment_exam_year (tuple): (from_year, to_year) to increment the year of the exam
+        filepath (str): Path to the seating arrangement pdf file
+        timetable_ID: Chrono timetable ID
+        student_ID (str): Student ID
+        wait (bool): Whether to wait for the room numbers
     Returns:
-        None
+        dict: Dictionary of course IDs and room numbers (concurrent.futures.Future of it if not waiting)
     """
-    print("Adding Room Numbers to Exam Events...")
-    print(room_numbers)
-    exams_start_end_dates = get_exams_start_end_dates()
-    if increment_exam_year:
-        for key, value in exams_start_end_dates.items():
-            exams_start_end_dates[key] = value.replace(
-                increment_exam_year[0], increment_exam_year[1]
-            )
-    events = get_events(
-        service,
-        exams_start_end_dates[f"{examtype}_start_date"],
-        exams_start_end_dates[f"{examtype}_end_date"],
+    key = ("rooms", filepath, os.path.getmtime(filepath), timetable_ID, student_ID)
+    fn = lambda: get_room_numbers(
+        filepath, get_courses_enrolled(timetable_ID), student_ID
     )
-    for course_code, room_number in room_numbers.items():
-        for event in events:
-            if event["summary"].startswith(course_code):
-                event["location"] = room_number
-                service.events().update(
-                    calendarId=CALENDAR_ID, eventId=event["id"], body=event
-                ).execute()
-                print(f"Room number added to {event['summary']}")
-                break
-        else:
-            print(f"Room number not found for {course_code}")
+    if wait:
+        return prefetcher.result(key, fn, ttl=TIMETABLE_TTL)
+    return prefetcher.submit(key, fn, ttl=TIMETABLE_TTL)
 
 
 # endregion
 
 
-# region Timetable Helper Functions
+# region Journal
 
 
-def get_exams_start_end_dates():
+class Journal:
     """
-    Gets the start and end dates of midsems and compres
+    Append-only journal (JSON lines) of the changes a run makes to the calendar
+    Each change is written as planned before it is made and as committed once it is,
+    so a run that died partway can be resumed and everything a run added can be rolled back
 
-    Args:
-        None
-    Returns:
-        dict: Start and end dates of midsems and compres
+    Records (all with "run", the run's ID):
+        {"type": "begin", "params": {...}, "time": ...}: Parameters to resume the run with
+        {"type": "planned", "seq": n, "op": "insert", "id": ..., "key": ...}: Change about to be made
+            (with "calendar" if the event is in a sub-calendar)
+        {"type": "committed", "seq": n, "id": ...} or {"type": "failed", "seq": n, "status": ...}: Its outcome
+        {"type": "end"} or {"type": "rolled_back"}: The run finished or was undone
     """
-    courses_details = {}
-    for i in json.loads(requests.get(f"https://chrono.crux-bphc.com/api/course").text):
-        courses_details[i["id"]] = i
 
-    return {
-        "midsem_start_date": min(
-            courses_details.values(),
-            key=lambda x: (
-                x["midsemStartTime"] if x["midsemStartTime"] else "9999-12-31T00:00:00Z"
-            ),
-        )["midsemStartTime"].split("T")[0],
-        "midsem_end_date": max(
-            courses_details.values(),
-            key=lambda x: (
-                x["midsemEndTime"] if x["midsemEndTime"] else "0000-01-01T00:00:00Z"
-            ),
-        )["midsemEndTime"].split("T")[0],
-        "compre_start_date": min(
-            courses_details.values(),
-            key=lambda x: (
-                x["compreStartTime"] if x["compreStartTime"] else "9999-12-31T00:00:00Z"
-            ),
-        )["compreStartTime"].split("T")[0],
-        "compre_end_date": max(
-            courses_details.values(),
-            key=lambda x: (
-                x["compreEndTime"] if x["compreEndTime"] else "0000-01-01T00:00:00Z"
-            ),
-        )["compreEndTime"].split("T")[0],
-    }
+    def __init__(self, path=JOURNAL_PATH, run=None, params=None):
+        """
+        Args:
+            path (str): Path to the journal file
+            run (str): ID of an unfinished run to resume, a new run is started if None
+            params (dict): Parameters to resume the run with, known before it begins (e.g. token path)
+        """
+        self.path = path
+        self.run = run or uuid.uuid4().hex
+        self.params = params or {}
+        self.lock = threading.Lock()
+        self.seq = 0
+        self.committed = set()  # Keys of the changes already made by the run
+        self.begun = run is not None
+        if run is not None:
+            runs = read_journal(path)
+            self.seq = runs[run]["seq"]
+            self.committed = runs[run]["committed"]
+        self.file = open(path, "a")
 
+    def write(self, record):
+        """
+        Appends a record, flushed at once so it survives the process dying
 
-def get_holidays(filepath):
-    """
-    Extracts list of holidays from the pdf
+        Args:
+            record (dict): Record
+        Returns:
+            None
+        """
+        with self.lock:
+            self.file.write(json.dumps({"run": self.run, **record}) + "\n")
+            self.file.flush()
 
-    Args:
-        filepath (str): Path to the holiday calendar pdf file
-    Returns:
-        list: List of holidays in the format YYYY-MM-DD
-    """
-    pdf = pdfplumber.open(filepath)
-    tables = []
-    for i in pdf.pages:
-        tables.extend(i.extract_tables())  # Extract all tables from the pdf
-    holidays = []
-    for i in tables:
-        for j in i:
-            if j[1] and j[1].endswith("(H)"):
-                holidays.append(
-                    datetime.datetime.strptime(j[0][: j[0].index("(")].strip(), "%B %d")
-                )  # Extracts the date from the table
-    for i in range(len(holidays)):
-        holidays[i] = (
-            holidays[i]
-            .replace(
-                year=datetime.datetime.today().year
-                + (not (datetime.datetime.today().month <= holidays[i].month))
+    def begin(self, params):
+        """
+        Records the start of the run, unless it is being resumed
+
+        Args:
+            params (dict): Parameters to resume the run with
+        Returns:
+            None
+        """
+        if not self.begun:
+            self.write(
+                {
+                    "type": "begin",
+                    "params": {**self.params, **params},
+                    "time": time.time(),
+                }
             )
-            .strftime("%Y-%m-%d")
-        )  # If the holiday is in the next year, add 1 to the year
-    return sorted(holidays)
+            self.begun = True
 
+    def end(self, kind="end"):
+        """
+        Records the end of the run
 
-def get_courses_enrolled(timetable_ID):
+        Args:
+            kind (str): "end" or "rolled_back"
+        Returns:
+            None
+        """
+        self.write({"type": kind})
+
+    def close(self):
+        """
+        Closes the journal file
+
+        Args:
+            None
+        Returns:
+            None
+        """
+        self.file.close()
+
+    def plan(self, op, event_id, body=None, calendar=None):
+        """
+        Writes a change about to be made
+        A change the resumed run already made (same op, event and body) isn't planned again
+
+        Args:
+            op (str): Kind of change (insert, update, patch or delete)
+            event_id (str): ID of the event changed
+            body (dict): Body of the request, if any
+            calendar (str): ID of the sub-calendar the event is in, if not the Timetable calendar
+        Returns:
+            (int, str): (Sequence number, Key) of the change, or None if it was already made
+        """
+        key = hashlib.sha1(
+            json.dumps([op, event_id, body], sort_keys=True).encode()
+        ).hexdigest()
+        if key in self.committed:
+            return None
+        with self.lock:
+            self.seq += 1
+            seq = self.seq
+        record = {"type": "planned", "seq": seq, "op": op, "id": event_id, "key": key}
+        if calendar is not None:
+            record["calendar"] = calendar
+        self.write(record)
+        return seq, key
+
+    def commit(self, seq, key, event_id):
+        """
+        Writes that a planned change was made
+
+        Args:
+            seq (int): Sequence number of the change
+            key (str): Key of the change
+            event_id (str): ID of the event changed
+        Returns:
+            None
+        """
+        self.write({"type": "committed", "seq": seq, "id": event_id})
+        self.committed.add(key)
+
+    def fail(self, seq, status=None):
+        """
+        Writes that a planned change failed
+
+        Args:
+            seq (int): Sequence number of the change
+            status (int): HTTP status of the error, if it was one
+        Returns:
+            None
+        """
+        record = {"type": "failed", "seq": seq}
+        if status is not None:
+            record["status"] = status
+        self.write(record)
+
+
+def read_journal(path=JOURNAL_PATH):
     """
-    Gets all courses enrolled in the given timetable
+    Reads the runs recorded in a journal
+    A torn last line (the process died while writing it) is ignored
 
     Args:
-        timetable_ID: Chrono timetable ID
+        path (str): Path to the journal file
     Returns:
-        list: List of courses enrolled (course IDs)
+        dict: Dictionary of run IDs and dictionaries of
+            params, status (running, end or rolled_back), seq (last sequence number),
+            committed (keys of the changes made), ids (IDs of the events inserted, in order)
+            and calendars (sub-calendars of the inserted events not in the Timetable calendar)
     """
-    print("Fetching courses enrolled...")
-    timetable = json.loads(
-        requests.get(f"https://chrono.crux-bphc.com/api/timetable/{timetable_ID}").text
-    )
+    runs = {}
+    if not os.path.exists(path):
+        return runs
+    with open(path, "r") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            run = runs.setdefault(
+                record["run"],
+                {
+                    "params": None,
+                    "status": "running",
+                    "seq": 0,
+                    "committed": set(),
+                    "planned": {},
+                    "ids": [],
+                    "calendars": {},
+                },
+            )
+            if record["type"] == "begin":
+                run["params"] = record["params"]
+            elif record["type"] == "planned":
+                run["seq"] = max(run["seq"], record["seq"])
+                run["planned"][record["seq"]] = record
+                # Inserts that were planned but not committed may still have been made
+                if record["op"] == "insert" and record["id"] not in run["ids"]:
+                    run["ids"].append(record["id"])
+                    if "calendar" in record:
+                        run["calendars"][record["id"]] = record["calendar"]
+            elif record["type"] == "committed":
+                run["committed"].add(run["planned"][record["seq"]]["key"])
+            elif record["type"] == "failed" and record.get("status") == 409:
+                # The event already existed, so it wasn't made by this insert
+                planned = run["planned"][record["seq"]]
+                if planned["op"] == "insert" and planned["id"] in run["ids"]:
+                    run["ids"].remove(planned["id"])
+                    run["calendars"].pop(planned["id"], None)
+            elif record["type"] in ("end", "rolled_back"):
+                run["status"] = record["type"]
+    for run in runs.values():
+        del run["planned"]
+    return runs
 
-    try:
-        if not timetable["sections"]:
-            print("ID Error. Can't access timetable.")
-            exit()
-    except KeyError:
-        print("ID Error. Can't access timetable.")
-        exit()
 
-    courses_enrolled = []
-    for i in timetable["examTimes"]:
-        courses_enrolled.append(i.split("|")[0])
+def unfinished_run(path=JOURNAL_PATH):
+    """
+    Finds the last run in the journal that neither finished nor was rolled back
 
-    return courses_enrolled
+    Args:
+        path (str): Path to the journal file
+    Returns:
+        (str, dict): (Run ID, Run as in read_journal), or None if there is none
+    """
+    runs = [i for i in read_journal(path).items() if i[1]["status"] == "running"]
+    return runs[-1] if runs else None
 
 
-def get_room_numbers(filepath, courses_enrolled, student_ID):
+def rollback(service, path=JOURNAL_PATH, run=None):
     """
-    Extracts room numbers for enrolled courses from the pdf
-
-    **Compatible with Compre 23-24 Sem 2**
+    Deletes exactly the events a run inserted, in batches and without listing any events
 
     Args:
-        filepath (str): Path to the seating arrangement pdf file
-        courses_enrolled (list): List of courses enrolled (course IDs)
-        student_ID (str): Student ID
+        service (googleapiclient.discovery.Resource): Google Calendar API service
+        path (str): Path to the journal file
+        run (str): ID of the run, the last run that wasn't rolled back if None
     Returns:
-        dict: Dictionary of course IDs and room numbers
+        None
     """
-    print("Fetching exam room numbers...")
-    pdf = pdfplumber.open(filepath)
-    tables = []
-    for i in pdf.pages:
-        tables.extend(i.extract_tables())  # Extract all tables from the pdf
+    runs = read_journal(path)
+    if run is None:
+        candidates = [i for i in runs if runs[i]["status"] != "rolled_back"]
+        if not candidates:
+            print("Nothing to roll back.")
+            return
+        run = candidates[-1]
+    ids = runs[run]["ids"]
+    state.calendar_id = (runs[run]["params"] or {}).get(
+        "calendar_id"
+    ) or get_calendar_id(service)
+    print(f"Rolling back {len(ids)} events...")
+    by_calendar = {}
+    for i in ids:
+        by_calendar.setdefault(runs[run]["calendars"].get(i), []).append(i)
+    failed = []
+    for calendar_id, event_ids in by_calendar.items():
+        failed += del_events_by_id(service, event_ids, calendar_id=calendar_id)
+    for event_id, e in failed:
+        print(f"Could not delete {event_id}: {e}")
+    if not failed:
+        journal = Journal(path, run)
+        journal.end("rolled_back")
+        journal.close()
+    print("Done.")
 
-    room_numbers = {}
 
-    # Parsing the tables of the pdf
-    cur_course = ""
-    for i in tables:
-        for j in i:
-            try:
-                if any(
-                    [
-                        j[0].startswith(x)
-                        for x in [
-                            "BITS-PILANI",
-                            "MID-SEMESTER",
-                            "MIDSEMESTER",
-                            "MID SEMESTER",
-                            "SEATING",
-                            "COMPREHENSIVE",
-                            "COURSE",
-                            "Course",
-                        ]
-                    ]
-                ):  # Skip headers
-                    continue
-                if any(x in j[0] for x in courses_enrolled):  # If course is enrolled
-                    cur_course = next(x for x in courses_enrolled if x in j[0])
-                elif (
-                    "CS/ECE/EEE/I" in j[0]
-                    and "F215" in j[0]
-                    and any(
-                        x in courses_enrolled
-                        for x in ["CS F215", "ECE F215", "EEE F215", "INSTR F215"]
-                    )
-                ):  # DD
-                    cur_course = next(
-                        x
-                        for x in courses_enrolled
-                        if x in ["CS F215", "ECE F215", "EEE F215", "INSTR F215"]
-                    )
-                elif j[0] != "":  # For courses with multiple rooms
-                    cur_course = ""
-                if cur_course:
-                    ids = j[4].split("to")
-                    if ids[0].strip() <= student_ID <= ids[1].strip():
-                        room_numbers[cur_course] = j[3]
-                        continue
-            except:
-                print(f"Error in PDF format for column:\n{j}")
+def resume(path=JOURNAL_PATH):
+    """
+    Finishes the last run that died partway, skipping the changes it already made
 
-    return room_numbers
+    Args:
+        path (str): Path to the journal file
+    Returns:
+        None
+    """
+    unfinished = unfinished_run(path)
+    if unfinished is None:
+        print("No unfinished run to resume.")
+        return
+    run, record = unfinished
+    params = record["params"]
+    service = api_build(
+        "calendar", "v3", credentials=auth(params.get("token", "token.json"))
+    )
+    state.calendar_id = params["calendar_id"]
+    prefetch(params["timetable_ID"])
+    print(f"Resuming run {run}...")
+    custom = initialise(
+        service,
+        params["timetable_ID"],
+        params["student_ID"],
+        params["start_date"],
+        params["end_date"],
+        custom=params["customisation"],
+        journal=Journal(path, run),
+        strategy=params.get("strategy", "auto"),
+        colors=params.get("colors"),
+    )
+    save_applied(
+        custom,
+        params["timetable_ID"],
+        params["student_ID"],
+        params["start_date"],
+        params["end_date"],
+    )
+    print("\nDone.")
 
 
 # endregion
 
 
-# region Util
+# region Execution Strategies
 
 
-def input_dates():
+Change = namedtuple(
+    "Change", "request op event_id body ignore on_conflict calendar", defaults=(None,)
+)
+
+
+class BudgetExceeded(Exception):
+    """Raised when a run would use more quota than its budget"""
+
+
+def send_change(change, journal=None, **kwargs):
     """
-    Gets the start and end dates from the user
+    Sends a change to the calendar now, through the journal if there is one
 
     Args:
-        None
+        change (Change): Change to send
+        journal (Journal): Journal of the run, if any
+        **kwargs: Passed on to the request's execute
     Returns:
-        (str, str): (Start date, End date)
+        dict: Response (None if the error was ignored, just the event ID if the change was already made)
     """
-    start_date = None
-    while True:
-        start_date = input(
-            "Enter start date (YYYY-MM-DD) [Leave blank to start today]: "
-        )
-        if not start_date:
-            start_date = datetime.datetime.today().strftime("%Y-%m-%d")
-            break
-        try:
-            datetime.datetime.strptime(start_date, "%Y-%m-%d")
-            break
-        except ValueError:
-            print("\nIncorrect date format, should be YYYY-MM-DD")
-            continue
-
-    end_date = None
-    while True:
-        end_date = input("Enter semester end date (Excluded) (YYYY-MM-DD): ")
-        try:
-            datetime.datetime.strptime(end_date, "%Y-%m-%d")
-            break
-        except ValueError:
-            print("\nIncorrect date format, should be YYYY-MM-DD")
-            continue
-    return start_date, end_date
+    planned = (
+        journal.plan(change.op, change.event_id, change.body, change.calendar)
+        if journal
+        else ()
+    )
+    if planned is None:
+        return {"id": change.event_id}
+    try:
+        response = change.request.execute(**kwargs)
+    except Exception as e:
+        if planned:
+            journal.fail(
+                planned[0], e.resp.status if isinstance(e, HttpError) else None
+            )
+        if isinstance(e, HttpError):
+            if e.resp.status in change.ignore:
+                return None
+            if e.resp.status == 409 and change.on_conflict is not None:
+                return send_change(
+                    Change(*change.on_conflict(), change.ignore, None, change.calendar),
+                    journal,
+                    **kwargs,
+                )
+        raise
+    if planned:
+        journal.commit(*planned, change.event_id)
+    return response
 
 
-def input_filepath():
+def execute(
+    request, op, event_id, body=None, ignore=(), on_conflict=None, calendar=None
+):
     """
-    Gets the filepath from the user
+    Makes a change to the calendar, through the run's journal if it has one
+    If the run sends its changes in batches or in parallel, the change is only queued (see flush_changes)
 
     Args:
-        None
+        request (googleapiclient.http.HttpRequest): Request, not yet executed
+        op (str): Kind of change (insert, update, patch or delete)
+        event_id (str): ID of the event changed
+        body (dict): Body of the request, if any
+        ignore (tuple): HTTP statuses that aren't errors (e.g. 404 and 410 when deleting)
+        on_conflict (callable): Makes the (request, op, event_id, body) to send instead if the change conflicts (409)
+        calendar (str): ID of the sub-calendar the event is in, if not the Timetable calendar (kept for rollbacks)
     Returns:
-        str: Filepath
+        dict: Response, None if queued or the error was ignored
     """
-    filepath = None
-    while True:
-        filepath = input("Enter filepath: ")
-        if not filepath:
-            print("Filepath cannot be empty")
-            continue
-        if not os.path.exists(filepath):
-            print("File does not exist")
-            continue
-        break
-    return filepath
-
-
-# endregion
+    change = Change(request, op, event_id, body, ignore, on_conflict, calendar)
+    if state.dispatcher is not None:
+        state.dispatcher.add(change)
+        return None
+    return send_change(change, state.journal)
 
 
-def initialise(service, timetable_ID, student_ID, start_date, end_date):
+def flush_changes():
     """
-    Makes lists of classes and exams and calls the respective functions
+    Waits until all queued changes are made
+    Called between changes that depend on each other, e.g. inserting a series and then patching it
 
     Args:
-        service (googleapiclient.discovery.Resource): Google Calendar API service
-        timetable_ID: Chrono timetable ID
-        student_ID (str): Student ID
-        start_date (str): Start date in the format YYYY-MM-DD
-        end_date (str): End date in the format YYYY-MM-DD
+        None
     Returns:
-        dict: Customisation dictionary
+        None
     """
-    # Found Chrono API endpoints by inspecting network traffic
-    print("\nLoading Timetable...\n")
-    timetable = json.loads(
-        requests.get(f"https://chrono.crux-bphc.com/api/timetable/{timetable_ID}").text
-    )
+    if state.dispatcher is not None:
+        state.dispatcher.flush()
 
-    try:
-        if not timetable["sections"]:
-            print("ID Error. Can't access timetable.")
-            exit()
-    except KeyError:
-        print("ID Error. Can't access timetable.")
-        exit()
 
-    courses_details = {}
-    for i in json.loads(requests.get(f"https://chrono.crux-bphc.com/api/course").text):
-        courses_details[i["id"]] = i
+class BatchDispatcher:
+    """
+    Sends changes in batch requests of up to BATCH_SIZE changes
+    Google may make the changes of a batch in any order, so dependent changes need a flush in between
+    """
 
-    exams_start_end_dates = get_exams_start_end_dates()
+    def __init__(self, service, journal=None):
+        """
+        Args:
+            service (googleapiclient.discovery.Resource): Google Calendar API service
+            journal (Journal): Journal of the run, if any
+        """
+        self.service = service
+        self.journal = journal
+        self.pending = []
+        self.errors = []
 
-    def convert_slots_to_days_hr(slot: Tuple[str, str]) -> Tuple[str, str]:
+    def add(self, change):
         """
-        Converts chrono's time slot format to google calendar's format
+        Queues a change, sending a batch once there are enough
 
         Args:
-            slot (str, str): Chrono's time slot format (Day, Hour Number)
+            change (Change): Change
         Returns:
-            (str, str): (Day, Hour) in google calendar's format
+            None
         """
-        days = {
-            "M": "MO",
-            "T": "TU",
-            "W": "WE",
-            "Th": "TH",
-            "F": "FR",
-            "S": "SA",
-            "Su": "SU",
-        }
-        hours = {
-            "1": "08:00:00",
-            "2": "09:00:00",
-            "3": "10:00:00",
-            "4": "11:00:00",
-            "5": "12:00:00",
-            "6": "13:00:00",
-            "7": "14:00:00",
-            "8": "15:00:00",
-            "9": "16:00:00",
-            "10": "17:00:00",
-            "11": "18:00:00",
-        }
-        return (days[slot[0]], hours[slot[1]])
+        self.pending.append(change)
+        if len(self.pending) >= BATCH_SIZE:
+            self.flush()
 
-    types_dict = {"L": "Lecture", "T": "Tutorial", "P": "Practical"}
-    classes = []
-    for i in timetable["sections"]:
-        timings = [
-            convert_slots_to_days_hr((j.split(":")[2], j.split(":")[3]))
-            for j in i["roomTime"]
-        ]
-        # Multiple hours for same course
-        class_times = []
-        for j in timings:
-            block_period = [
-                k
-                for k in timings
-                if (
-                    k[0] == j[0]
-                    and abs(int(k[1].split(":")[0]) - int(j[1].split(":")[0])) <= 2
-                )
-            ]
-            if len(block_period) > 1 and block_period not in class_times:
-                class_times.append(block_period)
-            diff_hrs = [k for k in timings if k[1] == j[1]]
-            if diff_hrs not in class_times and len(block_period) == 1:
-                class_times.append(diff_hrs)
+    def done(self, change, planned, request_id, response, exception):
+        """
+        Handles the response to a change in a batch
 
-        for k in class_times:
-            days = [x[0] for x in k]
-            classes.append(
-                {
-                    "title": i["roomTime"][0].split(":")[0],
-                    "location": i["roomTime"][0].split(":")[1],
-                    "days": list(set(days)),
-                    "start": k[0][1],
-                    "end": (
-                        k[0][1][:2] + ":50:00"
-                        if days.count(days[0]) == 1
-                        else str(int(k[0][1][:2]) + days.count(days[0]) - 1) + ":50:00"
-                    ),
-                    "section": i["type"] + str(i["number"]),
-                    "instructors": i["instructors"],
-                    "type": types_dict[i["type"]],
-                    "name": courses_details[i["courseId"]]["name"].title(),
-                }
+        Args:
+            change (Change): Change
+            planned (tuple): (Sequence number, Key) of the change in the journal, empty if there is none
+            request_id (str): ID of the change in the batch
+            response (dict): Response
+            exception (Exception): Error, if any
+        Returns:
+            None
+        """
+        if exception is None:
+            if planned:
+                self.journal.commit(*planned, change.event_id)
+            return
+        if planned:
+            self.journal.fail(
+                planned[0],
+                exception.resp.status if isinstance(exception, HttpError) else None,
             )
+        if isinstance(exception, HttpError):
+            if exception.resp.status in change.ignore:
+                return
+            if exception.resp.status == 409 and change.on_conflict is not None:
+                self.pending.append(
+                    Change(*change.on_conflict(), change.ignore, None, change.calendar)
+                )
+                return
+        self.errors.append(exception)
 
-    for i in classes:
-        if i["location"] == "WS":  # QOL
-            i["location"] = "Workshop"
-        elif i["location"] in [
-            "A122",
-            "A222",
-            "B124",
-        ]:  # Change Lab Courses to Practical
-            i["type"] = "Practical"
-            i["section"] = "P" + i["section"][1:]
-
-    custom = customisation(classes)
-
-    # Checking available colors that can be used
-    for i in custom["remove_colors"]:
-        usable_colors.remove(i)
-    if custom.get("exam_color_id"):
-        usable_colors.remove(custom.get("exam_color_id"))
-        specified_colors.append(custom.get("exam_color_id"))
-    if not custom["course_grouping"]:
-        for i in custom["classes_color_ids"]:
-            usable_colors.remove(custom["classes_color_ids"][i])
-            specified_colors.append(custom["classes_color_ids"][i])
-    for i in custom:
-        if i not in [
-            "reminder",
-            "course_grouping",
-            "exam_rooms",
-            "classes_color_ids",
-            "remove_colors",
-            "exam_color_id",
-        ]:
-            if custom[i].get("color"):
-                usable_colors.remove(custom[i]["color"])
-                specified_colors.append(custom[i]["color"])
+    def flush(self):
+        """
+        Sends all queued changes
 
-    add_classes(service, classes, start_date, end_date, custom)
-    print("\nLoading Exam Schedule...")
-    add_exams(
-        service,
-        timetable["examTimes"],
-        exams_start_end_dates,
-        custom,
-        timetable_ID,
-        student_ID,
-        increment_exam_year=None,
-    )
-    return custom
+        Args:
+            None
+        Returns:
+            None
+        """
+        while self.pending:
+            chunk, self.pending = self.pending[:BATCH_SIZE], self.pending[BATCH_SIZE:]
+            batch = self.service.new_batch_http_request()
+            for i, change in enumerate(chunk):
+                planned = (
+                    self.journal.plan(
+                        change.op, change.event_id, change.body, change.calendar
+                    )
+                    if self.journal
+                    else ()
+                )
+                if planned is None:
+                    continue
+                batch.add(
+                    change.request,
+                    callback=functools.partial(self.done, change, planned),
+                    request_id=str(i),
+                )
+            batch.execute()
+        if self.errors:
+            error, self.errors = self.errors[0], []
+            raise error
+
+    def close(self):
+        """
+        Drops the changes not sent yet (they aren't in the journal, so a resumed run makes them)
+
+        Args:
+            None
+        Returns:
+            None
+        """
+        self.pending = []
+
+
+class ParallelDispatcher:
+    """
+    Sends changes from a pool of threads, each with its own connection
+    Changes in flight at once may be made in any order, so dependent changes need a flush in between
+    """
+
+    def __init__(self, journal=None, workers=WORKERS):
+        """
+        Args:
+            journal (Journal): Journal of the run, if any
+            workers (int): Number of threads
+        """
+        self.journal = journal
+        self.pool = ThreadPoolExecutor(workers)
+        self.futures = []
+        self.local = threading.local()
+
+    def add(self, change):
+        """
+        Starts sending a change
+
+        Args:
+            change (Change): Change
+        Returns:
+            None
+        """
+        self.futures.append(self.pool.submit(self.send, change))
+
+    def send(self, change):
+        """
+        Sends a change on this thread's connection, retrying when rate limited
+
+        Args:
+            change (Change): Change
+        Returns:
+            dict: Response
+        """
+        if not isinstance(change.request, HttpRequest):
+            return send_change(change, self.journal)
+        if not hasattr(self.local, "http"):
+            # httplib2 connections can't be shared between threads
+            self.local.http = google_auth_httplib2.AuthorizedHttp(
+                change.request.http.credentials, http=httplib2.Http()
+            )
+        return send_change(change, self.journal, http=self.local.http, num_retries=3)
+
+    def flush(self):
+        """
+        Waits for all changes in flight
+
+        Args:
+            None
+        Returns:
+            None
+        """
+        futures, self.futures = self.futures, []
+        for i in futures:
+            i.result()
+
+    def close(self):
+        """
+        Waits for the changes in flight and stops the threads, dropping the changes not started yet
+
+        Args:
+            None
+        Returns:
+            None
+        """
+        self.pool.shutdown(cancel_futures=True)
+        self.futures = []
+
+
+def plan_run(masters, exams, holidays, windows):
+    """
+    Counts the changes a run will make, without making any
+
+    Args:
+        masters (list): Master events of the classes
+        exams (list): Exams (as in the timetable)
+        holidays (list): Holidays in the format YYYY-MM-DD
+        windows (list): (Start date, End date) of the exam periods, classes in them are deleted
+    Returns:
+        dict: Number of inserts, patches (one per series and exam period),
+            deletes (one per class on a holiday outside the exam periods) and
+            phases (number of changes between each flush, see flush_changes)
+    """
+    window_dates = set()
+    window_patches = []
+    for start_date, end_date in windows:
+        dates = dates_between(start_date, end_date)
+        window_dates.update(dates)
+        window_patches.append(
+            sum(1 for i in expand_weekly(masters, dates).values() if i)
+        )
+    deletes = sum(
+        len(i)
+        for i in expand_weekly(
+            masters, [i for i in holidays if i not in window_dates]
+        ).values()
+    )
+    return {
+        "inserts": len(masters) + len(exams),
+        "patches": sum(window_patches),
+        "deletes": deletes,
+        "phases": [len(masters), len(exams)] + window_patches + [deletes],
+    }
+
+
+def estimate_cost(plan, strategy):
+    """
+    Predicts the cost of a run under an execution strategy
+
+    - serial: One request at a time
+    - batched: Requests grouped into batch requests of BATCH_SIZE (each still uses a quota unit)
+    - parallel: WORKERS requests in flight at once
+    - exdate: Classes on holidays and during exams are left out of the series as they are inserted,
+      so only the inserts are sent (one at a time)
+
+    Args:
+        plan (dict): Changes of the run (see plan_run)
+        strategy (str): One of STRATEGIES
+    Returns:
+        dict: Number of HTTP requests, quota units and expected seconds
+    """
+    quota = plan["inserts"]
+    if strategy != "exdate":
+        quota += plan["patches"] + plan["deletes"]
+    if strategy == "batched":
+        requests_made = sum(math.ceil(i / BATCH_SIZE) for i in plan["phases"])
+        seconds = requests_made * REQUEST_SECONDS + quota * BATCH_ITEM_SECONDS
+    elif strategy == "parallel":
+        requests_made = quota
+        seconds = quota * REQUEST_SECONDS / WORKERS
+    else:
+        requests_made = quota
+        seconds = quota * REQUEST_SECONDS
+    # Requests beyond the rate limit are throttled
+    seconds = max(seconds, quota * 60 / RATE_LIMIT if quota > RATE_LIMIT else 0)
+    return {"requests": requests_made, "quota": quota, "seconds": seconds}
+
+
+def choose_strategy(plan, strategy="auto", budget=None):
+    """
+    Prints the predicted cost of each strategy and picks the cheapest,
+    weighing its quota units (QUOTA_UNIT_SECONDS each) against its time
+
+    Args:
+        plan (dict): Changes of the run (see plan_run)
+        strategy (str): One of STRATEGIES, or "auto" to pick the cheapest
+        budget (int): Most quota units the run may use, QUOTA_BUDGET if None
+    Returns:
+        str: Strategy
+    Raises:
+        BudgetExceeded: If the strategy would use more quota units than the budget
+    """
+    costs = {i: estimate_cost(plan, i) for i in STRATEGIES}
+    if strategy == "auto":
+        strategy = min(
+            STRATEGIES,
+            key=lambda i: costs[i]["quota"] * QUOTA_UNIT_SECONDS + costs[i]["seconds"],
+        )
+    print(f"\n{'Strategy':<10}{'Requests':>10}{'Quota':>8}{'Time':>8}")
+    for i in STRATEGIES:
+        print(
+            f"{i:<10}{costs[i]['requests']:>10}{costs[i]['quota']:>8}"
+            f"{costs[i]['seconds']:>7.1f}s" + (" <" if i == strategy else "")
+        )
+    budget = QUOTA_BUDGET if budget is None else budget
+    if budget is not None and costs[strategy]["quota"] > budget:
+        raise BudgetExceeded(
+            f"The run needs {costs[strategy]['quota']} quota units, over the budget of {budget}"
+        )
+    return strategy
+
+
+def make_dispatcher(strategy, service, journal=None):
+    """
+    Makes the dispatcher that sends changes for a strategy
+
+    Args:
+        strategy (str): One of STRATEGIES
+        service (googleapiclient.discovery.Resource): Google Calendar API service
+        journal (Journal): Journal of the run, if any
+    Returns:
+        BatchDispatcher | ParallelDispatcher: Dispatcher, or None to send changes one at a time
+    """
+    if strategy == "batched":
+        return BatchDispatcher(service, journal)
+    if strategy == "parallel":
+        return ParallelDispatcher(journal)
+    return None
+
+
+# endregion
+
+
+# region Progress
+
+
+class Progress:
+    """
+    Reports the progress of a run as structured events, sent to each listener (a callable taking the event)
+
+    Runs are split into phases (e.g. adding classes), which can be nested. Events are dicts with:
+        type: "start", "step", "note" or "finish"
+        phase, done, total (None if unknown), elapsed, rate (steps per second) and eta (seconds, None if unknown)
+        action and name for steps (e.g. "added", "CS F211"), text for notes and counts (per action) when finishing
+    """
+
+    def __init__(self, listeners=None):
+        """
+        Args:
+            listeners (list): Callables that are sent each event
+        """
+        self.listeners = list(listeners or [])
+        self.phases = []
+
+    def emit(self, kind, **fields):
+        """
+        Sends an event of the current phase to each listener
+
+        Args:
+            kind (str): Type of the event ("start", "step", "note" or "finish")
+            **fields: Other fields of the event
+        Returns:
+            None
+        """
+        phase = self.phases[-1] if self.phases else None
+        event = {"type": kind, "phase": phase and phase["phase"], "time": time.time()}
+        if phase:
+            elapsed = time.monotonic() - phase["started"]
+            rate = phase["done"] / elapsed if elapsed > 0 else 0.0
+            event.update(
+                done=phase["done"],
+                total=phase["total"],
+                elapsed=elapsed,
+                rate=rate,
+                eta=(
+                    (phase["total"] - phase["done"]) / rate
+                    if phase["total"] is not None and rate
+                    else None
+                ),
+            )
+        event.update(fields)
+        for listener in self.listeners:
+            listener(event)
+
+    def start(self, phase, total=None):
+        """
+        Starts a phase
+
+        Args:
+            phase (str): Name of the phase
+            total (int): Number of steps expected, if known
+        Returns:
+            None
+        """
+        self.phases.append(
+            {
+                "phase": phase,
+                "total": total,
+                "done": 0,
+                "counts": {},
+                "started": time.monotonic(),
+            }
+        )
+        self.emit("start")
+
+    def set_total(self, total):
+        """
+        Sets the number of steps expected in the current phase, once it is known
+
+        Args:
+            total (int): Number of steps
+        Returns:
+            None
+        """
+        self.phases[-1]["total"] = total
+
+    def step(self, action, name, count=1):
+        """
+        Records a step of the current phase
+
+        Args:
+            action (str): What was done (e.g. "added", "deleted")
+            name (str): What it was done to (e.g. the event's title)
+            count (int): Number of steps it counts as
+        Returns:
+            None
+        """
+        phase = self.phases[-1]
+        phase["done"] += count
+        phase["counts"][action] = phase["counts"].get(action, 0) + count
+        self.emit("step", action=action, name=name)
+
+    def note(self, text):
+        """
+        Reports a message that isn't a step (e.g. a warning)
+
+        Args:
+            text (str): Message
+        Returns:
+            None
+        """
+        self.emit("note", text=text)
+
+    def finish(self):
+        """
+        Finishes the current phase
+
+        Args:
+            None
+        Returns:
+            None
+        """
+        self.emit("finish", counts=dict(self.phases[-1]["counts"]))
+        self.phases.pop()
+
+
+def progress():
+    """
+    Gets the progress reporter of this thread's run, rendering on the console by default
+
+    Args:
+        None
+    Returns:
+        Progress: Progress reporter
+    """
+    if state.progress is None:
+        state.progress = Progress([ConsoleRenderer()])
+    return state.progress
+
+
+class ConsoleRenderer:
+    """
+    Renders progress events on the console, buffered and redrawn at most every interval seconds
+    On a terminal, the current phase is shown on a single line that updates in place.
+    Otherwise only notes and a summary of each phase are printed
+    """
+
+    def __init__(self, stream=None, interval=0.1, verbose=False):
+        """
+        Args:
+            stream (file): Stream to write to, sys.stdout (as it is when writing) if None
+            interval (float): Least seconds between redraws
+            verbose (bool): Whether to also print a line for each step
+        """
+        self.stream = stream
+        self.interval = interval
+        self.verbose = verbose
+        self.live = getattr(stream or sys.stdout, "isatty", lambda: False)()
+        self.buffer = []
+        self.shown = False  # Whether the status line is on screen
+        self.last = 0.0
+
+    def __call__(self, event):
+        if event["type"] == "step":
+            if self.verbose:
+                self.buffer.append(f"{event['action'].capitalize()}: {event['name']}")
+            if time.monotonic() - self.last >= self.interval:
+                self.flush(self.status(event) if self.live else None)
+        elif event["type"] == "note":
+            self.buffer.append(event["text"])
+            self.flush()
+        elif event["type"] == "finish":
+            counts = ", ".join(f"{n} {action}" for action, n in event["counts"].items())
+            self.buffer.append(
+                f"{event['phase']}: {counts or 'nothing to do'} ({event['elapsed']:.1f}s)"
+            )
+            self.flush()
+
+    def status(self, event):
+        """
+        Formats the status line of a phase
+
+        Args:
+            event (dict): Latest event of the phase
+        Returns:
+            str: Status line
+        """
+        line = f"{event['phase']}: {event['done']}"
+        if event["total"]:
+            line += f"/{event['total']} ({event['done'] / event['total']:.0%})"
+        line += f", {event['rate']:.1f}/s"
+        if event["eta"] is not None:
+            line += f", {event['eta']:.0f}s left"
+        return line
+
+    def flush(self, status=None):
+        """
+        Writes the buffered lines, and the status line if any
+
+        Args:
+            status (str): Status line to show after them
+        Returns:
+            None
+        """
+        out = "\r\033[K" if self.shown else ""
+        out += "".join(f"{i}\n" for i in self.buffer)
+        self.buffer.clear()
+        self.shown = status is not None
+        if status is not None:
+            out += status
+        stream = self.stream or sys.stdout
+        stream.write(out)
+        stream.flush()
+        self.last = time.monotonic()
+
+
+class JsonLinesSink:
+    """
+    Writes progress events as JSON lines, for tools that follow a run (e.g. a bulk runner)
+    Events are buffered and written when a phase starts or finishes, and every buffer_size events
+    """
+
+    def __init__(self, file, buffer_size=100):
+        """
+        Args:
+            file (str | file): Path to append to, or an open file
+            buffer_size (int): Most events kept before writing
+        """
+        self.owned = isinstance(file, str)
+        self.file = open(file, "a") if self.owned else file
+        self.buffer_size = buffer_size
+        self.buffer = []
+        self.lock = threading.Lock()
+
+    def __call__(self, event):
+        with self.lock:
+            self.buffer.append(json.dumps(event))
+            if event["type"] != "step" or len(self.buffer) >= self.buffer_size:
+                self.flush()
+
+    def flush(self):
+        """
+        Writes the buffered events (called with the lock held)
+
+        Args:
+            None
+        Returns:
+            None
+        """
+        self.file.write("".join(f"{i}\n" for i in self.buffer))
+        self.file.flush()
+        self.buffer.clear()
+
+    def close(self):
+        """
+        Writes the buffered events and closes the file if it was opened here
+
+        Args:
+            None
+        Returns:
+            None
+        """
+        with self.lock:
+            self.flush()
+            if self.owned:
+                self.file.close()
+
+
+# endregion
+
+
+# region Models
+
+
+class ClassBlock:
+    """
+    A block of one section of a course that repeats weekly at the same hours
+    """
+
+    __slots__ = (
+        "title",
+        "location",
+        "days",
+        "start",
+        "end",
+        "section",
+        "instructors",
+        "type",
+        "name",
+    )
+
+    def __init__(
+        self, title, location, days, start, end, section, instructors, type, name
+    ):
+        """
+        Args:
+            title (str): Course ID
+            location (str): Room
+            days (iterable): Days of the week (as in WEEKDAYS)
+            start (str): Start time in the format HH:MM:SS
+            end (str): End time in the format HH:MM:SS
+            section (str): Section, like L1
+            instructors (list): Instructors of the section
+            type (str): Lecture, Tutorial or Practical
+            name (str): Course name
+        """
+        self.title = title
+        self.location = location
+        self.days = tuple(i for i in WEEKDAYS if i in days)
+        self.start = start
+        self.end = end
+        self.section = section
+        self.instructors = tuple(instructors)
+        self.type = type
+        self.name = name
+
+    def __repr__(self):
+        return f"ClassBlock({self.title} {self.section} {','.join(self.days)} {self.start})"
+
+    def first_date(self, start_date):
+        """
+        Gets the date of the first class on or after the given date
+
+        Args:
+            start_date (datetime.date): Start date of the classes
+        Returns:
+            datetime.date: Date of the first class
+        """
+        weekday = start_date.weekday()
+        return start_date + datetime.timedelta(
+            days=min((WEEKDAYS.index(i) - weekday) % 7 for i in self.days)
+        )
+
+
+class ExamSlot:
+    """
+    An exam of a course, parsed from the timetable's "code|type|start|end" entries
+    """
+
+    __slots__ = ("code", "type", "start", "end")
+
+    def __init__(self, code, type, start, end):
+        """
+        Args:
+            code (str): Course ID
+            type (str): MIDSEM or COMPRE
+            start (str): Start time in ISO format
+            end (str): End time in ISO format
+        """
+        self.code = code
+        self.type = type
+        self.start = start
+        self.end = end
+
+    @classmethod
+    def parse(cls, text):
+        """
+        Parses an exam entry of the timetable
+
+        Args:
+            text (str): Exam entry, like "CS F211|MIDSEM|2025-10-07T04:30:00Z|2025-10-07T06:00:00Z"
+        Returns:
+            ExamSlot: Exam
+        """
+        return cls(*text.split("|"))
+
+    def __str__(self):
+        return f"{self.code}|{self.type}|{self.start}|{self.end}"
+
+    def __repr__(self):
+        return f"ExamSlot({self})"
+
+
+class EventSpec:
+    """
+    The fields of an event to be created, turned into the API's event body in one pass
+    """
+
+    __slots__ = (
+        "id",
+        "summary",
+        "location",
+        "description",
+        "start",
+        "end",
+        "recurrence",
+        "reminder",
+        "color_id",
+        "tags",
+    )
+
+    def __init__(
+        self,
+        id,
+        summary,
+        start,
+        end,
+        description="",
+        location=None,
+        recurrence=None,
+        reminder=None,
+        color_id=None,
+        tags=None,
+    ):
+        """
+        Args:
+            id (str): Event ID
+            summary (str): Title
+            start (str): Start time in ISO format
+            end (str): End time in ISO format
+            description (str): Description
+            location (str): Location, left out if None
+            recurrence (str): RRULE, left out if None
+            reminder (int): Minutes before the event for the popup reminder, default reminders if None
+            color_id (str): ColorId
+            tags (dict): extendedProperties (see event_tags)
+        """
+        self.id = id
+        self.summary = summary
+        self.start = start
+        self.end = end
+        self.description = description
+        self.location = location
+        self.recurrence = recurrence
+        self.reminder = reminder
+        self.color_id = color_id
+        self.tags = tags
+
+    def body(self):
+        """
+        Makes the event body for the Google Calendar API
+
+        Args:
+            None
+        Returns:
+            dict: Event
+        """
+        event = {
+            "id": self.id,
+            "summary": self.summary,
+            "description": self.description,
+            "start": {"dateTime": self.start, "timeZone": "Asia/Kolkata"},
+            "end": {"dateTime": self.end, "timeZone": "Asia/Kolkata"},
+            "reminders": (
+                {"useDefault": True}
+                if self.reminder is None
+                else {
+                    "useDefault": False,
+                    "overrides": [{"method": "popup", "minutes": self.reminder}],
+                }
+            ),
+        }
+        if self.location is not None:
+            event["location"] = self.location
+        if self.recurrence is not None:
+            event["recurrence"] = [self.recurrence]
+        if self.color_id is not None:
+            event["colorId"] = self.color_id
+        if self.tags is not None:
+            event["extendedProperties"] = self.tags
+        return event
+
+
+# endregion
+
+
+# region Course Calendars
+
+
+def calendar_key(course, kind, layout):
+    """
+    Gets the key of the sub-calendar an event goes in under a layout
+
+    Args:
+        course (str): Course ID
+        kind (str): class or exam
+        layout (str): One of CALENDAR_LAYOUTS
+    Returns:
+        str: Key in the calendar map, None if the event goes in the Timetable calendar
+    """
+    if layout == "course":
+        return course
+    if layout == "course_kind":
+        return f"{course} {kind}"
+    return None
+
+
+def load_calendar_map(path=CALENDAR_MAP_PATH):
+    """
+    Loads the sub-calendars made for each Timetable calendar
+
+    Args:
+        path (str): Path to the calendar map
+    Returns:
+        dict: Timetable calendar IDs and dictionaries of keys (see calendar_key)
+            and {"id": sub-calendar ID, "color": colorId of the events that take the calendar's color}
+    """
+    with CALENDAR_MAP_LOCK:
+        try:
+            with open(path, "r") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+
+
+def save_sub_calendars(path=CALENDAR_MAP_PATH):
+    """
+    Saves the sub-calendars of the Timetable calendar in use
+
+    Args:
+        path (str): Path to the calendar map
+    Returns:
+        None
+    """
+    with CALENDAR_MAP_LOCK:
+        try:
+            with open(path, "r") as f:
+                saved = json.load(f)
+        except FileNotFoundError:
+            saved = {}
+        if sub_calendars():
+            saved[state.calendar_id] = sub_calendars()
+        else:
+            saved.pop(state.calendar_id, None)
+        with open(path + ".tmp", "w") as f:
+            json.dump(saved, f, indent=1)
+        os.replace(path + ".tmp", path)
+
+
+def sub_calendars():
+    """
+    Gets the sub-calendars of the Timetable calendar in use, loaded once per calendar
+
+    Args:
+        None
+    Returns:
+        dict: Keys (see calendar_key) and {"id": sub-calendar ID, "color": colorId of the events that take the calendar's color}
+    """
+    if state.calendars is None or state.calendars[0] != state.calendar_id:
+        state.calendars = (
+            state.calendar_id,
+            load_calendar_map().get(state.calendar_id, {}),
+        )
+    return state.calendars[1]
+
+
+def course_calendar_keys(course):
+    """
+    Gets the keys of the sub-calendars of a course
+
+    Args:
+        course (str): Course ID
+    Returns:
+        list: Keys in the calendar map
+    """
+    calendars = sub_calendars()
+    return [i for i in (course, f"{course} class", f"{course} exam") if i in calendars]
+
+
+def course_calendar(course, kind=None):
+    """
+    Gets the calendar the events of a course are in
+    Events are found where they were put, whatever the layout is now,
+    as a course keeps the calendars it was first added to (see route_event)
+
+    Args:
+        course (str): Course ID
+        kind (str): class or exam
+    Returns:
+        str: Calendar ID, the Timetable calendar's if the course has no sub-calendar
+    """
+    calendars = sub_calendars()
+    entry = calendars.get(f"{course} {kind}") or calendars.get(course)
+    return entry["id"] if entry else state.calendar_id
+
+
+def event_sub_calendar(event):
+    """
+    Gets the sub-calendar an event made by this script is in, from its tags
+
+    Args:
+        event (dict): Event
+    Returns:
+        str: Key of the sub-calendar (see calendar_key), None if the event is in the Timetable calendar
+    """
+    private = event.get("extendedProperties", {}).get("private", {})
+    if "course" not in private:
+        return None
+    calendars = sub_calendars()
+    for i in (f"{private['course']} {private.get('kind')}", private["course"]):
+        if i in calendars:
+            return i
+    return None
+
+
+def event_calendar(event):
+    """
+    Gets the calendar an event made by this script is in, from its tags
+
+    Args:
+        event (dict): Event
+    Returns:
+        str: Calendar ID
+    """
+    private = event.get("extendedProperties", {}).get("private", {})
+    if "course" not in private:
+        return state.calendar_id
+    return course_calendar(private["course"], private.get("kind"))
+
+
+def event_color(event):
+    """
+    Gets the colorId an event is shown in
+
+    Args:
+        event (dict): Event
+    Returns:
+        str: ColorId, the one the events of its sub-calendar take if the event has none of its own
+            (None if neither has one)
+    """
+    if event.get("colorId"):
+        return event["colorId"]
+    key = event_sub_calendar(event)
+    return sub_calendars()[key]["color"] if key else None
+
+
+def listed_calendars(tags=None):
+    """
+    Gets the calendars events with the given tags can be in, so that listing skips the rest
+
+    Args:
+        tags (dict): Private extended properties the events are filtered on
+    Returns:
+        list: Calendar IDs
+    """
+    tags = tags or {}
+    if "course" in tags:
+        if "kind" in tags:
+            return [course_calendar(tags["course"], tags["kind"])]
+        return [
+            sub_calendars()[i]["id"] for i in course_calendar_keys(tags["course"])
+        ] or [state.calendar_id]
+    others = {"class", "exam"} - {tags["kind"]} if "kind" in tags else set()
+    return [state.calendar_id] + [
+        v["id"] for k, v in sub_calendars().items() if k.split()[-1] not in others
+    ]
+
+
+def calendar_colors(color_id):
+    """
+    Gets the colors of a calendar that match an event colorId
+    (calendars have a palette of their own, so the colors are set as RGB)
+
+    Args:
+        color_id (str): ColorId (see GOOGLE_CALENDAR_COLORS)
+    Returns:
+        dict: Body for calendarList().patch with colorRgbFormat
+    """
+    return {
+        "backgroundColor": GOOGLE_CALENDAR_COLORS[int(color_id)]["hex"],
+        "foregroundColor": "#000000",
+    }
+
+
+def in_timetable_calendar(service, course, kind=None):
+    """
+    Checks whether the Timetable calendar itself has events of a course, once per run
+
+    Args:
+        service (googleapiclient.discovery.Resource): Google Calendar API service
+        course (str): Course ID
+        kind (str): Only check for events of this kind (class or exam), if given
+    Returns:
+        bool: Whether it has any
+    """
+    key = (state.calendar_id, course, kind)
+    if key not in state.in_timetable:
+        tags = {**TOOL_TAGS, "course": course, **({"kind": kind} if kind else {})}
+        found = (
+            service.events()
+            .list(
+                calendarId=state.calendar_id,
+                singleEvents=True,  # Deleted occurrences aren't listed
+                privateExtendedProperty=[f"{k}={v}" for k, v in tags.items()],
+                maxResults=1,
+            )
+            .execute()
+            .get("items")
+        )
+        state.in_timetable[key] = bool(found)
+        if found:
+            print(
+                f"{course} stays in the Timetable calendar, reset the calendar to move it"
+            )
+    return state.in_timetable[key]
+
+
+def route_event(service, event):
+    """
+    Gets the calendar an event is inserted into, making the sub-calendar of its course
+    if the layout (state.layout) needs one that doesn't exist yet
+    A new sub-calendar takes the color of its first event, and events of that color are inserted
+    without a colorId of their own, so that recoloring the course is one call
+
+    A course keeps the layout it was first added with, so that changing the layout
+    never puts a second copy of its events in another calendar
+
+    Args:
+        service (googleapiclient.discovery.Resource): Google Calendar API service
+        event (dict): Event body
+    Returns:
+        (str, dict): (Calendar ID, Event body to insert)
+    """
+    private = event.get("extendedProperties", {}).get("private", {})
+    if "course" not in private:
+        return state.calendar_id, event
+    course, kind = private["course"], private.get("kind")
+    keys = course_calendar_keys(course)
+    if course in keys:
+        layout = "course"
+    elif keys:
+        layout = "course_kind"
+    else:
+        layout = state.layout
+    key = calendar_key(course, kind, layout)
+    calendars = sub_calendars()
+    if key is None or (
+        key not in calendars
+        and in_timetable_calendar(
+            service, course, kind if layout == "course_kind" else None
+        )
+    ):
+        return state.calendar_id, event
+    if key not in calendars:
+        calendar = (
+            service.calendars()
+            .insert(body={"summary": f"Timetable - {key}", "timeZone": "Asia/Kolkata"})
+            .execute()
+        )
+        if event.get("colorId"):
+            service.calendarList().patch(
+                calendarId=calendar["id"],
+                colorRgbFormat=True,
+                body=calendar_colors(event["colorId"]),
+            ).execute()
+        calendars[key] = {"id": calendar["id"], "color": event.get("colorId")}
+        save_sub_calendars()
+    entry = calendars[key]
+    if event.get("colorId") == entry["color"]:
+        event = {k: v for k, v in event.items() if k != "colorId"}
+    return entry["id"], event
+
+
+def del_sub_calendar(service, key):
+    """
+    Deletes a sub-calendar and forgets it (without saving the calendar map)
+
+    Args:
+        service (googleapiclient.discovery.Resource): Google Calendar API service
+        key (str): Key of the sub-calendar (see calendar_key)
+    Returns:
+        None
+    """
+    try:
+        service.calendars().delete(calendarId=sub_calendars()[key]["id"]).execute()
+    except HttpError as e:
+        if e.resp.status not in (404, 410):  # Already deleted
+            raise
+    del sub_calendars()[key]
+
+
+def drop_course(service, course):
+    """
+    Removes a course from the calendar
+    Its sub-calendars are deleted (one call each) if it has any, otherwise its events are listed and deleted
+
+    Args:
+        service (googleapiclient.discovery.Resource): Google Calendar API service
+        course (str): Course ID
+    Returns:
+        int: Number of calendars or events deleted
+    """
+    keys = course_calendar_keys(course)
+    if keys:
+        for i in keys:
+            del_sub_calendar(service, i)
+        save_sub_calendars()
+        return len(keys)
+    events = list_events(service, state.calendar_id, {"course": course})
+    for event in events:
+        execute(
+            service.events().delete(calendarId=state.calendar_id, eventId=event["id"]),
+            "delete",
+            event["id"],
+            ignore=(404, 410),  # Deleted along with its series
+        )
+    flush_changes()
+    return len(events)
+
+
+def set_course_calendars(service, course, kind=None, color_id=None, shown=None):
+    """
+    Recolors, hides or shows the sub-calendars of a course, one call each
+
+    Args:
+        service (googleapiclient.discovery.Resource): Google Calendar API service
+        course (str): Course ID
+        kind (str): Only the sub-calendar of classes or exams, under the course_kind layout
+        color_id (str): New colorId (see GOOGLE_CALENDAR_COLORS), unchanged if None
+        shown (bool): Whether its events are shown, unchanged if None
+    Returns:
+        int: Number of sub-calendars changed (0 if the course has none, see calendar_layout)
+    """
+    keys = course_calendar_keys(course)
+    if kind is not None:
+        keys = [i for i in keys if i.endswith(f" {kind}")]
+    body = calendar_colors(color_id) if color_id else {}
+    if shown is not None:
+        body["selected"] = shown
+    for i in keys:
+        service.calendarList().patch(
+            calendarId=sub_calendars()[i]["id"],
+            colorRgbFormat=bool(color_id),
+            body=body,
+        ).execute()
+    return len(keys)
+
+
+# endregion
+
+
+# region Event Filters
+
+FILTER_TOKEN = re.compile(
+    r'\s*(?:([()])|(!=|>=|<=|=|~|<|>)|"((?:[^"\\]|\\.)*)"|/((?:[^/\\]|\\.)*)/|([^\s()=!<>~"/]+))'
+)
+FILTER_OPS = {
+    "summary": ("=", "!=", "~"),
+    "color": ("=", "!="),
+    "time": ("=", "!=", "<", "<=", ">", ">="),
+    "day": ("=", "!="),
+    "course": ("=", "!="),
+    "kind": ("=", "!="),
+}
+FILTER_COMPARE = {
+    "=": lambda a, b: a == b,
+    "!=": lambda a, b: a != b,
+    "<": lambda a, b: a < b,
+    "<=": lambda a, b: a <= b,
+    ">": lambda a, b: a > b,
+    ">=": lambda a, b: a >= b,
+}
+
+
+def event_days(event):
+    """
+    Gets the weekdays an event happens on
+
+    Args:
+        event (dict): Event, a recurring event as its master event
+    Returns:
+        frozenset: Weekdays (as in WEEKDAYS), all of them for series that can't be expanded locally
+    """
+    start = event_start(event)
+    if start is None:
+        start = datetime.datetime.fromisoformat(event["start"]["date"])
+    else:
+        start = start.astimezone(IST)
+    if not event.get("recurrence"):
+        return frozenset((WEEKDAYS[start.weekday()],))
+    parsed = parse_recurrence(event["recurrence"])
+    if parsed is None or parsed[0]["FREQ"] != "WEEKLY":
+        return frozenset(WEEKDAYS)
+    return frozenset(parsed[0].get("BYDAY", WEEKDAYS[start.weekday()]).split(","))
+
+
+class EventFilter:
+    """
+    Filter on events, parsed from an expression like
+        kind=class and day=MO,WE and time>=14:00 and not summary~"lab"
+
+    Terms are <field><op><value>, joined by and, or, not and parentheses (and is implied between terms)
+    - summary: = or != (the whole title), ~ (has these words, ignoring case) or ~/regex/
+    - color: colorId (of the sub-calendar if the event has none)
+    - time: Start time of day HH:MM (=, !=, <, <=, >, >=)
+    - day: Weekday MO to SU (a series matches on any of its days)
+    - course, kind (class or exam): Events made by this script
+    Comma separated values match any of them (none of them with !=), quoted values are taken as they are
+
+    What the server can evaluate is sent with the listing: the course and kind every match must have
+    as private extended properties, and the words the title must have as the q search.
+    The whole expression is still checked locally, compiled once into one predicate
+    """
+
+    __slots__ = ("text", "predicate", "tags", "query", "uses_days")
+
+    def __init__(self, text):
+        """
+        Args:
+            text (str): Filter expression
+        Raises:
+            ValueError: If the expression isn't valid
+        """
+        self.text = text
+        self.tags = {}
+        self.query = None
+        self.uses_days = False
+        tokens = []
+        at = 0
+        text = text.rstrip()
+        while at < len(text):
+            match = FILTER_TOKEN.match(text, at)
+            if match is None or match.end() == at:
+                raise ValueError(f"Invalid filter at '{text[at:]}'")
+            paren, op, quoted, regex, word = match.groups()
+            if paren or op:
+                tokens.append(("punct", paren or op))
+            elif quoted is not None:
+                tokens.append(("value", [re.sub(r"\\(.)", r"\1", quoted)]))
+            elif regex is not None:
+                tokens.append(("regex", regex.replace("\\/", "/")))
+            elif word.lower() in ("and", "or", "not"):
+                tokens.append(("keyword", word.lower()))
+            else:
+                tokens.append(("value", word.split(",")))
+            at = match.end()
+        self.predicate = self.parse(tokens) if tokens else lambda event, days: True
+
+    def parse(self, tokens):
+        """
+        Parses the tokens of the expression into one predicate,
+        and notes the terms every match must have (see pushdown)
+
+        Args:
+            tokens (list): (Kind, Value) tokens
+        Returns:
+            callable: predicate(event, days) -> bool
+        """
+        position = [0]
+
+        def peek():
+            return tokens[position[0]] if position[0] < len(tokens) else (None, None)
+
+        def take(kind=None, value=None):
+            token = peek()
+            if token[0] is None:
+                raise ValueError(f"Unexpected end of filter: {self.text}")
+            if (kind and token[0] != kind) or (value and token[1] != value):
+                raise ValueError(f"Unexpected '{token[1]}' in filter: {self.text}")
+            position[0] += 1
+            return token
+
+        def disjunction(required):
+            saved = dict(self.tags), self.query
+            terms = [conjunction(required)]
+            while peek() == ("keyword", "or"):
+                take()
+                terms.append(conjunction(False))
+            if len(terms) == 1:
+                return terms[0]
+            # Terms of an or aren't needed by every match, so the first one's pushdown is undone
+            self.tags, self.query = saved
+            return lambda event, days: any(i(event, days) for i in terms)
+
+        def conjunction(required):
+            terms = [unary(required)]
+            while peek()[0] is not None and peek() not in (
+                ("keyword", "or"),
+                ("punct", ")"),
+            ):
+                if peek() == ("keyword", "and"):
+                    take()
+                terms.append(unary(required))
+            if len(terms) == 1:
+                return terms[0]
+            return lambda event, days: all(i(event, days) for i in terms)
+
+        def unary(required):
+            if peek() == ("keyword", "not"):
+                take()
+                term = unary(False)
+                return lambda event, days: not term(event, days)
+            if peek() == ("punct", "("):
+                take()
+                term = disjunction(required)
+                take("punct", ")")
+                return term
+            return comparison(required)
+
+        def comparison(required):
+            field = take("value")[1]
+            if len(field) != 1 or field[0] not in FILTER_OPS:
+                raise ValueError(
+                    f"Unknown field '{','.join(field)}', expected one of {', '.join(FILTER_OPS)}"
+                )
+            field = field[0]
+            op = take("punct")[1]
+            if op not in FILTER_OPS[field]:
+                raise ValueError(f"'{op}' can't be used with {field}")
+            kind, values = take()
+            if kind == "regex":
+                if (field, op) != ("summary", "~"):
+                    raise ValueError("Only summary~/regex/ takes a regular expression")
+                try:
+                    pattern = re.compile(values)
+                except re.error as e:
+                    raise ValueError(f"Invalid regular expression in filter: {e}")
+                return lambda event, days: bool(
+                    pattern.search(event.get("summary", ""))
+                )
+            if kind != "value":
+                raise ValueError(f"Expected a value after {field}{op}")
+            return self.compile_term(field, op, values, required)
+
+        predicate = disjunction(True)
+        if position[0] != len(tokens):
+            raise ValueError(f"Unexpected '{tokens[position[0]][1]}' in filter")
+        return predicate
+
+    def compile_term(self, field, op, values, required):
+        """
+        Makes the predicate of a term, and notes it for the server if every match needs it
+
+        Args:
+            field (str): Field (one of FILTER_OPS)
+            op (str): Operator
+            values (list): Values
+            required (bool): Whether every match of the filter needs the term to hold
+        Returns:
+            callable: predicate(event, days) -> bool
+        """
+        if field == "summary" and op == "~":
+            words = [j for i in values for j in re.findall(r"\w+", i.lower())]
+            if required:
+                self.query = " ".join(([self.query] if self.query else []) + words)
+            return lambda event, days: set(words) <= set(
+                re.findall(r"\w+", event.get("summary", "").lower())
+            )
+        if field == "time":
+            try:
+                times = [datetime.time.fromisoformat(i) for i in values]
+            except ValueError:
+                raise ValueError(f"Invalid time in filter: {','.join(values)}")
+            compare = FILTER_COMPARE[op]
+
+            def predicate(event, days):
+                start = event_start(event)
+                if start is None:
+                    return False
+                start = start.astimezone(IST).time()
+                if op == "!=":
+                    return start not in times
+                return any(compare(start, i) for i in times)
+
+            return predicate
+        if field == "day":
+            values = {i.upper() for i in values}
+            if values - set(WEEKDAYS):
+                raise ValueError(
+                    f"Invalid day in filter, expected {','.join(WEEKDAYS)}"
+                )
+            self.uses_days = True
+            if op == "=":
+                return lambda event, days: bool(days & values)
+            return lambda event, days: not days & values
+
+        values = set(values)
+        if field in ("course", "kind") and op == "=" and len(values) == 1 and required:
+            self.tags[field] = next(iter(values))
+        get = {
+            "summary": lambda event: event.get("summary", ""),
+            "color": event_color,
+            "course": lambda event: event.get("extendedProperties", {})
+            .get("private", {})
+            .get(field),
+            "kind": lambda event: event.get("extendedProperties", {})
+            .get("private", {})
+            .get(field),
+        }[field]
+        if op == "=":
+            return lambda event, days: get(event) in values
+        return lambda event, days: get(event) not in values
+
+    def pushdown(self):
+        """
+        Gets what the server can filter on
+
+        Args:
+            None
+        Returns:
+            (dict, str): (Private extended properties every match has, q search or None)
+        """
+        return ({**TOOL_TAGS, **self.tags} if self.tags else {}), self.query
+
+    def matching_days(self, event):
+        """
+        Gets the weekdays of an event the filter matches
+        A series can match on only some of its days (e.g. day=MO for a class on MO and WE)
+
+        Args:
+            event (dict): Event, a recurring event as its master event
+        Returns:
+            frozenset: Weekdays (as in WEEKDAYS), empty if the event doesn't match
+        """
+        days = event_days(event)
+        if not self.uses_days:
+            return days if self.predicate(event, days) else frozenset()
+        return frozenset(i for i in days if self.predicate(event, frozenset((i,))))
+
+
+# endregion
+
+
+# region Google Calendar Helper Functions
+
+
+def event_tags(kind, course, semester, section=None):
+    """
+    Makes the private extended properties that mark an event as created by this script
+    They can be filtered on by the server when listing events
+
+    Args:
+        kind (str): class or exam
+        course (str): Course ID
+        semester (str): Semester (see get_semester)
+        section (str): Section, for classes
+    Returns:
+        dict: extendedProperties of the event
+    """
+    tags = {**TOOL_TAGS, "kind": kind, "course": course, "semester": semester}
+    if section:
+        tags["section"] = section
+    return {"private": tags}
+
+
+def get_events(
+    service, start_date, end_date, tags=None, single_events=True, query=None
+):
+    """
+    Gets all events in the given date range
+    Only the calendars the tags can match are listed (see listed_calendars)
+
+    Args:
+        service (googleapiclient.discovery.Resource): Google Calendar API service
+        start_date (str): Start date in the format YYYY-MM-DD
+        end_date (str): End date in the format YYYY-MM-DD
+        tags (dict): Only get events with these private extended properties (filtered by the server)
+        single_events (bool): Whether to expand recurring events into instances
+            (otherwise recurring events are returned once, as their master event)
+        query (str): Only get events with these words (free text search by the server)
+    Returns:
+        list: List of events
+    """
+    calendars = listed_calendars(tags)
+    events = []
+    for calendar_id in calendars:
+        page_token = None
+        while True:
+            events_result = (
+                service.events()
+                .list(
+                    calendarId=calendar_id,
+                    timeMin=start_date + "T00:00:00+05:30",
+                    timeMax=end_date + "T23:59:59+05:30",
+                    singleEvents=single_events,
+                    orderBy="startTime" if single_events else None,
+                    privateExtendedProperty=[
+                        f"{k}={v}" for k, v in (tags or {}).items()
+                    ],
+                    q=query,
+                    pageToken=page_token,
+                )
+                .execute()
+            )
+            events.extend(events_result.get("items", []))
+            page_token = events_result.get("nextPageToken")
+            if not page_token:
+                break
+    if single_events and len(calendars) > 1:
+        events.sort(
+            key=lambda i: event_start(i)
+            or datetime.datetime.fromisoformat(i["start"]["date"]).replace(tzinfo=IST)
+        )
+    return events
+
+
+def list_events(service, calendar_id, tags=None):
+    """
+    Gets all events of a calendar, recurring events as their master event
+
+    Args:
+        service (googleapiclient.discovery.Resource): Google Calendar API service
+        calendar_id (str): Calendar ID
+        tags (dict): Only get events with these private extended properties (filtered by the server)
+    Returns:
+        list: List of events
+    """
+    events = []
+    page_token = None
+    while True:
+        result = (
+            service.events()
+            .list(
+                calendarId=calendar_id,
+                maxResults=2500,
+                privateExtendedProperty=(
+                    [f"{k}={v}" for k, v in {**TOOL_TAGS, **tags}.items()]
+                    if tags
+                    else None
+                ),
+                pageToken=page_token,
+            )
+            .execute()
+        )
+        events.extend(result.get("items", []))
+        page_token = result.get("nextPageToken")
+        if not page_token:
+            return events
+
+
+def event_id(*parts):
+    """
+    Derives a deterministic event ID from the given parts
+    so that the same planned event always gets the same ID
+
+    Args:
+        *parts: Values identifying the event (calendar, course, section, slot, semester, ...)
+    Returns:
+        str: Event ID (base32hex, as required by Google Calendar)
+    """
+    digest = hashlib.sha1("|".join(map(str, parts)).encode()).digest()
+    return base64.b32hexencode(digest).decode().lower().rstrip("=")
+
+
+def class_event_id(i, start_date):
+    """
+    Gets the deterministic event ID of a class
+
+    Args:
+        i (ClassBlock): Class
+        start_date (str): Start date of the classes in the format YYYY-MM-DD
+    Returns:
+        str: Event ID
+    """
+    return event_id(
+        state.calendar_id,
+        "class",
+        i.title,
+        i.section,
+        ",".join(sorted(i.days)),
+        i.start,
+        get_semester(start_date),
+    )
+
+
+def exam_event_id(code, exam_type, start_time):
+    """
+    Gets the deterministic event ID of an exam
+
+    Args:
+        code (str): Course ID
+        exam_type (str): MIDSEM or COMPRE
+        start_time (str): Start time of the exam
+    Returns:
+        str: Event ID
+    """
+    return event_id(
+        state.calendar_id, "exam", code, exam_type, get_semester(start_time)
+    )
+
+
+def insert_event(service, event):
+    """
+    Inserts an event with a client-assigned ID, into the sub-calendar of its course if it has one
+    If the ID already exists (409), the event is overwritten instead,
+    so inserts can be retried or re-run safely without creating duplicates
+    The overwrite is journaled as an update, so rolling back the run leaves the event,
+    unless it had been deleted and the overwrite restored it
+
+    Args:
+        service (googleapiclient.discovery.Resource): Google Calendar API service
+        event (dict): Event body, including "id"
+    Returns:
+        dict: Created or updated event, None if the insert was queued
+    """
+    calendar_id, event = route_event(service, event)
+
+    def update():
+        # Also restores the event if it was deleted since it was first inserted
+        previous = (
+            service.events().get(calendarId=calendar_id, eventId=event["id"]).execute()
+        )
+        body = {**event, "status": "confirmed"}
+        return (
+            service.events().update(
+                calendarId=calendar_id, eventId=event["id"], body=body
+            ),
+            # A restored event is rolled back like an insert, an existing one is left
+            "insert" if previous.get("status") == "cancelled" else "update",
+            event["id"],
+            body,
+        )
+
+    return execute(
+        service.events().insert(calendarId=calendar_id, body=event),
+        "insert",
+        event["id"],
+        event,
+        on_conflict=update,
+        calendar=None if calendar_id == state.calendar_id else calendar_id,
+    )
+
+
+def del_events_by_id(service, event_ids, batch_size=50, calendar_id=None):
+    """
+    Deletes events by their IDs in batched requests, without listing them
+    Events that are already deleted are skipped
+
+    Args:
+        service (googleapiclient.discovery.Resource): Google Calendar API service
+        event_ids (list): IDs of the events
+        batch_size (int): Number of deletes per batch request (at most 50 for Google Calendar)
+        calendar_id (str): ID of the calendar the events are in, the Timetable calendar if None
+    Returns:
+        list: (Event ID, Exception) of the deletes that failed
+    """
+    failed = []
+
+    def callback(request_id, response, exception):
+        if exception is None:
+            return
+        if isinstance(exception, HttpError) and exception.resp.status in (404, 410):
+            return
+        failed.append((request_id, exception))
+
+    for i in range(0, len(event_ids), batch_size):
+        batch = service.new_batch_http_request(callback=callback)
+        for event_id in event_ids[i : i + batch_size]:
+            batch.add(
+                service.events().delete(
+                    calendarId=calendar_id or state.calendar_id, eventId=event_id
+                ),
+                request_id=event_id,
+            )
+        batch.execute()
+    return failed
+
+
+def month_ranges(start_date, end_date):
+    """
+    Splits a date range into the parts of it in each month
+
+    Args:
+        start_date (str): Start date in the format YYYY-MM-DD
+        end_date (str): End date in the format YYYY-MM-DD
+    Returns:
+        list: [(start_date, end_date), ...] in the format YYYY-MM-DD
+    """
+    start = datetime.date.fromisoformat(start_date)
+    end = datetime.date.fromisoformat(end_date)
+    ranges = []
+    while start <= end:
+        next_month = (start.replace(day=1) + datetime.timedelta(days=32)).replace(day=1)
+        month_end = min(end, next_month - datetime.timedelta(days=1))
+        ranges.append((start.isoformat(), month_end.isoformat()))
+        start = next_month
+    return ranges
+
+
+def confirm_ranges(start_date, end_date):
+    """
+    Asks before deleting events in a date range, month by month if it spans several months
+    (so a wide range isn't deleted on a single answer), and merges the consecutive months accepted
+
+    Args:
+        start_date (str): Start date in the format YYYY-MM-DD
+        end_date (str): End date in the format YYYY-MM-DD
+    Returns:
+        list: [(start_date, end_date), ...] of the ranges to delete events in
+    """
+    months = month_ranges(start_date, end_date)
+    if len(months) == 1:
+        f = input(
+            f"Are you sure you want to delete all events in the range {start_date} to {end_date}? (y/n): "
+        )
+        return months if f.lower() == "y" else []
+    print(f"The range {start_date} to {end_date} spans {len(months)} months")
+    ranges = []
+    accepted = False
+    for start, end in months:
+        f = input(
+            f"Are you sure you want to delete all events in the range {start} to {end}? (y/n): "
+        )
+        if f.lower() != "y":
+            accepted = False
+            continue
+        if accepted:
+            ranges[-1] = (ranges[-1][0], end)
+        else:
+            ranges.append((start, end))
+        accepted = True
+    return ranges
+
+
+def del_events(service, start_date, end_date, where=None, force=False, tags=None):
+    """
+    Deletes all events in the given date range
+    Can delete only the events matching a filter (see EventFilter),
+    series that match on only some of their days lose just those days
+    Asks for confirmation month by month over ranges spanning several months (see confirm_ranges),
+    or can force delete without confirmation
+
+    Args:
+        service (googleapiclient.discovery.Resource): Google Calendar API service
+        start_date (str): Start date in the format YYYY-MM-DD
+        end_date (str): End date in the format YYYY-MM-DD
+        where (str | EventFilter): Only delete events matching this filter
+        force (bool): Whether to force delete without confirmation
+        tags (dict): Only delete events with these private extended properties (filtered by the server)
+    Returns:
+        None
+    Raises:
+        ValueError: If the filter isn't valid
+    """
+    if not isinstance(where, EventFilter):
+        where = EventFilter(where or "")
+    pushed, query = where.pushdown()
+    events = get_events(
+        service,
+        start_date,
+        end_date,
+        {**pushed, **(tags or {})} or None,
+        single_events=False,
+        query=query,
+    )
+    ranges = [(start_date, end_date)] if force else confirm_ranges(start_date, end_date)
+    if not ranges:
+        return
+    bounds = [
+        (
+            datetime.datetime.strptime(start, "%Y-%m-%d").replace(tzinfo=IST),
+            datetime.datetime.strptime(f"{end}T23:59:59", "%Y-%m-%dT%H:%M:%S").replace(
+                tzinfo=IST
+            ),
+        )
+        for start, end in ranges
+    ]
+
+    def in_ranges(event):
+        moment = event_start(event)
+        day = (
+            moment.astimezone(IST).date().isoformat()
+            if moment
+            else event["start"]["date"]
+        )
+        return any(start <= day <= end for start, end in ranges)
+
+    targets = []
+    for event in events:
+        # Events in the default color are never deleted
+        if event_color(event) is None:
+            continue
+        if not event.get("recurrence") and not in_ranges(event):
+            continue  # In a month that wasn't confirmed
+        days = where.matching_days(event)
+        if days:
+            targets.append((event, days))
+
+    progress().start(f"Deleting events from {start_date} to {end_date}", len(targets))
+    for event, days in targets:
+        if event.get("recurrence"):
+            actions = []
+            for range_start, range_end in bounds:
+                if event.get("status") == "cancelled":
+                    break  # Deleted with an earlier range
+                actions.append(
+                    del_series_in_range(
+                        service,
+                        event,
+                        range_start,
+                        range_end,
+                        None if days == event_days(event) else days,
+                    )
+                )
+            action = next((i for i in reversed(actions) if i), None)
+            progress().step(action or "unchanged", event["summary"])
+            continue
+        execute(
+            service.events().delete(
+                calendarId=event_calendar(event), eventId=event["id"]
+            ),
+            "delete",
+            event["id"],
+            ignore=(404, 410),  # Deleted along with its series
+        )
+        progress().step("deleted", event["summary"])
+    flush_changes()
+    progress().finish()
+
+
+# endregion
+
+
+# region Recurrences
+
+
+def parse_recurrence(recurrence):
+    """
+    Parses the recurrence of a recurring event
+
+    Supports a single RRULE with FREQ DAILY or WEEKLY, and EXDATEs in UTC or IST
+
+    Args:
+        recurrence (list): Recurrence lines of the event (RRULE, EXDATE, ...)
+    Returns:
+        (dict, set): (RRULE parts, Excluded datetimes), or None if not supported
+    """
+    rule = None
+    exdates = set()
+    for line in recurrence:
+        name, _, value = line.partition(":")
+        if name == "RRULE" and rule is None:
+            rule = dict(i.split("=", 1) for i in value.split(";"))
+        elif name in ("EXDATE", "EXDATE;TZID=Asia/Kolkata"):
+            for i in value.split(","):
+                if i.endswith("Z"):
+                    exdates.add(
+                        datetime.datetime.strptime(i, "%Y%m%dT%H%M%SZ").replace(
+                            tzinfo=datetime.timezone.utc
+                        )
+                    )
+                else:
+                    exdates.add(
+                        datetime.datetime.strptime(i, "%Y%m%dT%H%M%S").replace(
+                            tzinfo=IST
+                        )
+                    )
+        else:
+            return None
+    if (
+        rule is None
+        or rule.get("FREQ") not in ("DAILY", "WEEKLY")
+        or set(rule) - {"FREQ", "INTERVAL", "BYDAY", "UNTIL", "COUNT", "WKST"}
+        or rule.get("WKST", "MO") != "MO"
+    ):
+        return None
+    return rule, exdates
+
+
+def parse_until(until):
+    """
+    Parses the UNTIL of an RRULE
+
+    Args:
+        until (str): UNTIL value (YYYYMMDDTHHMMSSZ or YYYYMMDD)
+    Returns:
+        datetime.datetime: Last possible start of an occurrence
+    """
+    if "T" in until:
+        return datetime.datetime.strptime(until, "%Y%m%dT%H%M%SZ").replace(
+            tzinfo=datetime.timezone.utc
+        )
+    return datetime.datetime.strptime(until + "T235959", "%Y%m%dT%H%M%S").replace(
+        tzinfo=IST
+    )
+
+
+def expand_rrule(start, rule, limit=None):
+    """
+    Expands an RRULE into the start times of its occurrences (before EXDATEs are applied)
+
+    Args:
+        start (datetime.datetime): Start of the first occurrence (timezone aware)
+        rule (dict): RRULE parts (see parse_recurrence)
+        limit (datetime.datetime): Stop after this time, required if the RRULE has no UNTIL or COUNT
+    Returns:
+        list: Start times of the occurrences, in order
+    """
+    until = parse_until(rule["UNTIL"]) if "UNTIL" in rule else None
+    count = int(rule["COUNT"]) if "COUNT" in rule else None
+    if until is None and count is None and limit is None:
+        raise ValueError("Unbounded RRULE needs a limit")
+    if limit is not None and (until is None or limit < until):
+        until = limit
+    interval = int(rule.get("INTERVAL", 1))
+    if "BYDAY" in rule:
+        weekdays = sorted(WEEKDAYS.index(i) for i in rule["BYDAY"].split(","))
+    else:
+        weekdays = [start.weekday()] if rule["FREQ"] == "WEEKLY" else list(range(7))
+
+    if rule["FREQ"] == "WEEKLY":
+        # Occurrences in each week of the series, starting from the week of the first occurrence
+        step = 7 * interval
+        offsets = [d - start.weekday() for d in weekdays]
+    else:
+        step = interval
+        offsets = [0]
+
+    occurrences = []
+    period = 0
+    while True:
+        for offset in offsets:
+            occurrence = start + datetime.timedelta(days=period * step + offset)
+            if occurrence < start or (
+                rule["FREQ"] == "DAILY" and occurrence.weekday() not in weekdays
+            ):
+                continue
+            if (until is not None and occurrence > until) or (
+                count is not None and len(occurrences) == count
+            ):
+                return occurrences
+            occurrences.append(occurrence)
+        period += 1
+
+
+def event_start(event):
+    """
+    Gets the start time of an event
+
+    Args:
+        event (dict): Event
+    Returns:
+        datetime.datetime: Start time (timezone aware), or None for all-day events
+    """
+    if "dateTime" not in event["start"]:
+        return None
+    return datetime.datetime.fromisoformat(event["start"]["dateTime"])
+
+
+def del_instances_in_range(service, master, range_start, range_end, days=None):
+    """
+    Deletes the instances of a recurring event in the given range one by one
+
+    Args:
+        service (googleapiclient.discovery.Resource): Google Calendar API service
+        master (dict): Master event of the series
+        range_start (datetime.datetime): Start of the range
+        range_end (datetime.datetime): End of the range
+        days (set): Only delete the instances on these weekdays (as in WEEKDAYS), if given
+    Returns:
+        int: Number of instances deleted
+    """
+    instances = []
+    page_token = None
+    while True:
+        result = (
+            service.events()
+            .instances(
+                calendarId=event_calendar(master),
+                eventId=master["id"],
+                timeMin=range_start.isoformat(),
+                timeMax=range_end.isoformat(),
+                pageToken=page_token,
+            )
+            .execute()
+        )
+        instances.extend(result.get("items", []))
+        page_token = result.get("nextPageToken")
+        if not page_token:
+            break
+    if days is not None:
+        instances = [i for i in instances if event_days(i) <= days]
+    for i in instances:
+        execute(
+            service.events().delete(calendarId=event_calendar(master), eventId=i["id"]),
+            "delete",
+            i["id"],
+            ignore=(404, 410),  # Already deleted
+        )
+    return len(instances)
+
+
+def del_series_in_range(service, master, range_start, range_end, days=None):
+    """
+    Deletes the occurrences of a recurring event in the given range with as few calls as possible
+
+    - Range covers the whole series: The master event is deleted
+    - Range covers the start of the series: The series is moved to start after the range
+    - Range covers the end of the series: The series' UNTIL is moved to before the range
+    - Range is inside the series: The occurrences are excluded with an EXDATE on the master event
+
+    Series without an UNTIL or COUNT never end, so they are only moved or excluded
+
+    Series that can't be expanded locally have their instances deleted one by one
+    If only some weekdays are deleted, their occurrences are excluded with an EXDATE
+
+    Args:
+        service (googleapiclient.discovery.Resource): Google Calendar API service
+        master (dict): Master event of the series, updated in place with the changes made
+        range_start (datetime.datetime): Start of the range
+        range_end (datetime.datetime): End of the range
+        days (set): Only delete the occurrences on these weekdays (as in WEEKDAYS), if given
+    Returns:
+        str: What was done to the series ("deleted", "moved", "shortened" or "excluded"), None if nothing
+    """
+    start = event_start(master)
+    parsed = parse_recurrence(master["recurrence"])
+    if (
+        parsed is None
+        or start is None
+        or start.utcoffset() != IST.utcoffset(None)
+        or master["start"].get("timeZone", "Asia/Kolkata") != "Asia/Kolkata"
+    ):
+        if del_instances_in_range(service, master, range_start, range_end, days):
+            return "excluded"
+        return None
+    rule, exdates = parsed
+    bounded = "UNTIL" in rule or "COUNT" in rule
+    # Unbounded series are expanded a period past the range, to find where a moved series starts
+    limit = range_end + datetime.timedelta(weeks=int(rule.get("INTERVAL", 1)))
+    occurrences = [
+        i
+        for i in expand_rrule(start, rule, limit=None if bounded else limit)
+        if i not in exdates
+    ]
+    inside = [
+        i
+        for i in occurrences
+        if range_start <= i <= range_end
+        and (days is None or WEEKDAYS[i.weekday()] in days)
+    ]
+    if not inside:
+        return None
+    # Occurrences of other weekdays are left in the range, so it can't be cut out of the series
+    partial = days is not None and len(inside) != sum(
+        1 for i in occurrences if range_start <= i <= range_end
+    )
+
+    recurrence = [i for i in master["recurrence"] if not i.startswith("RRULE:")]
+    if (
+        not partial
+        and inside[0] == occurrences[0]
+        and bounded
+        and inside[-1] == occurrences[-1]
+    ):
+        execute(
+            service.events().delete(
+                calendarId=event_calendar(master), eventId=master["id"]
+            ),
+            "delete",
+            master["id"],
+        )
+        master["status"] = "cancelled"
+        return "deleted"
+    elif not partial and inside[0] == occurrences[0] and len(occurrences) > len(inside):
+        new_start = occurrences[len(inside)]
+        duration = datetime.datetime.fromisoformat(
+            master["end"]["dateTime"]
+        ) - datetime.datetime.fromisoformat(master["start"]["dateTime"])
+        if "COUNT" in rule:
+            # COUNT would count from the new start, so it is replaced by the equivalent UNTIL
+            del rule["COUNT"]
+            rule["UNTIL"] = (
+                occurrences[-1]
+                .astimezone(datetime.timezone.utc)
+                .strftime("%Y%m%dT%H%M%SZ")
+            )
+        body = {
+            "start": {
+                "dateTime": new_start.isoformat(),
+                "timeZone": "Asia/Kolkata",
+            },
+            "end": {
+                "dateTime": (new_start + duration).isoformat(),
+                "timeZone": "Asia/Kolkata",
+            },
+            "recurrence": [format_rrule(rule)] + recurrence,
+        }
+        execute(
+            service.events().patch(
+                calendarId=event_calendar(master), eventId=master["id"], body=body
+            ),
+            "patch",
+            master["id"],
+            body,
+        )
+        master.update(body)
+        return "moved"
+    elif not partial and bounded and inside[-1] == occurrences[-1]:
+        rule.pop("COUNT", None)
+        rule["UNTIL"] = (
+            (inside[0] - datetime.timedelta(seconds=1))
+            .astimezone(datetime.timezone.utc)
+            .strftime("%Y%m%dT%H%M%SZ")
+        )
+        body = {"recurrence": [format_rrule(rule)] + recurrence}
+        execute(
+            service.events().patch(
+                calendarId=event_calendar(master), eventId=master["id"], body=body
+            ),
+            "patch",
+            master["id"],
+            body,
+        )
+        master.update(body)
+        return "shortened"
+    else:
+        body = {
+            "recurrence": master["recurrence"]
+            + [
+                "EXDATE;TZID=Asia/Kolkata:"
+                + ",".join(i.strftime("%Y%m%dT%H%M%S") for i in inside)
+            ]
+        }
+        execute(
+            service.events().patch(
+                calendarId=event_calendar(master), eventId=master["id"], body=body
+            ),
+            "patch",
+            master["id"],
+            body,
+        )
+        master.update(body)
+        return "excluded"
+
+
+def format_rrule(rule):
+    """
+    Formats RRULE parts back into a recurrence line
+
+    Args:
+        rule (dict): RRULE parts
+    Returns:
+        str: RRULE line
+    """
+    return "RRULE:" + ";".join(f"{k}={v}" for k, v in rule.items())
+
+
+def instance_id(master_id, occurrence):
+    """
+    Computes the ID Google Calendar gives an occurrence of a recurring event
+
+    Args:
+        master_id (str): ID of the master event
+        occurrence (datetime.datetime): Start of the occurrence (timezone aware)
+    Returns:
+        str: Instance ID (<master ID>_<UTC start as YYYYMMDDTHHMMSSZ>)
+    """
+    utc = occurrence.astimezone(datetime.timezone.utc)
+    return f"{master_id}_{utc:%Y%m%dT%H%M%SZ}"
+
+
+def expand_weekly(masters, dates=None):
+    """
+    Expands the recurrences of many master events at once, without any API calls
+    The dates of each weekday over the span of all the series are computed once
+    and shared by every simple weekly series, so each series only has to slice them
+    Given dates are looked up in the slices, so only the occurrences on them are made
+
+    Args:
+        masters (list): Master events (with id, start and recurrence)
+        dates (Iterable): Only expand the occurrences on these dates (YYYY-MM-DD), if given
+    Returns:
+        dict: Dictionary of master event IDs and lists of occurrence start times
+    """
+    if dates is not None:
+        dates = sorted(datetime.date.fromisoformat(i).toordinal() for i in set(dates))
+    expanded = {}
+    weekly = []
+    for master in masters:
+        if master.get("status") == "cancelled":
+            continue
+        start = event_start(master)
+        parsed = parse_recurrence(master["recurrence"])
+        if start is None or parsed is None:
+            continue
+        rule, exdates = parsed
+        if (
+            rule["FREQ"] != "WEEKLY"
+            or "UNTIL" not in rule
+            or "COUNT" in rule
+            or rule.get("INTERVAL", "1") != "1"
+        ):
+            expanded[master["id"]] = [
+                i
+                for i in expand_rrule(
+                    start, rule, limit=start + datetime.timedelta(days=366)
+                )
+                if i not in exdates and (dates is None or i.date().toordinal() in dates)
+            ]
+            continue
+        weekdays = (
+            [WEEKDAYS.index(i) for i in rule["BYDAY"].split(",")]
+            if "BYDAY" in rule
+            else [start.weekday()]
+        )
+        weekly.append(
+            (master["id"], start, parse_until(rule["UNTIL"]), weekdays, exdates)
+        )
+    if not weekly:
+        return expanded
+
+    first = min(i[1].date() for i in weekly)
+    last = max(i[2].astimezone(i[1].tzinfo).date() for i in weekly).toordinal()
+    # Ordinals of the dates in the span, by weekday
+    days = [
+        range(first.toordinal() + (d - first.weekday()) % 7, last + 1, 7)
+        for d in range(7)
+    ]
+    for master_id, start, until, weekdays, exdates in weekly:
+        low = start.date().toordinal()
+        high = until.astimezone(start.tzinfo).date().toordinal()
+        slices = []
+        for d in weekdays:
+            span = days[d]
+            # Indices of the first and past the last date inside the series
+            i = max(0, -((span.start - low) // 7))
+            j = max(i, (high - span.start) // 7 + 1)
+            slices.append(span[i:j])
+        if dates is None:
+            ordinals = sorted(o for i in slices for o in i)
+        else:
+            ordinals = [o for o in dates if any(o in i for i in slices)]
+        occurrences = []
+        for o in ordinals:
+            occurrence = datetime.datetime.combine(
+                datetime.date.fromordinal(o), start.timetz()
+            )
+            if occurrence <= until and occurrence not in exdates:
+                occurrences.append(occurrence)
+        expanded[master_id] = occurrences
+    return expanded
+
+
+def del_occurrences(service, masters, dates):
+    """
+    Deletes the occurrences of recurring events on the given dates by their instance IDs
+    The occurrences are expanded locally, so no events have to be listed first
+
+    Args:
+        service (googleapiclient.discovery.Resource): Google Calendar API service
+        masters (list): Master events (as added by add_classes)
+        dates (Iterable): Dates in the format YYYY-MM-DD
+    Returns:
+        int: Number of occurrences deleted
+    """
+    expanded = expand_weekly(masters, dates)
+    progress().set_total(sum(len(i) for i in expanded.values()))
+    deleted = 0
+    for master in masters:
+        for occurrence in expanded.get(master["id"], []):
+            event_id = instance_id(master["id"], occurrence)
+            execute(
+                service.events().delete(
+                    calendarId=event_calendar(master), eventId=event_id
+                ),
+                "delete",
+                event_id,
+                ignore=(404, 410),  # Already deleted
+            )
+            deleted += 1
+            progress().step("deleted", master["summary"])
+    flush_changes()
+    return deleted
+
+
+def del_series_list_in_range(service, masters, start_date, end_date):
+    """
+    Deletes the occurrences of known recurring events in the given date range without listing them
+
+    Args:
+        service (googleapiclient.discovery.Resource): Google Calendar API service
+        masters (list): Master events (as added by add_classes), updated in place
+        start_date (str): Start date in the format YYYY-MM-DD
+        end_date (str): End date in the format YYYY-MM-DD
+    Returns:
+        None
+    """
+    active = [i for i in masters if i.get("status") != "cancelled"]
+    progress().start(f"Deleting classes from {start_date} to {end_date}", len(active))
+    range_start = datetime.datetime.strptime(start_date, "%Y-%m-%d").replace(tzinfo=IST)
+    range_end = datetime.datetime.strptime(
+        f"{end_date}T23:59:59", "%Y-%m-%dT%H:%M:%S"
+    ).replace(tzinfo=IST)
+    for master in active:
+        action = del_series_in_range(service, master, range_start, range_end)
+        progress().step(action or "unchanged", master["summary"])
+    flush_changes()
+    progress().finish()
+
+
+def dates_between(start_date, end_date):
+    """
+    Lists the dates in a date range
+
+    Args:
+        start_date (str): Start date in the format YYYY-MM-DD
+        end_date (str): End date in the format YYYY-MM-DD (inclusive)
+    Returns:
+        list: Dates in the format YYYY-MM-DD
+    """
+    start = datetime.date.fromisoformat(start_date)
+    days = (datetime.date.fromisoformat(end_date) - start).days
+    return [(start + datetime.timedelta(days=i)).isoformat() for i in range(days + 1)]
+
+
+def exclude_dates(masters, dates):
+    """
+    Leaves the occurrences on the given dates out of recurring events before they are inserted,
+    with an EXDATE on each master event
+
+    Args:
+        masters (list): Master events, updated in place
+        dates (Iterable): Dates in the format YYYY-MM-DD
+    Returns:
+        int: Number of occurrences left out
+    """
+    excluded = 0
+    for master in masters:
+        occurrences = expand_weekly([master], dates).get(master["id"])
+        if not occurrences:
+            continue
+        master["recurrence"] = master["recurrence"] + [
+            "EXDATE;TZID=Asia/Kolkata:"
+            + ",".join(i.strftime("%Y%m%dT%H%M%S") for i in occurrences)
+        ]
+        excluded += len(occurrences)
+    return excluded
+
+
+# endregion
+
+
+# region Creating and Modifying Events
+
+
+def add_classes(service, classes, start_date, end_date, custom: dict, skip_dates=None):
+    """
+    Adds all classes in the given date range
+
+    Args:
+        service (googleapiclient.discovery.Resource): Google Calendar API service
+        classes (list): List of classes (ClassBlock)
+        start_date (str): Start date in the format YYYY-MM-DD
+        end_date (str): End date in the format YYYY-MM-DD
+        custom (dict): Customisation dictionary
+        skip_dates (list): Dates in the format YYYY-MM-DD to leave out of the classes (e.g. holidays)
+    Returns:
+        list: Master events added
+    """
+    added = class_events(classes, start_date, end_date, custom)
+    if skip_dates:
+        exclude_dates(added, skip_dates)
+    progress().start("Adding classes", len(added))
+    for event in added:
+        insert_event(service, event)
+        progress().step("added", event["summary"])
+    flush_changes()
+    progress().finish()
+    return added
+
+
+def class_events(classes, start_date, end_date, custom: dict):
+    """
+    Makes the master events of all classes in the given date range, without adding them
+    The parts of the description and title shared by the classes of a course or section are made once
+    Colors picked for courses are kept in state.course_colors, so they stay the same for the run
+
+    Args:
+        classes (list): List of classes (ClassBlock)
+        start_date (str): Start date in the format YYYY-MM-DD
+        end_date (str): End date in the format YYYY-MM-DD
+        custom (dict): Customisation dictionary
+    Returns:
+        list: Master events
+    """
+    first_day = datetime.date.fromisoformat(start_date)
+    semester = get_semester(start_date)
+    until = f"{end_date.replace('-', '')}T000000Z"
+    classes_colors = state.course_colors
+    prefixes = {}  # Course ID -> custom description
+    sections = {}  # (Course ID, section) -> description of the section
+    events = []
+
+    def get_color(i):
+        """
+        Gets the colorId for the event
+
+        Args:
+            i (ClassBlock): Class
+        Returns:
+            str: ColorId
+        """
+        if i.title in classes_colors:
+            return classes_colors[i.title]
+        if custom[i.title].get("color"):
+            classes_colors[i.title] = custom[i.title]["color"]
+            return custom[i.title]["color"]
+        elif custom["course_grouping"]:
+            # random unused color
+            l = [
+                x
+                for x in state.usable_colors
+                if str(x) not in list(classes_colors.values())
+            ]
+            if not l:
+                l = [
+                    x
+                    for x in classes_colors.values()
+                    if str(x) not in state.specified_colors
+                ]
+            x = str(random.choice(l))
+            classes_colors[i.title] = x
+            return x
+        else:
+            return custom["classes_color_ids"][i.type]
+
+    for i in classes:
+        prefix = prefixes.get(i.title)
+        if prefix is None:
+            desc = custom[i.title]["desc"]
+            prefix = prefixes[i.title] = desc + ("<br>" if desc else "")
+        key = (i.title, i.section)
+        section = sections.get(key)
+        if section is None:
+            section = sections[key] = (
+                f"<ul><li><b>{i.type} - {i.section}</b></li><li><b>{i.name}</b></li>"
+                "<br><u>Instructors</u>:<li>"
+                + "</li><li>".join(i.instructors)
+                + "</li></ul>"
+            )
+        day = i.first_date(first_day).isoformat()
+        events.append(
+            EventSpec(
+                class_event_id(i, start_date),
+                custom[i.title]["title"]
+                + ((" - " + i.type[0]) if custom["course_grouping"] else ""),
+                f"{day}T{i.start}+05:30",
+                f"{day}T{i.end}+05:30",
+                description=prefix + section,
+                location=i.location,
+                recurrence=f"RRULE:FREQ=WEEKLY;BYDAY={','.join(i.days)};UNTIL={until}",
+                reminder=custom["reminder"],
+                color_id=get_color(i),
+                tags=event_tags("class", i.title, semester, i.section),
+            ).body()
+        )
+    return events
+
+
+def del_classes_on_holidays(service, holidays, masters=None):
+    """
+    Deletes all classes on holidays
+
+    Args:
+        service (googleapiclient.discovery.Resource): Google Calendar API service
+        holidays (list): List of holidays in the format YYYY-MM-DD
+        masters (list): Master events of the classes if known, their occurrences are then deleted without listing
+    Returns:
+        None
+    """
+    progress().start("Deleting classes on holidays")
+    if masters is not None:
+        del_occurrences(service, masters, holidays)
+        progress().finish()
+        return
+    for i in holidays:
+        events = get_events(service, i, i, CLASS_TAGS)
+        for event in events:
+            execute(
+                service.events().delete(
+                    calendarId=event_calendar(event), eventId=event["id"]
+                ),
+                "delete",
+                event["id"],
+            )
+            progress().step("deleted", event["summary"])
+    flush_changes()
+    progress().finish()
+
+
+def exam_spec(exam, custom: dict, increment_exam_year=None):
+    """
+    Makes the event of an exam, without its room
+
+    Args:
+        exam (ExamSlot): Exam
+        custom (dict): Customisation dictionary
+        increment_exam_year (tuple): (from_year, to_year) to increment the year of the exam
+    Returns:
+        EventSpec: Event
+    """
+    cust_title = custom[exam.code]["title"]
+    title = exam.code if exam.code == cust_title else f"{exam.code} - {cust_title}"
+    start_time, end_time = exam.start, exam.end
+    if increment_exam_year:
+        start_time = start_time.replace(increment_exam_year[0], increment_exam_year[1])
+        end_time = end_time.replace(increment_exam_year[0], increment_exam_year[1])
+    return EventSpec(
+        exam_event_id(exam.code, exam.type, start_time),
+        title,
+        start_time,
+        end_time,
+        description=exam.type,
+        reminder=custom["reminder"],
+        color_id=custom["exam_color_id"],
+        tags=event_tags("exam", exam.code, get_semester(start_time)),
+    )
+
+
+def add_exams(
+    service,
+    exams,
+    exams_start_end_dates: dict,
+    custom: dict,
+    timetable_ID,
+    student_ID,
+    increment_exam_year: Tuple[str, str] | None = None,
+    masters=None,
+):
+    """
+    Adds all exams and deletes classes during exams
+
+    Args:
+        service (googleapiclient.discovery.Resource): Google Calendar API service
+        exams (list): List of exams
+        exams_start_end_dates (dict): Start and end dates of midsems and compres
+        custom (dict): Customisation dictionary
+        timetable_ID: Chrono timetable ID
+        student_ID (str): Student ID
+        increment_exam_year (tuple): (from_year, to_year) to increment the year of the exam
+        masters (list): Master events of the classes if known, their occurrences are then deleted without listing
+    Returns:
+        list: IDs of the exam events added
+    """
+    added = []
+    exam_rooms = {}
+    if custom["exam_rooms"]:
+        progress().note("Fetching exam room numbers...")
+    for i in custom["exam_rooms"]:
+        exam_rooms[i] = exam_room_numbers(
+            custom["exam_rooms"][i], timetable_ID, student_ID
+        )
+        save_seating_index(
+            i,
+            student_ID,
+            custom["exam_rooms"][i],
+            get_seating_index(custom["exam_rooms"][i]),
+        )
+    progress().start("Adding exams", len(exams))
+    for i in exams:
+        exam = ExamSlot.parse(i)
+        spec = exam_spec(exam, custom, increment_exam_year)
+        spec.location = exam_rooms.get(exam.type.lower(), {}).get(exam.code)
+        insert_event(service, spec.body())
+        added.append(spec.id)
+        progress().step("added", f"{exam.type} {spec.summary}")
+    flush_changes()
+    progress().finish()
+
+    if increment_exam_year:
+        for key, value in exams_start_end_dates.items():
+            exams_start_end_dates[key] = value.replace(
+                increment_exam_year[0], increment_exam_year[1]
+            )
+
+    for start_date, end_date in exam_periods(exams_start_end_dates):
+        if masters is not None:
+            del_series_list_in_range(service, masters, start_date, end_date)
+        else:
+            del_events(service, start_date, end_date, force=True, tags=CLASS_TAGS)
+    return added
+
+
+def add_exam_rooms(
+    service,
+    room_numbers,
+    examtype,
+    increment_exam_year: Tuple[str, str] | None = None,
+    exams=None,
+):
+    """
+    Adds room numbers to the already created exam events
+    Exams added before events were tagged (by older versions) are found by their title instead
+
+    Args:
+        service (googleapiclient.discovery.Resource): Google Calendar API service
+        room_numbers (dict): Dictionary of course IDs and room numbers
+        examtype (str): midsem or compre
+        increment_exam_year (tuple): (from_year, to_year) to increment the year of the exam
+        exams (list): Exams of the student (as in the timetable), only their dates are listed if given
+    Returns:
+        None
+    """
+    progress().note(f"Room numbers: {room_numbers}")
+    if exams is not None:
+        exams_start_end_dates = get_exam_windows(exams)
+        if f"{examtype}_start_date" not in exams_start_end_dates:
+            progress().note(f"No {examtype}s in the timetable")
+            return
+    else:
+        exams_start_end_dates = get_exams_start_end_dates()
+    if increment_exam_year:
+        for key, value in exams_start_end_dates.items():
+            exams_start_end_dates[key] = value.replace(
+                increment_exam_year[0], increment_exam_year[1]
+            )
+    start_date = exams_start_end_dates[f"{examtype}_start_date"]
+    end_date = exams_start_end_dates[f"{examtype}_end_date"]
+    found = {}
+    for event in get_events(service, start_date, end_date, EXAM_TAGS):
+        found.setdefault(event["extendedProperties"]["private"]["course"], event)
+    if any(i not in found for i in room_numbers):
+        # Exams added before events were tagged can only be told apart by their title
+        for event in get_events(service, start_date, end_date):
+            if "course" in event.get("extendedProperties", {}).get("private", {}):
+                continue
+            for course_code in room_numbers:
+                if course_code not in found and event.get("summary", "").startswith(
+                    course_code
+                ):
+                    found[course_code] = event
+    progress().start("Adding room numbers", len(room_numbers))
+    for course_code, room_number in room_numbers.items():
+        event = found.get(course_code)
+        if event is None:
+            progress().note(f"Warning: No {examtype} event found for {course_code}")
+            progress().step("not found", course_code)
+            continue
+        event["location"] = room_number
+        execute(
+            service.events().update(
+                calendarId=event_calendar(event),
+                eventId=event["id"],
+                body=event,
+            ),
+            "update",
+            event["id"],
+            event,
+        )
+        progress().step("updated", event["summary"])
+    progress().finish()
+
+
+def revise_exam_rooms(
+    service, old_index, new_index, exams, student_ID, examtype, changed=None
+):
+    """
+    Updates the rooms of a student's exams that changed between two revisions of the seating arrangement
+    Only the exam events whose room changed are updated, by their IDs (nothing is listed)
+
+    Args:
+        service (googleapiclient.discovery.Resource): Google Calendar API service
+        old_index (list): Seating arrangement applied before (see compile_seating_index),
+            only its rows seating the student are needed (see load_seating_index)
+        new_index (list): Revised seating arrangement
+        exams (list): Exams of the student (as in the timetable)
+        student_ID (str): Student ID
+        examtype (str): midsem or compre
+        changed (set): Course cells that changed (see diff_seating_index), found from the indexes if None
+    Returns:
+        dict: Course IDs and their (old room, new room), for the rooms that changed
+    """
+    if changed is None:
+        changed = diff_seating_index(
+            student_rows(old_index, student_ID), student_rows(new_index, student_ID)
+        )
+    times = {}
+    for i in exams:
+        exam = ExamSlot.parse(i)
+        if exam.type.lower() == examtype:
+            times[exam.code] = (exam.type, exam.start)
+    courses = [i for i in times if any(match_course(cell, [i]) for cell in changed)]
+    if not courses:
+        return {}
+    old = rooms_from_index(old_index, courses, student_ID)
+    new = rooms_from_index(new_index, courses, student_ID)
+    revised = {}
+    for code in courses:
+        if old.get(code) == new.get(code):
+            continue
+        event_id = exam_event_id(code, *times[code])
+        body = {"location": new.get(code, "")}
+        response = execute(
+            service.events().patch(
+                calendarId=course_calendar(code, "exam"), eventId=event_id, body=body
+            ),
+            "patch",
+            event_id,
+            body,
+            ignore=(404, 410),
+        )
+        if response is None:
+            progress().note(f"Exam event not found for {code}")
+            continue
+        revised[code] = (old.get(code), new.get(code))
+    return revised
+
+
+def print_revision(student_ID, revised):
+    """
+    Prints the rooms of a student that changed
+
+    Args:
+        student_ID (str): Student ID
+        revised (dict): Course IDs and their (old room, new room)
+    Returns:
+        None
+    """
+    if not revised:
+        print(f"{student_ID}: No rooms changed")
+    for code, (old, new) in revised.items():
+        print(f"{student_ID}: {code} {old or '-'} -> {new or '-'}")
+
+
+def revise_seating(filepath, examtype, cohort_path):
+    """
+    Applies a revised seating arrangement pdf to the calendars of a cohort of students,
+    updating only the exams whose room changed since the last applied revision
+
+    Args:
+        filepath (str): Path to the revised seating arrangement pdf file
+        examtype (str): midsem or compre
+        cohort_path (str): Path to a config listing the students, in the format of watch.json (refer README.md)
+    Returns:
+        dict: Student IDs and their revised rooms (see revise_exam_rooms)
+    """
+    with open(cohort_path, "r") as f:
+        cohort = json.load(f)["timetables"]
+    new_index = get_seating_index(filepath)
+
+    report = {}
+    for entry in cohort:
+        old_index = load_seating_index(examtype, entry["student_ID"])
+        if old_index is None:
+            print(
+                f"{entry['student_ID']}: No earlier seating arrangement saved, setting every room"
+            )
+            old_index = []
+        service = api_build(
+            "calendar",
+            "v3",
+            credentials=load_credentials(entry.get("token", "token.json")),
+        )
+        state.calendar_id = entry.get("calendar_id") or get_calendar_id(service)
+        report[entry["student_ID"]] = revise_exam_rooms(
+            service,
+            old_index,
+            new_index,
+            get_timetable(entry["timetable_ID"])["examTimes"],
+            entry["student_ID"],
+            examtype,
+        )
+        print_revision(entry["student_ID"], report[entry["student_ID"]])
+        save_seating_index(examtype, entry["student_ID"], filepath, new_index)
+    return report
+
+
+# endregion
+
+
+# region Course Catalogue
+
+
+def iter_json_array(chunks):
+    """
+    Incrementally parses a JSON array of objects, yielding each element as soon as it is complete
+
+    Args:
+        chunks (iterable): Chunks of the JSON text
+    Yields:
+        Any: Elements of the array
+    """
+    decoder = json.JSONDecoder()
+    buf = ""
+    started = False
+    for chunk in chunks:
+        buf += chunk
+        pos = 0
+        while True:
+            while pos < len(buf) and buf[pos] in " \t\r\n,":
+                pos += 1
+            if pos == len(buf):
+                break
+            if not started:
+                if buf[pos] != "[":
+                    raise ValueError("Expected a JSON array")
+                started = True
+                pos += 1
+                continue
+            if buf[pos] == "]":
+                return
+            try:
+                element, end = decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                break  # Incomplete element, wait for the next chunk
+            if end == len(buf) and isinstance(element, (int, float)):
+                break  # The number may go on in the next chunk
+            pos = end
+            yield element
+        buf = buf[pos:]
+    raise ValueError("Unterminated JSON array")
+
+
+class CourseCatalogue:
+    """
+    Compact, read-only index of the Chrono course catalogue
+    Only the fields used by the script are kept, in columns indexed by course ID
+    """
+
+    __slots__ = ("index", "names", "times")
+
+    EXAM_FIELDS = (
+        "midsemStartTime",
+        "midsemEndTime",
+        "compreStartTime",
+        "compreEndTime",
+    )
+
+    def __init__(self, courses):
+        """
+        Args:
+            courses (iterable): Course records from the Chrono API
+        """
+        self.index = {}  # Course ID -> row
+        self.names = []
+        # Exam times in epoch seconds (-1 if not scheduled), EXAM_FIELDS for each course in order
+        self.times = array("q")
+        for i in courses:
+            self.index[i["id"]] = len(self.names)
+            self.names.append(i["name"])
+            for field in self.EXAM_FIELDS:
+                t = i.get(field)
+                self.times.append(
+                    int(
+                        datetime.datetime.fromisoformat(
+                            t.replace("Z", "+00:00")
+                        ).timestamp()
+                    )
+                    if t
+                    else -1
+                )
+
+    def __len__(self):
+        return len(self.names)
+
+    def __contains__(self, course_id):
+        return course_id in self.index
+
+    def name(self, course_id):
+        """
+        Gets the name of a course
+
+        Args:
+            course_id (str): Chrono course ID
+        Returns:
+            str: Course name
+        """
+        return self.names[self.index[course_id]]
+
+    def exam_range(self):
+        """
+        Gets the earliest and latest time of each exam field across the catalogue, in one pass
+
+        Args:
+            None
+        Returns:
+            dict: EXAM_FIELDS and their (earliest, latest) dates in the format YYYY-MM-DD (UTC, like the API)
+        """
+        width = len(self.EXAM_FIELDS)
+        low = [math.inf] * width
+        high = [-math.inf] * width
+        for n, t in enumerate(self.times):
+            if t >= 0:
+                low[n % width] = min(low[n % width], t)
+                high[n % width] = max(high[n % width], t)
+        return {
+            field: tuple(
+                datetime.datetime.fromtimestamp(t, datetime.timezone.utc).strftime(
+                    "%Y-%m-%d"
+                )
+                for t in (low[n], high[n])
+            )
+            for n, field in enumerate(self.EXAM_FIELDS)
+        }
+
+
+def load_course_catalogue(response=None):
+    """
+    Downloads the course catalogue, parsing the response as a stream
+
+    Args:
+        response (requests.Response): Already requested streamed response, if any
+    Returns:
+        CourseCatalogue: Course catalogue
+    """
+    if response is None:
+        response = requests.get("https://chrono.crux-bphc.com/api/course", stream=True)
+    response.encoding = response.encoding or "utf-8"
+    with response:
+        return CourseCatalogue(
+            iter_json_array(
+                response.iter_content(chunk_size=65536, decode_unicode=True)
+            )
+        )
+
+
+def get_course_catalogue():
+    """
+    Gets the course catalogue, shared by every timetable loaded in this process
+    Waits for the prefetch if it is running
+
+    Args:
+        None
+    Returns:
+        CourseCatalogue: Course catalogue
+    """
+    return prefetcher.result(("courses",), load_course_catalogue, ttl=CATALOGUE_TTL)
+
+
+# endregion
+
+
+# region PDF Tables
+
+
+def page_rules(page):
+    """
+    Reads the horizontal and vertical rules drawn on a pdf page
+    Rules spanning the whole page (borders, backgrounds) are left out
+
+    Args:
+        page (pypdfium2.PdfPage): Page
+    Returns:
+        (list, list): (Horizontal rules as (y, x0, x1), Vertical rules as (x, y0, y1)) from the top left,
+            or None if the page has curves or rotated paths
+    """
+    width, height = page.get_width(), page.get_height()
+    horizontal, vertical = [], []
+    x, y = ctypes.c_float(), ctypes.c_float()
+    for obj in page.get_objects(filter=[pdfium_c.FPDF_PAGEOBJ_PATH], max_depth=1):
+        a, b, c, d, e, f = obj.get_matrix().get()
+        if b or c:
+            return None
+        start = prev = None
+        for i in range(pdfium_c.FPDFPath_CountSegments(obj.raw)):
+            segment = pdfium_c.FPDFPath_GetPathSegment(obj.raw, i)
+            pdfium_c.FPDFPathSegment_GetPoint(segment, x, y)
+            point = (a * x.value + e, height - (d * y.value + f))
+            kind = pdfium_c.FPDFPathSegment_GetType(segment)
+            if kind == pdfium_c.FPDF_SEGMENT_MOVETO:
+                start = prev = point
+                continue
+            if kind != pdfium_c.FPDF_SEGMENT_LINETO:
+                return None
+            lines = [(prev, point)]
+            if pdfium_c.FPDFPathSegment_GetClose(segment):
+                lines.append((point, start))
+            for (x0, y0), (x1, y1) in lines:
+                if abs(y0 - y1) < 0.5 and abs(x0 - x1) > RULE_TOLERANCE:
+                    horizontal.append((y0, min(x0, x1), max(x0, x1)))
+                elif abs(x0 - x1) < 0.5 and abs(y0 - y1) > RULE_TOLERANCE:
+                    vertical.append((x0, min(y0, y1), max(y0, y1)))
+            prev = point
+    return (
+        [i for i in horizontal if i[2] - i[1] < width - 2],
+        [i for i in vertical if i[2] - i[1] < height - 2],
+    )
+
+
+def merge_positions(positions):
+    """
+    Merges positions closer than RULE_TOLERANCE (e.g. both edges of a thick rule)
+
+    Args:
+        positions (Iterable): Positions
+    Returns:
+        list: Sorted merged positions
+    """
+    clusters = []
+    for i in sorted(positions):
+        if clusters and i - clusters[-1][-1] <= RULE_TOLERANCE:
+            clusters[-1].append(i)
+        else:
+            clusters.append([i])
+    return [sum(i) / len(i) for i in clusters]
+
+
+def rule_spans(rules, positions):
+    """
+    Merges the rules at each position into the spans they cover
+
+    Args:
+        rules (list): Rules as (position, start, end)
+        positions (list): Merged positions of the rules
+    Returns:
+        list: Lists of [start, end] spans, one for each position
+    """
+    grouped = [[] for _ in positions]
+    for position, start, end in rules:
+        i = bisect.bisect(positions, position)
+        if i == len(positions) or (
+            i and position - positions[i - 1] < positions[i] - position
+        ):
+            i -= 1
+        grouped[i].append((start, end))
+    spans = []
+    for group in grouped:
+        merged = []
+        for start, end in sorted(group):
+            if merged and start <= merged[-1][1] + RULE_TOLERANCE:
+                merged[-1][1] = max(merged[-1][1], end)
+            else:
+                merged.append([start, end])
+        spans.append(merged)
+    return spans
+
+
+def covers(spans, start, end):
+    """
+    Checks if a rule runs along the whole of a cell's side
+
+    Args:
+        spans (list): Spans of the rules at the side's position
+        start (float): Start of the side
+        end (float): End of the side
+    Returns:
+        bool: Whether the side is ruled
+    """
+    return any(
+        i <= start + RULE_TOLERANCE and j >= end - RULE_TOLERANCE for i, j in spans
+    )
+
+
+def page_chars(page, textpage):
+    """
+    Reads the characters of a pdf page with their boxes
+
+    Args:
+        page (pypdfium2.PdfPage): Page
+        textpage (pypdfium2.PdfTextPage): Text of the page
+    Returns:
+        list: Characters as (x0, top, x1, bottom, text, follows a space) from the top left
+    """
+    height = page.get_height()
+    count = textpage.count_chars()
+    text = textpage.get_text_range(0, count)
+    chars = []
+    space = False
+    for i, char in enumerate(text):
+        if char in "\r\n":
+            continue
+        if pdfium_c.FPDFText_IsGenerated(textpage.raw, i) == 1:
+            # PDFium replaces some spaces with its own, they only separate words on the same line
+            space = True
+            continue
+        x0, bottom, x1, top = textpage.get_charbox(i, loose=True)
+        top = height - top
+        space = (
+            space
+            and chars
+            and abs(top - chars[-1][1]) <= 3
+            and x0 >= chars[-1][2] - 0.5
+        )
+        chars.append(
+            (x0, top, x1, height - bottom, "-" if char == "\ufffe" else char, space)
+        )
+        space = False
+    return chars
+
+
+def cell_text(chars):
+    """
+    Joins the characters of a cell into lines of words, the way pdfplumber does
+
+    Args:
+        chars (list): Characters of the cell (see page_chars)
+    Returns:
+        str: Text of the cell
+    """
+    lines = []
+    for char in sorted(chars, key=lambda i: i[1]):
+        if lines and char[1] - lines[-1][-1][1] <= 3:
+            lines[-1].append(char)
+        else:
+            lines.append([char])
+    text = []
+    for line in lines:
+        words = []
+        prev = None
+        for char in sorted(line, key=lambda i: i[0]):
+            if char[4].isspace():
+                prev = None
+                continue
+            if prev is None or char[0] > prev[2] + 3 or char[5]:
+                words.append("")
+            words[-1] += char[4]
+            prev = char
+        text.append(" ".join(words))
+    return "\n".join(text)
+
+
+def page_table_rows(page, textpage, columns=None):
+    """
+    Rebuilds the rows of the ruled table on a pdf page from its characters,
+    without pdfplumber's generic table finder
+    Rows come from the horizontal rules, columns from the vertical rules or the given boundaries
+    Characters are sorted top to bottom and swept into rows, then placed in columns by their x,
+    and cells without a rule on their top or left side are merged into the cell above or to their left
+
+    Args:
+        page (pypdfium2.PdfPage): Page
+        textpage (pypdfium2.PdfTextPage): Text of the page
+        columns (list): x of the column boundaries, learned from the vertical rules if None
+            (rules are still used to merge cells if there are any)
+    Returns:
+        list: Table rows (lists of cells, None for merged cells), or None if the page can't be read this way
+    """
+    rules = page_rules(page)
+    if rules is None:
+        return None
+    horizontal, vertical = rules
+    ys = merge_positions(i[0] for i in horizontal)
+    xs = sorted(columns) if columns else merge_positions(i[0] for i in vertical)
+    if len(ys) < 2 or len(xs) < 2:
+        return None
+    row_spans = rule_spans(horizontal, ys)
+    # Pages without vertical rules need configured columns, every boundary of which is taken as ruled
+    column_spans = rule_spans(vertical, xs) if vertical else None
+    n_rows, n_columns = len(ys) - 1, len(xs) - 1
+    top = [
+        [covers(row_spans[r], xs[c], xs[c + 1]) for c in range(n_columns)]
+        for r in range(n_rows)
+    ]
+    left = [
+        [
+            column_spans is None or covers(column_spans[c], ys[r], ys[r + 1])
+            for c in range(n_columns)
+        ]
+        for r in range(n_rows)
+    ]
+
+    cells = {}
+    r = 0
+    for char in sorted(page_chars(page, textpage), key=lambda i: i[1] + i[3]):
+        y = (char[1] + char[3]) / 2
+        while r < n_rows and y > ys[r + 1]:
+            r += 1
+        if r == n_rows:
+            break
+        c = bisect.bisect(xs, (char[0] + char[2]) / 2) - 1
+        if y < ys[0] or not 0 <= c < n_columns:
+            continue
+        # Origin of the merged cell the character is in
+        i, j = r, c
+        while i and not top[i][j]:
+            i -= 1
+        while j and not left[i][j]:
+            j -= 1
+        cells.setdefault((i, j), []).append(char)
+
+    rows = []
+    for r in range(n_rows):
+        row = [
+            cell_text(cells.get((r, c), [])) if top[r][c] and left[r][c] else None
+            for c in range(n_columns)
+        ]
+        if any(i is not None for i in row):
+            rows.append(row)
+    return rows
+
+
+# endregion
+
+
+# region Timetable Helper Functions
+
+
+def get_exams_start_end_dates():
+    """
+    Gets the start and end dates of midsems and compres across all courses of the catalogue
+
+    Args:
+        None
+    Returns:
+        dict: Start and end dates of midsems and compres
+    """
+    times = get_course_catalogue().exam_range()
+
+    return {
+        "midsem_start_date": times["midsemStartTime"][0],
+        "midsem_end_date": times["midsemEndTime"][1],
+        "compre_start_date": times["compreStartTime"][0],
+        "compre_end_date": times["compreEndTime"][1],
+    }
+
+
+def get_exam_windows(exams):
+    """
+    Gets the start and end dates of the student's own midsems and compres, in one pass over their exams
+    Classes are only deleted between a student's first and last exam of each type (see blackout_days for more)
+
+    Args:
+        exams (list): Exams (as in the timetable)
+    Returns:
+        dict: Start and end dates of midsems and compres (like get_exams_start_end_dates),
+            without the exam types the student has no exams of
+    """
+    windows = {}
+    for i in exams:
+        exam = ExamSlot.parse(i)
+        exam_type = exam.type.lower()
+        start_date, end_date = (
+            datetime.datetime.fromisoformat(t.replace("Z", "+00:00"))
+            .astimezone(IST)
+            .strftime("%Y-%m-%d")
+            for t in (exam.start, exam.end)
+        )
+        key = f"{exam_type}_start_date"
+        windows[key] = min(windows.get(key, start_date), start_date)
+        key = f"{exam_type}_end_date"
+        windows[key] = max(windows.get(key, end_date), end_date)
+    return windows
+
+
+def exam_periods(exams_start_end_dates):
+    """
+    Lists the exam periods of the given start and end dates
+
+    Args:
+        exams_start_end_dates (dict): Start and end dates of midsems and compres
+    Returns:
+        list: (Start date, End date) of each exam type present, midsems first
+    """
+    return [
+        (
+            exams_start_end_dates[f"{i}_start_date"],
+            exams_start_end_dates[f"{i}_end_date"],
+        )
+        for i in ("midsem", "compre")
+        if f"{i}_start_date" in exams_start_end_dates
+    ]
+
+
+def fetch_timetable(timetable_ID):
+    """
+    Downloads the timetable
+
+    Args:
+        timetable_ID: Chrono timetable ID
+    Returns:
+        dict: Timetable
+    """
+    # Found Chrono API endpoints by inspecting network traffic
+    return json.loads(
+        requests.get(f"https://chrono.crux-bphc.com/api/timetable/{timetable_ID}").text
+    )
+
+
+def load_timetable(timetable_ID):
+    """
+    Gets the timetable, waiting for the prefetch if it is running
+
+    Args:
+        timetable_ID: Chrono timetable ID
+    Returns:
+        dict: Timetable
+    """
+    return prefetcher.result(
+        ("timetable", timetable_ID), fetch_timetable, timetable_ID, ttl=TIMETABLE_TTL
+    )
+
+
+def get_timetable(timetable_ID):
+    """
+    Gets the timetable, waiting for the prefetch if it is running
+    Exits if the timetable can't be accessed
+
+    Args:
+        timetable_ID: Chrono timetable ID
+    Returns:
+        dict: Timetable
+    """
+    timetable = load_timetable(timetable_ID)
+
+    try:
+        if not timetable["sections"]:
+            print("ID Error. Can't access timetable.")
+            exit()
+    except KeyError:
+        print("ID Error. Can't access timetable.")
+        exit()
+
+    return timetable
+
+
+def iter_table_rows(filepath, pages=None, engine=None, columns=None):
+    """
+    Yields the rows of all tables in the pdf, one page at a time
+    Each page is released before the next page is read and the file is closed once done,
+    so memory stays flat regardless of page count
+
+    The "words" engine rebuilds the tables from the characters and rules of each page (see page_table_rows),
+    falling back to pdfplumber's table finder on pages it can't read
+
+    Args:
+        filepath (str): Path to the pdf file
+        pages (list): Page numbers (starting at 1) to read, all pages if None
+        engine (str): "words" or "tables", PDF_ENGINE if None
+        columns (list): x of the column boundaries for the "words" engine, learned from each page if None
+    Yields:
+        list: Table row (list of cells)
+    """
+    if (engine or PDF_ENGINE) == "tables":
+        with pdfplumber.open(filepath, pages=pages) as pdf:
+            for page in pdf.pages:
+                for table in page.extract_tables():
+                    yield from table
+                page.close()  # Releases the page's object cache
+        return
+
+    with PDFIUM_LOCK:
+        pdf = pypdfium2.PdfDocument(filepath)
+    try:
+        for number in pages or range(1, len(pdf) + 1):
+            with PDFIUM_LOCK:
+                page = pdf[number - 1]
+                textpage = page.get_textpage()
+                rows = page_table_rows(page, textpage, columns)
+                textpage.close()
+                page.close()
+            if rows is None:
+                yield from iter_table_rows(filepath, [number], engine="tables")
+            else:
+                yield from rows
+    finally:
+        with PDFIUM_LOCK:
+            pdf.close()
+
+
+def get_holidays(filepath):
+    """
+    Extracts list of holidays from the pdf
+
+    Args:
+        filepath (str): Path to the holiday calendar pdf file
+    Returns:
+        list: List of holidays in the format YYYY-MM-DD
+    """
+    holidays = []
+    for j in iter_table_rows(filepath):
+        if j[1] and j[1].endswith("(H)"):
+            holidays.append(
+                datetime.datetime.strptime(j[0][: j[0].index("(")].strip(), "%B %d")
+            )  # Extracts the date from the table
+    for i in range(len(holidays)):
+        holidays[i] = (
+            holidays[i]
+            .replace(
+                year=datetime.datetime.today().year
+                + (not (datetime.datetime.today().month <= holidays[i].month))
+            )
+            .strftime("%Y-%m-%d")
+        )  # If the holiday is in the next year, add 1 to the year
+    return sorted(holidays)
+
+
+def get_holiday_list():
+    """
+    Gets the holidays from the holiday calendar pdf, shared by every run in this process
+    Waits for the prefetch if it is running
+
+    Args:
+        None
+    Returns:
+        list: List of holidays in the format YYYY-MM-DD
+    """
+    return prefetcher.result(
+        ("holidays", HOLIDAY_LIST_PATH, os.path.getmtime(HOLIDAY_LIST_PATH)),
+        get_holidays,
+        HOLIDAY_LIST_PATH,
+        ttl=24 * 3600,  # The year of each holiday depends on today's date
+    )
+
+
+def get_courses_enrolled(timetable_ID):
+    """
+    Gets all courses enrolled in the given timetable
+
+    Args:
+        timetable_ID: Chrono timetable ID
+    Returns:
+        list: List of courses enrolled (course IDs)
+    """
+    timetable = get_timetable(timetable_ID)
+
+    courses_enrolled = []
+    for i in timetable["examTimes"]:
+        courses_enrolled.append(ExamSlot.parse(i).code)
+
+    return courses_enrolled
+
+
+def compile_seating_index(filepath):
+    """
+    Compiles the seating arrangement pdf into a list of rooms,
+    each with the course cell of the table it belongs to, independent of any student
+
+    **Compatible with Compre 23-24 Sem 2**
+
+    Args:
+        filepath (str): Path to the seating arrangement pdf file
+    Returns:
+        list: List of (Course cell, Room, ID range) tuples
+    """
+    index = []
+
+    # Parsing the tables of the pdf
+    cur_cell = ""  # Carried across pages, as a course's rows can span pages
+    for j in iter_table_rows(filepath):
+        try:
+            if any(
+                [
+                    j[0].startswith(x)
+                    for x in [
+                        "BITS-PILANI",
+                        "MID-SEMESTER",
+                        "MIDSEMESTER",
+                        "MID SEMESTER",
+                        "SEATING",
+                        "COMPREHENSIVE",
+                        "COURSE",
+                        "Course",
+                    ]
+                ]
+            ):  # Skip headers
+                continue
+            if j[0] != "":  # Empty for courses with multiple rooms
+                cur_cell = j[0]
+            index.append((cur_cell, j[3], j[4]))
+        except:
+            print(f"Error in PDF format for column:\n{j}")
+
+    return index
+
+
+def get_seating_index(filepath):
+    """
+    Gets the compiled seating arrangement, shared by every student in this process
+
+    Args:
+        filepath (str): Path to the seating arrangement pdf file
+    Returns:
+        list: List of (Course cell, Room, ID range) tuples
+    """
+    return prefetcher.result(
+        ("seating", filepath, os.path.getmtime(filepath)),
+        compile_seating_index,
+        filepath,
+    )
+
+
+def match_course(cell, courses_enrolled):
+    """
+    Finds the enrolled course a course cell of the seating arrangement belongs to
+
+    Args:
+        cell (str): Course cell
+        courses_enrolled (list): List of courses enrolled (course IDs)
+    Returns:
+        str: Course ID, or "" if the cell isn't of an enrolled course
+    """
+    if any(x in cell for x in courses_enrolled):  # If course is enrolled
+        return next(x for x in courses_enrolled if x in cell)
+    elif (
+        "CS/ECE/EEE/I" in cell
+        and "F215" in cell
+        and any(
+            x in courses_enrolled
+            for x in ["CS F215", "ECE F215", "EEE F215", "INSTR F215"]
+        )
+    ):  # DD
+        return next(
+            x
+            for x in courses_enrolled
+            if x in ["CS F215", "ECE F215", "EEE F215", "INSTR F215"]
+        )
+    return ""
+
+
+def get_room_numbers(filepath, courses_enrolled, student_ID):
+    """
+    Extracts room numbers for enrolled courses from the pdf
+
+    Args:
+        filepath (str): Path to the seating arrangement pdf file
+        courses_enrolled (list): List of courses enrolled (course IDs)
+        student_ID (str): Student ID
+    Returns:
+        dict: Dictionary of course IDs and room numbers
+    """
+    return rooms_from_index(get_seating_index(filepath), courses_enrolled, student_ID)
+
+
+def rooms_from_index(index, courses_enrolled, student_ID):
+    """
+    Finds the room numbers of a student's courses in a compiled seating arrangement
+
+    Args:
+        index (list): List of (Course cell, Room, ID range) tuples (see compile_seating_index)
+        courses_enrolled (list): List of courses enrolled (course IDs)
+        student_ID (str): Student ID
+    Returns:
+        dict: Dictionary of course IDs and room numbers
+    """
+    room_numbers = {}
+    courses = {}  # Course cell -> enrolled course
+    for cell, room, id_range in index:
+        if cell not in courses:
+            courses[cell] = match_course(cell, courses_enrolled)
+        if not courses[cell]:
+            continue
+        try:
+            ids = id_range.split("to")
+            if ids[0].strip() <= student_ID <= ids[1].strip():
+                room_numbers[courses[cell]] = room
+        except:
+            print(f"Error in PDF format for column:\n{(cell, room, id_range)}")
+
+    return room_numbers
+
+
+def student_rows(index, student_ID):
+    """
+    Gets the rows of a seating arrangement that seat a student
+
+    Args:
+        index (list): List of (Course cell, Room, ID range) tuples (see compile_seating_index)
+        student_ID (str): Student ID
+    Returns:
+        list: The rows whose ID range includes the student
+    """
+    rows = []
+    for row in index:
+        ids = row[2].split("to")
+        if len(ids) == 2 and ids[0].strip() <= student_ID <= ids[1].strip():
+            rows.append(row)
+    return rows
+
+
+def load_seating_index(examtype, student_ID, path=SEATING_INDEX_PATH):
+    """
+    Loads the seating arrangement last applied to a student's calendar for an exam type
+
+    Args:
+        examtype (str): midsem or compre
+        student_ID (str): Student ID
+        path (str): Path to the saved seating arrangements
+    Returns:
+        list: List of (Course cell, Room, ID range) tuples seating the student, None if there is none
+    """
+    with SEATING_INDEX_LOCK:
+        try:
+            with open(path, "r") as f:
+                saved = json.load(f).get(student_ID, {}).get(examtype)
+        except FileNotFoundError:
+            return None
+    return None if saved is None else [tuple(i) for i in saved["index"]]
+
+
+def save_seating_index(examtype, student_ID, filepath, index, path=SEATING_INDEX_PATH):
+    """
+    Saves the seating arrangement applied to a student's calendar for an exam type
+    Only the rows seating the student are kept, as they are all a revision is diffed on
+
+    Args:
+        examtype (str): midsem or compre
+        student_ID (str): Student ID
+        filepath (str): Path to the seating arrangement pdf file it was compiled from
+        index (list): List of (Course cell, Room, ID range) tuples
+        path (str): Path to the saved seating arrangements
+    Returns:
+        None
+    """
+    with SEATING_INDEX_LOCK:
+        try:
+            with open(path, "r") as f:
+                saved = json.load(f)
+        except FileNotFoundError:
+            saved = {}
+        saved.setdefault(student_ID, {})[examtype] = {
+            "pdf": filepath,
+            "index": [list(i) for i in student_rows(index, student_ID)],
+        }
+        with open(path + ".tmp", "w") as f:
+            json.dump(saved, f)
+        os.replace(path + ".tmp", path)  # Never leaves a half written file
+
+
+def diff_seating_index(old, new):
+    """
+    Finds the course cells whose rooms or ID ranges changed between two seating arrangements
+
+    Args:
+        old (list): List of (Course cell, Room, ID range) tuples
+        new (list): List of (Course cell, Room, ID range) tuples
+    Returns:
+        set: Course cells that were added, removed or changed
+    """
+    rows = {}
+    for n, index in enumerate((old, new)):
+        for cell, room, id_range in index:
+            rows.setdefault(cell, ([], []))[n].append((room, id_range))
+    return {cell for cell, (a, b) in rows.items() if sorted(a) != sorted(b)}
+
+
+# endregion
+
+
+# region Util
+
+
+def get_semester(date):
+    """
+    Gets the academic semester a date falls in
+
+    Args:
+        date (str): Date (or datetime) starting with YYYY-MM-DD
+    Returns:
+        str: Semester, e.g. "2025-26 I"
+    """
+    date = datetime.datetime.strptime(date[:10], "%Y-%m-%d")
+    if date.month >= 7:
+        return f"{date.year}-{(date.year + 1) % 100:02d} I"
+    return f"{date.year - 1}-{date.year % 100:02d} II"
+
+
+def input_dates():
+    """
+    Gets the start and end dates from the user
+
+    Args:
+        None
+    Returns:
+        (str, str): (Start date, End date)
+    """
+    start_date = None
+    while True:
+        start_date = input(
+            "Enter start date (YYYY-MM-DD) [Leave blank to start today]: "
+        )
+        if not start_date:
+            start_date = datetime.datetime.today().strftime("%Y-%m-%d")
+            break
+        try:
+            datetime.datetime.strptime(start_date, "%Y-%m-%d")
+            break
+        except ValueError:
+            print("\nIncorrect date format, should be YYYY-MM-DD")
+            continue
+
+    end_date = None
+    while True:
+        end_date = input("Enter semester end date (Excluded) (YYYY-MM-DD): ")
+        try:
+            datetime.datetime.strptime(end_date, "%Y-%m-%d")
+            break
+        except ValueError:
+            print("\nIncorrect date format, should be YYYY-MM-DD")
+            continue
+    return start_date, end_date
+
+
+def input_filepath():
+    """
+    Gets the filepath from the user
+
+    Args:
+        None
+    Returns:
+        str: Filepath
+    """
+    filepath = None
+    while True:
+        filepath = input("Enter filepath: ")
+        if not filepath:
+            print("Filepath cannot be empty")
+            continue
+        if not os.path.exists(filepath):
+            print("File does not exist")
+            continue
+        break
+    return filepath
+
+
+def get_calendar_id(service):
+    """
+    Gets the ID of the "Timetable" calendar, creating it if it doesn't exist
+
+    Args:
+        service (googleapiclient.discovery.Resource): Google Calendar API service
+    Returns:
+        str: Calendar ID
+    """
+    existing_calendars = service.calendarList().list().execute()
+    created_calendar = None
+
+    for i in existing_calendars["items"]:
+        if i["summary"] == "Timetable":
+            created_calendar = i
+            break
+    else:
+        created_calendar = (
+            service.calendars()
+            .insert(
+                body={
+                    "summary": "Timetable",
+                    "timeZone": "Asia/Kolkata",
+                }
+            )
+            .execute()
+        )
+    return created_calendar["id"]
+
+
+def snapshot_foreign_events(service):
+    """
+    Copies the events of the calendar that weren't made by this script, ready to be inserted again
+    Changed occurrences of a recurring event become events of their own, excluded from their series,
+    and deleted occurrences are excluded from their series
+
+    Args:
+        service (googleapiclient.discovery.Resource): Google Calendar API service
+    Returns:
+        list: Event bodies (only FOREIGN_EVENT_FIELDS)
+    """
+    events = list_events(service, state.calendar_id)
+
+    snapshot = {}
+    exceptions = []
+    for i in events:
+        if i.get("status") == "cancelled":
+            # Deleted occurrences are listed with just their series and original start
+            if i.get("recurringEventId"):
+                exceptions.append(i)
+            continue
+        private = i.get("extendedProperties", {}).get("private", {})
+        if all(private.get(k) == v for k, v in TOOL_TAGS.items()):
+            continue
+        if i.get("recurringEventId"):
+            exceptions.append(i)
+        snapshot[i["id"]] = {k: i[k] for k in FOREIGN_EVENT_FIELDS if k in i}
+    for i in exceptions:
+        master = snapshot.get(i["recurringEventId"])
+        if master is None or not master.get("recurrence"):
+            continue
+        original = i["originalStartTime"]
+        if "dateTime" in original:
+            exdate = "EXDATE:" + datetime.datetime.fromisoformat(
+                original["dateTime"].replace("Z", "+00:00")
+            ).astimezone(datetime.timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+        else:
+            exdate = "EXDATE;VALUE=DATE:" + original["date"].replace("-", "")
+        master["recurrence"] = master["recurrence"] + [exdate]
+    return list(snapshot.values())
+
+
+def reset_calendar(service, keep_foreign=False, batch_size=50):
+    """
+    Starts the "Timetable" calendar over by deleting and recreating it,
+    instead of deleting its events one by one
+
+    The new calendar has a new ID (and new event IDs), its color and sharing settings aren't kept,
+    the sub-calendars of its courses are deleted too,
+    the saved seating arrangements are forgotten as they no longer match the calendar,
+    the unfinished runs in the journal are marked rolled back (their events went with the calendar)
+    and the last applied customisation is kept for the new calendar (see reapply_customisation)
+
+    The events kept are written to FOREIGN_EVENTS_PATH before the calendar is deleted,
+    and the ones that couldn't be copied stay there
+
+    Args:
+        service (googleapiclient.discovery.Resource): Google Calendar API service
+        keep_foreign (bool): Whether to copy the events not made by this script to the new calendar
+        batch_size (int): Number of inserts per batch request (at most 50 for Google Calendar)
+    Returns:
+        str: ID of the new calendar
+    """
+    foreign = snapshot_foreign_events(service) if keep_foreign else []
+    if foreign:
+        with open(FOREIGN_EVENTS_PATH, "w") as f:
+            json.dump(foreign, f, indent=1)
+    service.calendars().delete(calendarId=state.calendar_id).execute()
+    for i in list(sub_calendars()):
+        del_sub_calendar(service, i)
+    save_sub_calendars()
+    state.calendar_id = get_calendar_id(service)
+    if os.path.exists(SEATING_INDEX_PATH):
+        os.remove(SEATING_INDEX_PATH)
+    applied = load_applied()
+    if applied is not None:
+        applied["calendar_id"] = state.calendar_id
+        with open(APPLIED_PATH + ".tmp", "w") as f:
+            json.dump(applied, f, indent=4)
+        os.replace(APPLIED_PATH + ".tmp", APPLIED_PATH)
+    for run, i in read_journal().items():
+        if i["status"] == "running":
+            journal = Journal(run=run)
+            journal.end("rolled_back")  # Its events went with the calendar
+            journal.close()
+
+    failed = []
+
+    def callback(request_id, response, exception):
+        if exception is not None:
+            failed.append((request_id, exception))
+
+    for i in range(0, len(foreign), batch_size):
+        batch = service.new_batch_http_request(callback=callback)
+        for n, event in enumerate(foreign[i : i + batch_size], i):
+            batch.add(
+                service.events().insert(calendarId=state.calendar_id, body=event),
+                request_id=str(n),
+            )
+        batch.execute()
+    for request_id, exception in failed:
+        print(
+            f"Couldn't copy event: {foreign[int(request_id)].get('summary')} ({exception})"
+        )
+    if failed:
+        with open(FOREIGN_EVENTS_PATH, "w") as f:
+            json.dump([foreign[int(i)] for i, _ in failed], f, indent=1)
+        print(f"The events that couldn't be copied are saved in {FOREIGN_EVENTS_PATH}")
+    elif foreign:
+        os.remove(FOREIGN_EVENTS_PATH)
+    print(f"Calendar reset, {len(foreign) - len(failed)} other events kept")
+    return state.calendar_id
+
+
+# endregion
+
+
+def build_classes(timetable, catalogue):
+    """
+    Makes the list of classes from the timetable's sections
+
+    Args:
+        timetable (dict): Timetable
+        catalogue (CourseCatalogue): Course catalogue
+    Returns:
+        list: List of classes (ClassBlock)
+    """
+
+    def convert_slots_to_days_hr(slot: Tuple[str, str]) -> Tuple[str, str]:
+        """
+        Converts chrono's time slot format to google calendar's format
+
+        Args:
+            slot (str, str): Chrono's time slot format (Day, Hour Number)
+        Returns:
+            (str, str): (Day, Hour) in google calendar's format
+        """
+        days = {
+            "M": "MO",
+            "T": "TU",
+            "W": "WE",
+            "Th": "TH",
+            "F": "FR",
+            "S": "SA",
+            "Su": "SU",
+        }
+        hours = {
+            "1": "08:00:00",
+            "2": "09:00:00",
+            "3": "10:00:00",
+            "4": "11:00:00",
+            "5": "12:00:00",
+            "6": "13:00:00",
+            "7": "14:00:00",
+            "8": "15:00:00",
+            "9": "16:00:00",
+            "10": "17:00:00",
+            "11": "18:00:00",
+        }
+        return (days[slot[0]], hours[slot[1]])
+
+    types_dict = {"L": "Lecture", "T": "Tutorial", "P": "Practical"}
+    classes = []
+    for i in timetable["sections"]:
+        timings = [
+            convert_slots_to_days_hr((j.split(":")[2], j.split(":")[3]))
+            for j in i["roomTime"]
+        ]
+        # Multiple hours for same course
+        class_times = []
+        for j in timings:
+            block_period = [
+                k
+                for k in timings
+                if (
+                    k[0] == j[0]
+                    and abs(int(k[1].split(":")[0]) - int(j[1].split(":")[0])) <= 2
+                )
+            ]
+            if len(block_period) > 1 and block_period not in class_times:
+                class_times.append(block_period)
+            diff_hrs = [k for k in timings if k[1] == j[1]]
+            if diff_hrs not in class_times and len(block_period) == 1:
+                class_times.append(diff_hrs)
+
+        for k in class_times:
+            days = [x[0] for x in k]
+            title, location = i["roomTime"][0].split(":")[:2]
+            section = i["type"] + str(i["number"])
+            kind = types_dict[i["type"]]
+            if location == "WS":  # QOL
+                location = "Workshop"
+            elif location in [
+                "A122",
+                "A222",
+                "B124",
+            ]:  # Change Lab Courses to Practical
+                kind = "Practical"
+                section = "P" + section[1:]
+            classes.append(
+                ClassBlock(
+                    title,
+                    location,
+                    days,
+                    k[0][1],
+                    (
+                        k[0][1][:2] + ":50:00"
+                        if days.count(days[0]) == 1
+                        else str(int(k[0][1][:2]) + days.count(days[0]) - 1) + ":50:00"
+                    ),
+                    section,
+                    i["instructors"],
+                    kind,
+                    catalogue.name(i["courseId"]).title(),
+                )
+            )
+
+    return classes
+
+
+def register_colors(custom):
+    """
+    Checks the colors that can be used for randomly colored courses,
+    removing the ones that are reserved or specified in the customisation
+
+    Args:
+        custom (dict): Customisation dictionary
+    Returns:
+        None
+    """
+    state.usable_colors[:] = list(map(str, GOOGLE_CALENDAR_COLORS.keys()))
+    state.specified_colors.clear()
+    state.course_colors.clear()
+    for i in custom["remove_colors"]:
+        state.usable_colors.remove(i)
+    if custom.get("exam_color_id"):
+        state.usable_colors.remove(custom.get("exam_color_id"))
+        state.specified_colors.append(custom.get("exam_color_id"))
+    if not custom["course_grouping"]:
+        for i in custom["classes_color_ids"]:
+            state.usable_colors.remove(custom["classes_color_ids"][i])
+            state.specified_colors.append(custom["classes_color_ids"][i])
+    for i in custom:
+        if i not in [
+            "reminder",
+            "course_grouping",
+            "exam_rooms",
+            "classes_color_ids",
+            "remove_colors",
+            "exam_color_id",
+            "blackout_days",
+            "calendar_layout",
+        ]:
+            if custom[i].get("color"):
+                state.usable_colors.remove(custom[i]["color"])
+                state.specified_colors.append(custom[i]["color"])
+
+
+def reuse_colors(custom, colors):
+    """
+    Gives randomly colored courses the colors they were given before (see save_applied),
+    unless their color is now set in the customisation or the color was removed
+    Call after register_colors, which forgets the colors of the courses
+
+    Args:
+        custom (dict): Customisation dictionary
+        colors (dict): Course IDs and the colorIds they were given
+    Returns:
+        None
+    """
+    if not custom["course_grouping"]:
+        return
+    for code, color in colors.items():
+        if (
+            not custom.get(code, {}).get("color")
+            and color not in custom["remove_colors"]
+            and color != custom["exam_color_id"]
+        ):
+            state.course_colors[code] = color
+
+
+def initialise(
+    service,
+    timetable_ID,
+    student_ID,
+    start_date,
+    end_date,
+    custom: dict | None = None,
+    journal: Journal | None = None,
+    strategy="auto",
+    budget=None,
+    colors=None,
+):
+    """
+    Makes lists of classes and exams, adds them and deletes classes on holidays
+    Prints the predicted API cost first, and refuses runs over the quota budget
+    Randomly colored courses keep the colors given, so a resumed or repeated run makes the same events
+
+    Args:
+        service (googleapiclient.discovery.Resource): Google Calendar API service
+        timetable_ID: Chrono timetable ID
+        student_ID (str): Student ID
+        start_date (str): Start date in the format YYYY-MM-DD
+        end_date (str): End date in the format YYYY-MM-DD
+        custom (dict): Customisation dictionary, the user is asked to customise if None
+        journal (Journal): Journal to record the changes in, if any
+        strategy (str): How to send the changes, one of STRATEGIES or "auto" to pick the cheapest
+        budget (int): Most quota units the run may use, QUOTA_BUDGET if None
+        colors (dict): Course IDs and the colorIds they were given before (see reuse_colors), if any
+    Returns:
+        dict: Customisation dictionary
+    Raises:
+        BudgetExceeded: If the run would use more quota units than the budget
+    """
+    print("\nLoading Timetable...\n")
+    timetable = get_timetable(timetable_ID)
+    catalogue = get_course_catalogue()
+
+    exams_start_end_dates = get_exam_windows(timetable["examTimes"])
+
+    classes = build_classes(timetable, catalogue)
+
+    def on_exam_rooms(fp):
+        exam_room_numbers(fp, timetable_ID, student_ID, wait=False)
+
+    if custom is None:
+        custom = customisation(classes, on_exam_rooms=on_exam_rooms)
+    else:
+        custom = fill_customisation(custom, default_customisation(classes))
+        for fp in custom["exam_rooms"].values():
+            on_exam_rooms(fp)
+
+    register_colors(custom)
+    reuse_colors(custom, colors or {})
+    state.layout = custom["calendar_layout"]
+
+    try:
+        holidays = sorted(set(get_holiday_list()) | set(get_blackout_days(custom)))
+        windows = exam_periods(exams_start_end_dates)
+        plan = plan_run(
+            class_events(classes, start_date, end_date, custom),
+            timetable["examTimes"],
+            holidays,
+            windows,
+        )
+        strategy = choose_strategy(plan, strategy, budget)
+        print(f"Using the {strategy} strategy")
+        skip_dates = None
+        if strategy == "exdate":
+            skip_dates = holidays + [j for i in windows for j in dates_between(*i)]
+
+        if journal is not None:
+            journal.begin(
+                {
+                    "action": "import",
+                    "timetable_ID": timetable_ID,
+                    "student_ID": student_ID,
+                    "start_date": start_date,
+                    "end_date": end_date,
+                    "customisation": custom,
+                    "calendar_id": state.calendar_id,
+                    "strategy": strategy,
+                    "colors": dict(state.course_colors),
+                }
+            )
+        state.journal = journal
+        state.dispatcher = make_dispatcher(strategy, service, journal)
+        masters = add_classes(
+            service, classes, start_date, end_date, custom, skip_dates
+        )
+        print("\nLoading Exam Schedule...")
+        add_exams(
+            service,
+            timetable["examTimes"],
+            exams_start_end_dates,
+            custom,
+            timetable_ID,
+            student_ID,
+            increment_exam_year=None,
+            # Classes during exams are already left out with the exdate strategy
+            masters=[] if skip_dates else masters,
+        )
+        if not skip_dates:
+            del_classes_on_holidays(service, holidays, masters)
+        if journal is not None:
+            journal.end()
+    finally:
+        if state.dispatcher is not None:
+            state.dispatcher.close()
+            state.dispatcher = None
+        state.journal = None
+        if journal is not None:
+            journal.close()
+    return custom
+
+
+def get_blackout_days(custom):
+    """
+    Gets the campus-wide days without classes from the customisation (e.g. exam weeks, fests)
+
+    Args:
+        custom (dict): Customisation dictionary
+    Returns:
+        list: Dates in the format YYYY-MM-DD
+    """
+    days = []
+    for i in custom.get("blackout_days", []):
+        start_date, _, end_date = i.partition(" to ")
+        days.extend(dates_between(start_date.strip(), (end_date or start_date).strip()))
+    return days
+
+
+def default_customisation(classes):
+    """
+    Makes the default customisation
+
+    Args:
+        classes (list): List of classes (for course IDs)
+    Returns:
+        dict: Dictionary of customisation options
+    """
+    custom = {
+        "reminder": 10,
+        "course_grouping": 0,
+        "exam_rooms": {},
+        "classes_color_ids": {"Lecture": "10", "Tutorial": "9", "Practical": "11"},
+        "remove_colors": [],
+        "exam_color_id": "5",
+        "blackout_days": [],
+        "calendar_layout": "single",
+    }
+
+    for i in classes:
+        custom[i.title] = {"title": i.title, "desc": "", "color": ""}
+
+    return custom
+
+
+def fill_customisation(new_custom, custom):
+    """
+    Adds the default values for any missing keys and in nested keys
+
+    Args:
+        new_custom (dict): Customisation dictionary (modified in place)
+        custom (dict): Default customisation dictionary
+    Returns:
+        dict: new_custom
+    """
+    for i in custom:
+        if i not in new_custom:
+            new_custom[i] = custom[i]
+        elif isinstance(custom[i], dict):
+            for j in custom[i]:
+                if j not in new_custom[i]:
+                    new_custom[i][j] = custom[i][j]
+    return new_custom
+
+
+def customisation(classes, on_exam_rooms=None):
+    """
+    Lets the user customise the events created on google calendar
+
+    Refer customisation_guidelines.md for more info
+
+    Args:
+        classes (list): List of classes (for course IDs)
+        on_exam_rooms (callable): Called with the path of each seating arrangement pdf as soon as it is known
+    Returns:
+        dict: Dictionary of customisation options
+    """
+    custom = default_customisation(classes)
+
+    new_custom = {}
+    print("\n*Please refer to customisation_guidelines.md before proceeding*\n")
+    while True:
+        print(
+            """Customisation Menu:
+1. Edit customisation.json (Requires knowledge of JSON)
+2. Edit customisation interactively (Tedious but easy to use)
+3. No customisation (Default)
+
+"""
+        )
+        choice = input("Enter your choice: ")
+        if choice == "1":
+            with open("customisation.json", "w") as f:
+                json.dump(custom, f, indent=4)
+            print("Edit customisation.json and save the file")
+            input("Press any key to continue...")
+            with open("customisation.json", "r") as f:
+                new_custom = fill_customisation(json.load(f), custom)
+            if on_exam_rooms:
+                for fp in new_custom["exam_rooms"].values():
+                    on_exam_rooms(fp)
+            break
+        elif choice == "2":
+            while True:
+                print(
+                    """\nMenu:
+1. Change reminder time
+2. Group classes by course or type
+3. Add Exam rooms if available
+4. Change class type colors (Lecture, Tutorial, Practical)
+5. Change exam color
+6. Remove colors
+7. Customise individual classes
+8. Add days without classes
+9. Confirm and save customisation
+"""
+                )
+                op = input("Enter your choice: ")
+                if op == "1":
+                    rem = input("Enter reminder time (in minutes): ")
+                    try:
+                        if not 0 <= int(rem) <= 40320:
+                            raise ValueError
+                        custom["reminder"] = int(rem)
+                        print("Reminder time changed")
+                    except ValueError:
+                        print("Invalid Input\n")
+                        continue
+                elif op == "2":
+                    print(
+                        """\nMenu:
+1. Group by type
+2. Group by course
+3. Back to Customisation Menu
+
+"""
+                    )
+                    grp = input("Enter your choice: ")
+                    if grp == "1":
+                        custom["course_grouping"] = 0
+                        print("Classes grouped by type")
+                    elif grp == "2":
+                        custom["course_grouping"] = 1
+                        print("Classes grouped by course")
+                    elif grp == "3":
+                        continue
+                    else:
+                        print("Invalid Choice\n")
+                        continue
+                elif op == "3":
+                    print(
+                        """\nMenu:
+1. Midsems
+2. Compres
+3. Back to Customisation Menu"""
+                    )
+                    exam = input("Enter your choice: ")
+                    if exam == "1" or exam == "2":
+                        fp = input_filepath()
+                        custom["exam_rooms"]["midsem" if exam == "1" else "compre"] = fp
+                        if on_exam_rooms:
+                            on_exam_rooms(fp)
+                        print("Seating Arrangement Added")
+                    elif exam == "3":
+                        continue
+                    else:
+                        print("Invalid Choice\n")
+                        continue
+                elif op == "4":
+                    print(
+                        """\nMenu:
+1. Lecture
+2. Tutorial
+3. Practical
+4. Back to Customisation Menu"""
+                    )
+                    color = input("Enter your choice: ")
+                    id = input("Enter colorId: ")
+                    try:
+                        if not 1 <= int(id) <= 11:
+                            raise ValueError
+                        custom["classes_color_ids"][
+                            (
+                                "Lecture"
+                                if color == "1"
+                                else "Tutorial" if color == "2" else "Practical"
+                            )
+                        ] = id
+                        print("Color changed")
+                    except ValueError:
+                        print("Invalid Input\n")
+                        continue
+                elif op == "5":
+                    id = input("Enter colorId: ")
+                    try:
+                        if not 1 <= int(id) <= 11:
+                            raise ValueError
+                        custom["exam_color_id"] = id
+                        print("Color changed")
+                    except ValueError:
+                        print("Invalid Input\n")
+                        continue
+                elif op == "6":
+                    l = input("Enter colorIds to remove, separated by spaces: ").split()
+                    try:
+                        if not all(1 <= int(i) <= 11 for i in l):
+                            raise ValueError
+                        custom["remove_colors"].extend(l)
+                        print("Colors removed")
+                    except ValueError:
+                        print("Invalid Input\n")
+                        continue
+                elif op == "7":
+                    while True:
+                        print("\nMenu:")
+                        a = []
+                        for i in range(len(classes)):
+                            if classes[i].title not in a:
+                                a.append(classes[i].title)
+                                print(f"{len(a)}. {classes[i].title}")
+                        print(f"{len(a)+1}. Back to Customisation Menu\n")
+                        course = input("Enter your choice: ")
+                        if course == str(len(a) + 1):
+                            break
+                        try:
+                            if not 1 <= int(course) <= len(a):
+                                raise ValueError
+                            while True:
+                                print(
+                                    f"""\nMenu {a[int(course)-1]}:
+    1. Change title
+    2. Add description
+    3. Change color
+    4. Back to Customisation Menu"""
+                                )
+                                edit = input("Enter your choice: ")
+                                if edit == "1":
+                                    title = input("Enter title: ")
+                                    custom[a[int(course) - 1]]["title"] = title
+                                    print("Title changed\n")
+                                elif edit == "2":
+                                    desc = input("Enter description: ")
+                                    custom[a[int(course) - 1]]["desc"] = desc
+                                    print("Description added\n")
+                                elif edit == "3":
+                                    id = input("Enter colorId: ")
+                                    try:
+                                        if not 1 <= int(id) <= 11:
+                                            raise ValueError
+                                        custom[a[int(course) - 1]]["color"] = id
+                                        print("Color changed\n")
+                                    except ValueError:
+                                        print("Invalid Input\n")
+                                        continue
+                                elif edit == "4":
+                                    break
+                                else:
+                                    print("Invalid Choice\n")
+                                    continue
+                        except ValueError:
+                            print("Invalid Choice\n")
+                            break
+                elif op == "8":
+                    day = input(
+                        "Enter a date or range (YYYY-MM-DD or YYYY-MM-DD to YYYY-MM-DD): "
+                    ).strip()
+                    try:
+                        get_blackout_days({"blackout_days": [day]})
+                        custom["blackout_days"].append(day)
+                        print("Days added")
+                    except ValueError:
+                        print("Invalid Input\n")
+                        continue
+                elif op == "9":
+                    break
+                else:
+                    print("Invalid Choice\n")
+                    continue
+            new_custom = custom
+            break
+        elif choice == "3":
+            new_custom = custom
+            break
+        else:
+            print("Invalid Choice\n")
+            continue
+
+    return new_custom
 
 
-def customisation(classes):
+# region Re-applying Customisation
+
+
+def save_applied(
+    custom, timetable_ID, student_ID, start_date, end_date, path=APPLIED_PATH
+):
     """
-    Lets the user customise the events created on google calendar
+    Saves the customisation a run applied to the calendar, with the run's parameters
+    and the colors its courses were given (see reapply_customisation)
 
-    Refer customisation_guidelines.md for more info
+    Args:
+        custom (dict): Customisation dictionary
+        timetable_ID: Chrono timetable ID
+        student_ID (str): Student ID
+        start_date (str): Start date in the format YYYY-MM-DD
+        end_date (str): End date in the format YYYY-MM-DD
+        path (str): Path to save it to
+    Returns:
+        None
+    """
+    with open(path + ".tmp", "w") as f:
+        json.dump(
+            {
+                "calendar_id": state.calendar_id,
+                "timetable_ID": timetable_ID,
+                "student_ID": student_ID,
+                "start_date": start_date,
+                "end_date": end_date,
+                "customisation": custom,
+                "colors": dict(state.course_colors),
+            },
+            f,
+            indent=4,
+        )
+    os.replace(path + ".tmp", path)  # Never leaves a half written file
+
+
+def load_applied(path=APPLIED_PATH):
+    """
+    Loads the customisation last applied to the calendar
 
     Args:
-        classes (list): List of classes (for course IDs)
+        path (str): Path it was saved to
     Returns:
-        dict: Dictionary of customisation options
+        dict: As saved by save_applied, None if nothing was applied yet
     """
-    custom = {
-        "reminder": 10,
-        "course_grouping": 0,
-        "exam_rooms": {},
-        "classes_color_ids": {"Lecture": "10", "Tutorial": "9", "Practical": "11"},
-        "remove_colors": [],
-        "exam_color_id": "5",
+    try:
+        with open(path, "r") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def customised_events(classes, exams, applied, custom):
+    """
+    Makes the master events of the classes and the exam events as a customisation would make them
+    Courses keep the colors they were given when it was applied (even if another course now takes
+    the same color), unless their color settings changed or the color was removed
+
+    Args:
+        classes (list): List of classes (ClassBlock)
+        exams (list): List of exams
+        applied (dict): As saved by save_applied
+        custom (dict): Customisation dictionary (filled, see fill_customisation)
+    Returns:
+        dict: Dictionary of event IDs and events (without exam rooms)
+    """
+    old = applied["customisation"]
+    register_colors(custom)
+    if old.get("course_grouping"):
+        reuse_colors(
+            custom,
+            {
+                code: color
+                for code, color in applied["colors"].items()
+                if not old.get(code, {}).get("color")
+            },
+        )
+    events = class_events(classes, applied["start_date"], applied["end_date"], custom)
+    events += [exam_spec(ExamSlot.parse(i), custom).body() for i in exams]
+    return {i["id"]: i for i in events}
+
+
+def reapply_customisation(service, custom, applied, path=APPLIED_PATH):
+    """
+    Applies the changes between a customisation and the one last applied to the calendar,
+    by patching only the master events of the classes and the exam events that changed
+    (title, description, color or reminder), instead of deleting and adding the classes again
+
+    Events whose color comes from their sub-calendar are recolored by recoloring the sub-calendar,
+    once for all of them. Changes to exam_rooms, blackout_days and calendar_layout aren't re-applied
+
+    Args:
+        service (googleapiclient.discovery.Resource): Google Calendar API service
+        custom (dict): New customisation dictionary
+        applied (dict): As saved by save_applied
+        path (str): Path to save the new customisation to once it is applied
+    Returns:
+        int: Number of calls made
+    """
+    state.calendar_id = applied["calendar_id"]
+    timetable = get_timetable(applied["timetable_ID"])
+    classes = build_classes(timetable, get_course_catalogue())
+    default = default_customisation(classes)
+    old_custom = fill_customisation(
+        json.loads(json.dumps(applied["customisation"])), default
+    )
+    custom = fill_customisation(custom, default)
+    for i in ("exam_rooms", "blackout_days", "calendar_layout"):
+        if custom[i] != old_custom[i]:
+            progress().note(
+                f"Changes to {i} aren't re-applied, add the classes again for them"
+            )
+
+    old = customised_events(classes, timetable["examTimes"], applied, old_custom)
+    new = customised_events(classes, timetable["examTimes"], applied, custom)
+
+    patches = []
+    recolors = {}  # Sub-calendar key -> new colorId
+    for event_id, event in new.items():
+        before = old.get(event_id)
+        if before is None:
+            continue
+        body = {k: event[k] for k in CUSTOMISED_FIELDS if event.get(k) != before.get(k)}
+        key = event_sub_calendar(event)
+        if (
+            "colorId" in body
+            and key is not None
+            and sub_calendars()[key]["color"] == before.get("colorId")
+        ):
+            # Its color comes from the sub-calendar, which is recolored for all its events at once
+            if recolors.setdefault(key, body["colorId"]) == body["colorId"]:
+                del body["colorId"]
+        if body:
+            patches.append((event, body))
+
+    progress().start("Re-applying customisation", len(patches) + len(recolors))
+    for key, color_id in recolors.items():
+        service.calendarList().patch(
+            calendarId=sub_calendars()[key]["id"],
+            colorRgbFormat=True,
+            body=calendar_colors(color_id),
+        ).execute()
+        sub_calendars()[key]["color"] = color_id
+        progress().step("recolored", key)
+    if recolors:
+        save_sub_calendars()
+    for event, body in patches:
+        execute(
+            service.events().patch(
+                calendarId=event_calendar(event), eventId=event["id"], body=body
+            ),
+            "patch",
+            event["id"],
+            body,
+            ignore=(404, 410),  # Deleted since
+        )
+        progress().step("patched", event["summary"])
+    flush_changes()
+    progress().finish()
+
+    save_applied(
+        custom,
+        applied["timetable_ID"],
+        applied["student_ID"],
+        applied["start_date"],
+        applied["end_date"],
+        path,
+    )
+    return len(patches) + len(recolors)
+
+
+# endregion
+
+
+# region Watch Mode
+
+
+def conditional_get(url, validators, stream=False):
+    """
+    Sends a conditional GET request using the ETag and Last-Modified of the previous response
+
+    Args:
+        url (str): URL
+        validators (dict): Validators of the previous response of each URL (updated in place)
+        stream (bool): Whether to stream the response body
+    Returns:
+        requests.Response: Response, or None if unchanged since the previous response
+    """
+    headers = {}
+    previous = validators.get(url, {})
+    if previous.get("etag"):
+        headers["If-None-Match"] = previous["etag"]
+    if previous.get("last_modified"):
+        headers["If-Modified-Since"] = previous["last_modified"]
+    response = requests.get(url, headers=headers, stream=stream)
+    if response.status_code == 304:
+        response.close()
+        return None
+    response.raise_for_status()
+    validators[url] = {
+        "etag": response.headers.get("ETag"),
+        "last_modified": response.headers.get("Last-Modified"),
+    }
+    return response
+
+
+def course_hashes(timetable, catalogue):
+    """
+    Hashes the sections and exam entries of each course in the timetable
+
+    Args:
+        timetable (dict): Timetable
+        catalogue (CourseCatalogue): Course catalogue
+    Returns:
+        dict: Dictionary of course IDs and hashes
+    """
+    entries = {}
+    for i in timetable["sections"]:
+        entries.setdefault(i["roomTime"][0].split(":")[0], []).append(
+            json.dumps(
+                [
+                    i["type"],
+                    i["number"],
+                    sorted(i["roomTime"]),
+                    i["instructors"],
+                    catalogue.name(i["courseId"]),
+                ]
+            )
+        )
+    for i in timetable["examTimes"]:
+        entries.setdefault(ExamSlot.parse(i).code, []).append(i)
+    return {
+        code: hashlib.sha1("\n".join(sorted(v)).encode()).hexdigest()
+        for code, v in entries.items()
     }
 
+
+def course_event_ids(classes, exams, start_date):
+    """
+    Gets the IDs of the events created for each course
+
+    Args:
+        classes (list): List of classes (ClassBlock)
+        exams (list): List of exams
+        start_date (str): Start date of the classes in the format YYYY-MM-DD
+    Returns:
+        dict: Dictionary of course IDs and lists of event IDs
+    """
+    ids = {}
     for i in classes:
-        custom[i["title"]] = {"title": i["title"], "desc": "", "color": ""}
+        ids.setdefault(i.title, []).append(class_event_id(i, start_date))
+    for i in map(ExamSlot.parse, exams):
+        ids.setdefault(i.code, []).append(exam_event_id(i.code, i.type, i.start))
+    return ids
 
-    new_custom = {}
-    print("\n*Please refer to customisation_guidelines.md before proceeding*\n")
-    while True:
-        print(
-            """Customisation Menu:
-1. Edit customisation.json (Requires knowledge of JSON)
-2. Edit customisation interactively (Tedious but easy to use)
-3. No customisation (Default)
 
-"""
+def resync_courses(service, entry, timetable, catalogue, changed, old_ids):
+    """
+    Re-adds the classes and exams of the changed courses and deletes their stale events
+
+    Args:
+        service (googleapiclient.discovery.Resource): Google Calendar API service
+        entry (dict): Watched timetable entry
+        timetable (dict): Timetable
+        catalogue (CourseCatalogue): Course catalogue
+        changed (set): Course IDs that changed
+        old_ids (dict): Dictionary of course IDs and lists of event IDs created previously
+    Returns:
+        dict: Dictionary of course IDs and lists of event IDs for the changed courses
+    """
+    with open(entry.get("customisation", "customisation.json"), "r") as f:
+        custom = json.load(f)
+    for code in changed:
+        custom.setdefault(code, {"title": code, "desc": "", "color": ""})
+    register_colors(custom)
+    state.layout = custom.get("calendar_layout", "single")
+
+    classes = [i for i in build_classes(timetable, catalogue) if i.title in changed]
+    exams = [i for i in timetable["examTimes"] if ExamSlot.parse(i).code in changed]
+    new_ids = course_event_ids(classes, exams, entry["start_date"])
+
+    masters = add_classes(
+        service, classes, entry["start_date"], entry["end_date"], custom
+    )
+    add_exams(
+        service,
+        exams,
+        get_exam_windows(timetable["examTimes"]),
+        custom,
+        entry["timetable_ID"],
+        entry["student_ID"],
+        masters=masters,
+    )
+
+    progress().start("Deleting stale events")
+    for code in changed:
+        if code not in new_ids and course_calendar_keys(code):
+            # Dropped course, its sub-calendars go in one call each
+            progress().step("deleted", code, drop_course(service, code))
+            continue
+        # Which of the course's calendars a stale event is in isn't known, so each is tried
+        calendars = [sub_calendars()[i]["id"] for i in course_calendar_keys(code)] or [
+            state.calendar_id
+        ]
+        for i in set(old_ids.get(code, [])) - set(new_ids.get(code, [])):
+            for calendar_id in calendars:
+                execute(
+                    service.events().delete(calendarId=calendar_id, eventId=i),
+                    "delete",
+                    i,
+                    ignore=(404, 410),  # Already deleted, or in another calendar
+                )
+            progress().step("deleted", i)
+    flush_changes()
+    progress().finish()
+
+    del_classes_on_holidays(
+        service,
+        sorted(set(get_holiday_list()) | set(get_blackout_days(custom))),
+        masters,
+    )
+    return new_ids
+
+
+def watch(config_path):
+    """
+    Polls Chrono for the timetables in the config and re-syncs only the courses that changed
+    Polls are spread evenly over the interval
+
+    Refer README.md for the config format
+
+    Args:
+        config_path (str): Path to the watch config
+    Returns:
+        None
+    """
+    with open(config_path, "r") as f:
+        config = json.load(f)
+    interval = config.get("interval", 900)
+    entries = config["timetables"]
+    state_path = config.get("state", "watch_state.json")
+
+    watch_state = {}
+    if os.path.exists(state_path):
+        with open(state_path, "r") as f:
+            watch_state = json.load(f)
+    validators = {}  # Only valid for as long as the responses are cached below
+    timetables = {}  # Last timetable and the catalogue it was hashed with
+    accounts = {}  # Token path -> (service, calendar ID)
+    scheduler = sched.scheduler(time.time, time.sleep)
+
+    def poll_catalogue():
+        try:
+            response = conditional_get(
+                "https://chrono.crux-bphc.com/api/course", validators, stream=True
+            )
+            if response is not None:
+                prefetcher.set(("courses",), load_course_catalogue(response))
+        except Exception as e:
+            print(f"Error polling course catalogue: {e}")
+        scheduler.enter(interval, 0, poll_catalogue)
+
+    def sync(entry):
+        timetable_ID = entry["timetable_ID"]
+        key = f"{timetable_ID}:{entry['student_ID']}"
+        response = conditional_get(
+            f"https://chrono.crux-bphc.com/api/timetable/{timetable_ID}", validators
         )
-        choice = input("Enter your choice: ")
-        if choice == "1":
-            with open("customisation.json", "w") as f:
-                json.dump(custom, f, indent=4)
-            print("Edit customisation.json and save the file")
-            input("Press any key to continue...")
-            with open("customisation.json", "r") as f:
-                new_custom = json.load(f)
-
-            # Add the default values for any missing keys and in nested keys
-            for i in custom:
-                if i not in new_custom:
-                    new_custom[i] = custom[i]
-                elif isinstance(custom[i], dict):
-                    for j in custom[i]:
-                        if j not in new_custom[i]:
-                            new_custom[i][j] = custom[i][j]
-            break
-        elif choice == "2":
-            while True:
-                print(
-                    """\nMenu:
-1. Change reminder time
-2. Group classes by course or type
-3. Add Exam rooms if available
-4. Change class type colors (Lecture, Tutorial, Practical)
-5. Change exam color
-6. Remove colors
-7. Customise individual classes
-8. Confirm and save customisation
-"""
+        catalogue = get_course_catalogue()
+        cached = timetables.get(key)
+        if response is None and cached and cached[1] is catalogue:
+            return
+        timetable = response.json() if response is not None else cached[0]
+        timetables[key] = (timetable, catalogue)
+        if not timetable.get("sections"):
+            print(f"ID Error. Can't access timetable {timetable_ID}.")
+            return
+        prefetcher.set(("timetable", timetable_ID), timetable)
+
+        token_path = entry.get("token", "token.json")
+        if token_path not in accounts:
+            service = api_build("calendar", "v3", credentials=auth(token_path))
+            accounts[token_path] = (service, get_calendar_id(service))
+        service, state.calendar_id = accounts[token_path]
+        state.calendar_id = entry.get("calendar_id", state.calendar_id)
+
+        hashes = course_hashes(timetable, catalogue)
+        if key not in watch_state:
+            # First poll, the calendar is assumed to be in sync with the timetable
+            watch_state[key] = {
+                "hashes": hashes,
+                "events": course_event_ids(
+                    build_classes(timetable, catalogue),
+                    timetable["examTimes"],
+                    entry["start_date"],
+                ),
+            }
+            print(f"Watching timetable {timetable_ID}")
+            return
+        old = watch_state[key]
+        changed = {
+            code
+            for code in hashes.keys() | old["hashes"].keys()
+            if hashes.get(code) != old["hashes"].get(code)
+        }
+        if not changed:
+            return
+        print(f"\nTimetable {timetable_ID} changed: {', '.join(sorted(changed))}")
+        new_ids = resync_courses(
+            service, entry, timetable, catalogue, changed, old["events"]
+        )
+        for code in changed:
+            old["events"].pop(code, None)
+        old["events"].update(new_ids)
+        old["hashes"] = hashes
+
+    def poll_timetable(entry):
+        try:
+            sync(entry)
+            with open(state_path, "w") as f:
+                json.dump(watch_state, f, indent=4)
+        except Exception as e:
+            print(f"Error syncing timetable {entry['timetable_ID']}: {e}")
+        scheduler.enter(interval, 1, poll_timetable, (entry,))
+
+    scheduler.enter(0, 0, poll_catalogue)
+    for k, entry in enumerate(entries):
+        scheduler.enter(interval * k / len(entries), 1, poll_timetable, (entry,))
+    scheduler.run()
+
+
+# endregion
+
+
+# region Service Mode
+
+
+def load_credentials(token_path):
+    """
+    Loads stored Google Calendar API credentials without any user interaction
+
+    Args:
+        token_path (str): Path to the stored token (made by auth)
+    Returns:
+        google.oauth2.credentials.Credentials: Google Calendar API credentials
+    """
+    creds = Credentials.from_authorized_user_file(token_path, SCOPES)
+    if not creds.valid:
+        if not (creds.expired and creds.refresh_token):
+            raise ValueError(
+                f"Token {token_path} is invalid, run the script once to authorise"
+            )
+        creds.refresh(Request())
+    return creds
+
+
+def run_service_job(request):
+    """
+    Runs a job of the service for one student
+
+    Actions:
+    - import: Adds classes and exams, and deletes classes on holidays (option 1 of the menu)
+    - exam_rooms: Adds room numbers to the exam events (option 2 of the menu)
+
+    Args:
+        request (dict): Job request (refer README.md)
+    Returns:
+        None
+    """
+    service = api_build(
+        "calendar",
+        "v3",
+        credentials=load_credentials(request.get("token", "token.json")),
+    )
+    state.calendar_id = request.get("calendar_id") or get_calendar_id(service)
+    timetable_ID = request["timetable_ID"]
+    student_ID = request["student_ID"]
+    prefetch(timetable_ID)
+
+    if request["action"] == "import":
+        initialise(
+            service,
+            timetable_ID,
+            student_ID,
+            request["start_date"],
+            request["end_date"],
+            custom=request.get("customisation", {}),
+            journal=(
+                Journal(
+                    request["journal"],
+                    params={"token": request.get("token", "token.json")},
                 )
-                op = input("Enter your choice: ")
-                if op == "1":
-                    rem = input("Enter reminder time (in minutes): ")
-                    try:
-                        if not 0 <= int(rem) <= 40320:
-                            raise ValueError
-                        custom["reminder"] = int(rem)
-                        print("Reminder time changed")
-                    except ValueError:
-                        print("Invalid Input\n")
-                        continue
-                elif op == "2":
-                    print(
-                        """\nMenu:
-1. Group by type
-2. Group by course
-3. Back to Customisation Menu
+                if request.get("journal")
+                else None
+            ),
+            strategy=request.get("strategy", "auto"),
+            budget=request.get("budget"),
+        )
+    elif request["action"] == "exam_rooms":
+        add_exam_rooms(
+            service,
+            exam_room_numbers(request["seating_pdf"], timetable_ID, student_ID),
+            request["exam_type"],
+            exams=get_timetable(timetable_ID)["examTimes"],
+        )
+
+
+class JobQueue:
+    """
+    Runs the jobs of the service on a worker pool
+    Jobs of the same student run one at a time, in the order they were submitted
+    """
+
+    REQUIRED = {
+        "import": ["student_ID", "timetable_ID", "start_date", "end_date"],
+        "exam_rooms": ["student_ID", "timetable_ID", "exam_type", "seating_pdf"],
+    }
+    MAX_FINISHED = 1000  # Finished jobs kept for status queries
 
-"""
-                    )
-                    grp = input("Enter your choice: ")
-                    if grp == "1":
-                        custom["course_grouping"] = 0
-                        print("Classes grouped by type")
-                    elif grp == "2":
-                        custom["course_grouping"] = 1
-                        print("Classes grouped by course")
-                    elif grp == "3":
-                        continue
-                    else:
-                        print("Invalid Choice\n")
-                        continue
-                elif op == "3":
-                    print(
-                        """\nMenu:
-1. Midsems
-2. Compres
-3. Back to Customisation Menu"""
-                    )
-                    exam = input("Enter your choice: ")
-                    if exam == "1" or exam == "2":
-                        fp = input_filepath()
-                        custom["exam_rooms"]["midsem" if exam == "1" else "compre"] = fp
-                        print("Seating Arrangement Added")
-                    elif exam == "3":
-                        continue
-                    else:
-                        print("Invalid Choice\n")
-                        continue
-                elif op == "4":
-                    print(
-                        """\nMenu:
-1. Lecture
-2. Tutorial
-3. Practical
-4. Back to Customisation Menu"""
-                    )
-                    color = input("Enter your choice: ")
-                    id = input("Enter colorId: ")
-                    try:
-                        if not 1 <= int(id) <= 11:
-                            raise ValueError
-                        custom["classes_color_ids"][
-                            (
-                                "Lecture"
-                                if color == "1"
-                                else "Tutorial" if color == "2" else "Practical"
-                            )
-                        ] = id
-                        print("Color changed")
-                    except ValueError:
-                        print("Invalid Input\n")
-                        continue
-                elif op == "5":
-                    id = input("Enter colorId: ")
-                    try:
-                        if not 1 <= int(id) <= 11:
-                            raise ValueError
-                        custom["exam_color_id"] = id
-                        print("Color changed")
-                    except ValueError:
-                        print("Invalid Input\n")
-                        continue
-                elif op == "6":
-                    l = input("Enter colorIds to remove, separated by spaces: ").split()
-                    try:
-                        if not all(1 <= int(i) <= 11 for i in l):
-                            raise ValueError
-                        custom["remove_colors"].extend(l)
-                        print("Colors removed")
-                    except ValueError:
-                        print("Invalid Input\n")
-                        continue
-                elif op == "7":
-                    while True:
-                        print("\nMenu:")
-                        a = []
-                        for i in range(len(classes)):
-                            if classes[i]["title"] not in a:
-                                a.append(classes[i]["title"])
-                                print(f"{len(a)}. {classes[i]['title']}")
-                        print(f"{len(a)+1}. Back to Customisation Menu\n")
-                        course = input("Enter your choice: ")
-                        if course == str(len(a) + 1):
-                            break
-                        try:
-                            if not 1 <= int(course) <= len(a):
-                                raise ValueError
-                            while True:
-                                print(
-                                    f"""\nMenu {a[int(course)-1]}:
-    1. Change title
-    2. Add description
-    3. Change color
-    4. Back to Customisation Menu"""
-                                )
-                                edit = input("Enter your choice: ")
-                                if edit == "1":
-                                    title = input("Enter title: ")
-                                    custom[a[int(course) - 1]]["title"] = title
-                                    print("Title changed\n")
-                                elif edit == "2":
-                                    desc = input("Enter description: ")
-                                    custom[a[int(course) - 1]]["desc"] = desc
-                                    print("Description added\n")
-                                elif edit == "3":
-                                    id = input("Enter colorId: ")
-                                    try:
-                                        if not 1 <= int(id) <= 11:
-                                            raise ValueError
-                                        custom[a[int(course) - 1]]["color"] = id
-                                        print("Color changed\n")
-                                    except ValueError:
-                                        print("Invalid Input\n")
-                                        continue
-                                elif edit == "4":
-                                    break
-                                else:
-                                    print("Invalid Choice\n")
-                                    continue
-                        except ValueError:
-                            print("Invalid Choice\n")
-                            break
-                elif op == "8":
-                    break
-                else:
-                    print("Invalid Choice\n")
-                    continue
-            new_custom = custom
-            break
-        elif choice == "3":
-            new_custom = custom
-            break
+    def __init__(self, workers):
+        self.executor = ThreadPoolExecutor(max_workers=workers)
+        self.jobs = OrderedDict()
+        self.student_locks = {}
+        self.lock = threading.Lock()
+
+    def submit(self, request):
+        """
+        Queues a job
+
+        Args:
+            request (dict): Job request
+        Returns:
+            dict: Job status
+        """
+        if request.get("action") not in self.REQUIRED:
+            raise ValueError(f"action must be one of {', '.join(self.REQUIRED)}")
+        missing = [i for i in self.REQUIRED[request["action"]] if not request.get(i)]
+        if missing:
+            raise ValueError(f"Missing {', '.join(missing)}")
+        request["student_ID"] = request["student_ID"].strip().upper()
+
+        job = {
+            "id": uuid.uuid4().hex,
+            "action": request["action"],
+            "student_ID": request["student_ID"],
+            "status": "queued",
+        }
+        with self.lock:
+            self.jobs[job["id"]] = job
+            lock = self.student_locks.setdefault(
+                request["student_ID"], threading.Lock()
+            )
+            finished = [
+                k for k, v in self.jobs.items() if v["status"] in ("done", "failed")
+            ]
+            for k in finished[: max(0, len(finished) - self.MAX_FINISHED)]:
+                del self.jobs[k]
+        self.executor.submit(self.run, job, request, lock)
+        return dict(job)
+
+    def run(self, job, request, lock):
+        def report(event):
+            # Latest progress, shown in the job's status
+            job["progress"] = {
+                k: event.get(k) for k in ("phase", "done", "total", "rate", "eta")
+            }
+
+        with lock:
+            job["status"] = "running"
+            state.reset()  # Worker threads are reused by the jobs of other students
+            sink = (
+                JsonLinesSink(request["progress_log"])
+                if request.get("progress_log")
+                else None
+            )
+            state.progress = Progress([report] + ([sink] if sink else []))
+            try:
+                run_service_job(request)
+                job["status"] = "done"
+            except BaseException as e:  # exit() is used for invalid timetables
+                job["status"] = "failed"
+                job["error"] = str(e) or type(e).__name__
+            finally:
+                state.progress = None
+                if sink:
+                    sink.close()
+
+    def get(self, job_id):
+        """
+        Gets the status of a job
+
+        Args:
+            job_id (str): Job ID
+        Returns:
+            dict: Job status, or None if not found
+        """
+        with self.lock:
+            job = self.jobs.get(job_id)
+            return dict(job) if job else None
+
+
+class ServiceHandler(BaseHTTPRequestHandler):
+    """
+    HTTP API of the service
+
+    - POST /jobs: Queues a job, returns its status
+    - GET /jobs/<id>: Status of a job
+    - GET /stats: Cache statistics
+    """
+
+    queue = None
+
+    def address_string(self):
+        # Unix socket clients have no address
+        return self.client_address[0] if self.client_address else "unix"
+
+    def reply(self, status, body):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_POST(self):
+        if self.path != "/jobs":
+            self.reply(404, {"error": "Not found"})
+            return
+        try:
+            request = json.loads(
+                self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            )
+            job = self.queue.submit(request)
+        except (ValueError, AttributeError) as e:
+            self.reply(400, {"error": str(e)})
+            return
+        self.reply(202, job)
+
+    def do_GET(self):
+        if self.path == "/stats":
+            self.reply(200, {"cache": prefetcher.stats()})
+        elif self.path.startswith("/jobs/"):
+            job = self.queue.get(self.path[len("/jobs/") :])
+            if job:
+                self.reply(200, job)
+            else:
+                self.reply(404, {"error": "Job not found"})
         else:
-            print("Invalid Choice\n")
-            continue
+            self.reply(404, {"error": "Not found"})
 
-    return new_custom
+
+class UnixHTTPServer(ThreadingHTTPServer):
+    """
+    HTTP server listening on a Unix socket
+    """
+
+    address_family = socket.AF_UNIX
+
+    def server_bind(self):
+        socketserver.TCPServer.server_bind(self)
+        self.server_name = "localhost"
+        self.server_port = 0
+
+
+def serve(host, port, socket_path=None, workers=4, cache_mb=256):
+    """
+    Runs the script as a long-lived local service for many students
+    The course catalogue, seating arrangements and holidays are cached and shared by all jobs,
+    so each job mostly costs its own calendar writes
+
+    Args:
+        host (str): Host to listen on
+        port (int): Port to listen on
+        socket_path (str): Unix socket to listen on instead of host and port
+        workers (int): Number of jobs run at once
+        cache_mb (int): Memory limit of the shared caches in MiB
+    Returns:
+        None
+    """
+    prefetcher.max_bytes = cache_mb * 2**20
+    ServiceHandler.queue = JobQueue(workers)
+    if socket_path:
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
+        server = UnixHTTPServer(socket_path, ServiceHandler)
+        print(f"Listening on {socket_path}")
+    else:
+        server = ThreadingHTTPServer((host, port), ServiceHandler)
+        print(f"Listening on http://{host}:{port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+# endregion
 
 
-def main(creds):
-    global CALENDAR_ID
+def main(creds, strategy="auto", budget=None):
     """
     Main function to run the script
 
     Args:
         creds (google.oauth2.credentials.Credentials): Google Calendar API credentials
+        strategy (str): How to send the changes, one of STRATEGIES or "auto" to pick the cheapest
+        budget (int): Most quota units a run may use, QUOTA_BUDGET if None
     Returns:
         None
     """
     service = api_build("calendar", "v3", credentials=creds)
 
-    existing_calendars = service.calendarList().list().execute()
-    created_calendar = None
-
-    for i in existing_calendars["items"]:
-        if i["summary"] == "Timetable":
-            created_calendar = i
-            break
-    else:
-        created_calendar = (
-            service.calendars()
-            .insert(
-                body={
-                    "summary": "Timetable",
-                    "timeZone": "Asia/Kolkata",
-                }
-            )
-            .execute()
+    state.calendar_id = get_calendar_id(service)
+    print(f"Calendar ID: {state.calendar_id}")
+    if unfinished_run() is not None:
+        print(
+            "\nAn earlier run didn't finish. Run `python script.py resume` to finish it "
+            "or `python script.py rollback` to undo it."
         )
-    CALENDAR_ID = created_calendar["id"]
-    print(f"Calendar ID: {CALENDAR_ID}")
 
     student_ID = None
     while True:
@@ -1084,6 +5941,7 @@ def main(creds):
         break
 
     timetable_ID = input("Enter timetable ID: ")
+    prefetch(timetable_ID)
 
     while True:
         print(
@@ -1091,16 +5949,37 @@ def main(creds):
 1. Add Classes and Exams
 2. Update Exam Seating Arrangement
 3. Delete Events in a Date Range
-4. Exit
+4. Reset the Timetable Calendar
+5. Exit
 """
         )
         choice = input("Enter your choice: ")
         if choice == "1":
             start_date, end_date = input_dates()
-            custom = initialise(service, timetable_ID, student_ID, start_date, end_date)
+            applied = load_applied()
+            try:
+                custom = initialise(
+                    service,
+                    timetable_ID,
+                    student_ID,
+                    start_date,
+                    end_date,
+                    journal=Journal(params={"token": "token.json"}),
+                    strategy=strategy,
+                    budget=budget,
+                    # Courses keep their colors when the classes are added again
+                    colors=(
+                        applied["colors"]
+                        if applied and applied["calendar_id"] == state.calendar_id
+                        else None
+                    ),
+                )
+            except BudgetExceeded as e:
+                print(f"\n{e}")
+                continue
             with open("customisation.json", "w") as f:
                 json.dump(custom, f, indent=4)
-            del_classes_on_holidays(service, get_holidays(HOLIDAY_LIST_PATH))
+            save_applied(custom, timetable_ID, student_ID, start_date, end_date)
             print("\nDone.")
             break
         elif choice == "2":
@@ -1113,16 +5992,33 @@ def main(creds):
                 )
                 op = input("Enter your choice: ")
                 if op == "1" or op == "2":
-                    add_exam_rooms(
-                        service,
-                        get_room_numbers(
-                            input_filepath(),
-                            get_courses_enrolled(timetable_ID),
+                    fp = input_filepath()
+                    examtype = "midsem" if op == "1" else "compre"
+                    exams = get_timetable(timetable_ID)["examTimes"]
+                    previous = load_seating_index(examtype, student_ID)
+                    print("Fetching exam room numbers...")
+                    if previous is None:
+                        add_exam_rooms(
+                            service,
+                            exam_room_numbers(fp, timetable_ID, student_ID),
+                            examtype,
+                            increment_exam_year=None,
+                            exams=exams,
+                        )
+                    else:
+                        # Only the rooms changed since the last revision are updated
+                        print_revision(
                             student_ID,
-                        ),
-                        "midsem" if op == "1" else "compre",
-                        increment_exam_year=None,
-                    )
+                            revise_exam_rooms(
+                                service,
+                                previous,
+                                get_seating_index(fp),
+                                exams,
+                                student_ID,
+                                examtype,
+                            ),
+                        )
+                    save_seating_index(examtype, student_ID, fp, get_seating_index(fp))
                 elif op == "3":
                     break
                 else:
@@ -1131,20 +6027,27 @@ def main(creds):
         elif choice == "3":
             start_date, end_date = input_dates()
             print(
-                "\nFilter events:\n- Leave blank to skip\n- Separate multiple entries with spaces\n\n"
-            )
-            excludeEvent = [i for i in input("Enter event names to exclude: ").split()]
-            excludeColorId = [i for i in input("Enter colorIds to exclude: ").split()]
-            onlyColorId = [
-                i
-                for i in input(
-                    "Enter colorIds to include (If entered, only these events will be deleted): "
-                ).split()
-            ]
-            del_events(
-                service, start_date, end_date, excludeEvent, excludeColorId, onlyColorId
+                "\nFilter events:\n- Leave blank to delete all events"
+                "\n- Fields: summary, color, time, day, course, kind"
+                '\n- Example: kind=class and day=MO,WE and time>=14:00 and not summary~"lab"\n\n'
             )
+            while True:
+                try:
+                    where = EventFilter(input("Enter filter: "))
+                    break
+                except ValueError as e:
+                    print(f"{e}\n")
+            del_events(service, start_date, end_date, where)
         elif choice == "4":
+            f = input(
+                "This deletes every event in the Timetable calendar. Are you sure? (y/n): "
+            )
+            if f.lower() != "y":
+                continue
+            keep = input("Keep events not added by this script? (y/n): ")
+            reset_calendar(service, keep_foreign=keep.lower() == "y")
+            print(f"Calendar ID: {state.calendar_id}")
+        elif choice == "5":
             break
         else:
             print("Invalid Choice\n")
@@ -1152,5 +6055,156 @@ def main(creds):
 
 
 if __name__ == "__main__":
-    creds = auth()
-    main(creds=creds)
+    parser = argparse.ArgumentParser(
+        description="Adds your Chrono timetable to Google Calendar"
+    )
+    parser.add_argument(
+        "--strategy",
+        choices=("auto",) + STRATEGIES,
+        default="auto",
+        help="How to send the changes to Google Calendar (default: the cheapest)",
+    )
+    parser.add_argument(
+        "--budget", type=int, help="Refuse runs that need more quota units than this"
+    )
+    parser.add_argument(
+        "--verbose", action="store_true", help="Print a line for every event changed"
+    )
+    parser.add_argument(
+        "--progress-log", help="Also write progress events to this file as JSON lines"
+    )
+    subparsers = parser.add_subparsers(dest="command")
+    watch_parser = subparsers.add_parser(
+        "watch", help="Poll Chrono and re-sync only the courses that changed"
+    )
+    watch_parser.add_argument(
+        "config", nargs="?", default="watch.json", help="Path to the watch config"
+    )
+    serve_parser = subparsers.add_parser(
+        "serve", help="Run as a local service that adds timetables for many students"
+    )
+    serve_parser.add_argument("--host", default="127.0.0.1")
+    serve_parser.add_argument("--port", type=int, default=8080)
+    serve_parser.add_argument(
+        "--socket", help="Listen on this Unix socket instead of host and port"
+    )
+    serve_parser.add_argument(
+        "--workers", type=int, default=4, help="Number of jobs run at once"
+    )
+    serve_parser.add_argument(
+        "--cache-mb", type=int, default=256, help="Memory limit of the shared caches"
+    )
+    resume_parser = subparsers.add_parser(
+        "resume", help="Finish the last run that died partway"
+    )
+    resume_parser.add_argument("--journal", default=JOURNAL_PATH)
+    rollback_parser = subparsers.add_parser(
+        "rollback", help="Delete the events added by the last run"
+    )
+    rollback_parser.add_argument("--journal", default=JOURNAL_PATH)
+    rollback_parser.add_argument("--run", help="ID of the run to roll back")
+    revise_parser = subparsers.add_parser(
+        "revise",
+        help="Update the exam rooms of many students to a revised seating arrangement",
+    )
+    revise_parser.add_argument(
+        "pdf", help="Path to the revised seating arrangement pdf"
+    )
+    revise_parser.add_argument(
+        "--exam-type", choices=("midsem", "compre"), required=True
+    )
+    revise_parser.add_argument(
+        "--cohort", default="watch.json", help="Students, in the format of watch.json"
+    )
+    reset_parser = subparsers.add_parser(
+        "reset", help="Delete every event in the Timetable calendar at once"
+    )
+    reset_parser.add_argument(
+        "--keep-foreign",
+        action="store_true",
+        help="Keep the events not added by this script",
+    )
+    course_parser = subparsers.add_parser(
+        "course",
+        help="Drop, recolor, hide or show a course (one call per sub-calendar, see calendar_layout)",
+    )
+    course_parser.add_argument("course", help="Course ID, e.g. 'CS F211'")
+    course_parser.add_argument(
+        "--drop", action="store_true", help="Remove the course from the calendar"
+    )
+    course_parser.add_argument(
+        "--color", choices=list(map(str, GOOGLE_CALENDAR_COLORS)), help="New colorId"
+    )
+    course_parser.add_argument(
+        "--kind",
+        choices=("class", "exam"),
+        help="Only the sub-calendar of classes or exams (course_kind layout)",
+    )
+    shown = course_parser.add_mutually_exclusive_group()
+    shown.add_argument("--show", dest="shown", action="store_true", default=None)
+    shown.add_argument("--hide", dest="shown", action="store_false")
+    reapply_parser = subparsers.add_parser(
+        "reapply",
+        help="Apply changes to the customisation by patching only the events they change",
+    )
+    reapply_parser.add_argument(
+        "customisation",
+        nargs="?",
+        default="customisation.json",
+        help="Path to the changed customisation",
+    )
+    reapply_parser.add_argument(
+        "--applied",
+        default=APPLIED_PATH,
+        help="Customisation last applied, saved after adding the classes",
+    )
+    args = parser.parse_args()
+    state.progress = Progress([ConsoleRenderer(verbose=args.verbose)])
+    if args.progress_log:
+        state.progress.listeners.append(JsonLinesSink(args.progress_log))
+
+    if args.command == "watch":
+        watch(args.config)
+    elif args.command == "serve":
+        serve(args.host, args.port, args.socket, args.workers, args.cache_mb)
+    elif args.command == "reset":
+        service = api_build("calendar", "v3", credentials=auth())
+        state.calendar_id = get_calendar_id(service)
+        reset_calendar(service, args.keep_foreign)
+    elif args.command == "course":
+        service = api_build("calendar", "v3", credentials=auth())
+        state.calendar_id = get_calendar_id(service)
+        if args.drop:
+            print(
+                f"{args.course} dropped, {drop_course(service, args.course)} calendars or events deleted"
+            )
+        elif args.color or args.shown is not None:
+            if not set_course_calendars(
+                service, args.course, args.kind, args.color, args.shown
+            ):
+                print(
+                    f"{args.course} has no calendar of its own, "
+                    "set calendar_layout in the customisation to give it one"
+                )
+    elif args.command == "reapply":
+        applied = load_applied(args.applied)
+        if applied is None:
+            print("No customisation applied yet, add your classes and exams first")
+        else:
+            with open(args.customisation, "r") as f:
+                custom = json.load(f)
+            service = api_build("calendar", "v3", credentials=auth())
+            print(
+                f"{reapply_customisation(service, custom, applied, args.applied)} calls made"
+            )
+    elif args.command == "revise":
+        revise_seating(args.pdf, args.exam_type, args.cohort)
+    elif args.command == "resume":
+        resume(args.journal)
+    elif args.command == "rollback":
+        rollback(
+            api_build("calendar", "v3", credentials=auth()), args.journal, args.run
+        )
+    else:
+        creds = auth()
+        main(creds=creds, strategy=args.strategy, budget=args.budget)
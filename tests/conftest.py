@@ -0,0 +1,68 @@
+import copy
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import script  # noqa: E402
+from fake_calendar import FakeService  # noqa: E402
+
+TIMETABLE = {
+    "sections": [
+        {
+            "roomTime": ["CS F211:F102:M:2", "CS F211:F102:W:2", "CS F211:F102:F:2"],
+            "type": "L",
+            "number": 1,
+            "instructors": ["A"],
+            "courseId": "c1",
+        },
+        {
+            "roomTime": ["MATH F211:G101:Th:3"],
+            "type": "T",
+            "number": 3,
+            "instructors": ["C"],
+            "courseId": "c2",
+        },
+    ],
+    "examTimes": [
+        "CS F211|MIDSEM|2025-10-05T04:00:00Z|2025-10-05T05:30:00Z",
+        "MATH F211|COMPRE|2025-12-05T04:00:00Z|2025-12-05T07:00:00Z",
+    ],
+}
+COURSES = [
+    {"id": "c1", "name": "DATA STRUCTURES"},
+    {"id": "c2", "name": "PROBABILITY"},
+]
+
+
+@pytest.fixture
+def service(tmp_path, monkeypatch):
+    """Fake Calendar API service with an empty Timetable calendar, in a fresh working directory"""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(script, "state", script.RunState())
+    service = FakeService()
+    script.state.calendar_id = service.add_calendar()
+    return service
+
+
+@pytest.fixture
+def timetable():
+    return copy.deepcopy(TIMETABLE)
+
+
+@pytest.fixture
+def catalogue():
+    return script.CourseCatalogue(COURSES)
+
+
+@pytest.fixture
+def custom():
+    return {
+        "reminder": 10,
+        "course_grouping": 0,
+        "classes_color_ids": {"Lecture": "10", "Tutorial": "9", "Practical": "11"},
+        "exam_rooms": {},
+        "remove_colors": [],
+        "exam_color_id": "5",
+    }
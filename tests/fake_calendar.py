@@ -0,0 +1,340 @@
+"""
+In-memory stand-in for the parts of the Google Calendar API the script uses
+
+Recurring events are expanded with dateutil, deleted occurrences are kept as cancelled instances
+(as Google does) and every request made is counted in FakeService.calls
+"""
+
+import collections
+import copy
+import datetime
+import types
+
+from dateutil import rrule
+from googleapiclient.errors import HttpError
+from httplib2 import Response
+
+
+def http_error(status):
+    return HttpError(Response({"status": status}), b"{}")
+
+
+def parse_time(text):
+    return datetime.datetime.fromisoformat(text.replace("Z", "+00:00"))
+
+
+def utc_key(moment):
+    return moment.astimezone(datetime.timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+
+
+class FakeRequest:
+    http = types.SimpleNamespace(credentials=None)  # Read by the parallel dispatcher
+
+    def __init__(self, service, name, fn):
+        self.service, self.name, self.fn = service, name, fn
+
+    def execute(self, **kwargs):
+        self.service.calls[self.name] += 1
+        return self.fn()
+
+
+class FakeBatch:
+    def __init__(self, service, callback=None):
+        self.service, self.callback, self.requests = service, callback, []
+
+    def add(self, request, callback=None, request_id=None):
+        self.requests.append(
+            (request, callback or self.callback, request_id or str(len(self.requests)))
+        )
+
+    def execute(self):
+        self.service.calls["batch"] += 1
+        for request, callback, request_id in self.requests:
+            try:
+                response, exception = request.execute(), None
+            except HttpError as e:
+                response, exception = None, e
+            if callback is not None:
+                callback(request_id, response, exception)
+
+
+class FakeService:
+    """Calendar API service with its calendars and events in memory"""
+
+    def __init__(self):
+        self.calendar_list = {}  # Calendar ID -> calendarList entry
+        self.stored = collections.defaultdict(dict)  # Calendar ID -> event ID -> event
+        self.calls = collections.Counter()
+        self.next_id = 0
+        self.refused = set()  # Summaries of events that can't be inserted (500)
+        self.page_size = 250  # Most events in a page of instances
+        self.gone = (
+            set()
+        )  # IDs of events deleted elsewhere since they were listed (410)
+
+    def new_id(self, prefix):
+        self.next_id += 1
+        return f"{prefix}{self.next_id}"
+
+    def add_calendar(self, summary="Timetable"):
+        calendar_id = self.new_id("calendar")
+        self.calendar_list[calendar_id] = {"id": calendar_id, "summary": summary}
+        return calendar_id
+
+    def events(self):
+        return FakeEvents(self)
+
+    def calendars(self):
+        return FakeCalendars(self)
+
+    def calendarList(self):
+        return FakeCalendarList(self)
+
+    def new_batch_http_request(self, callback=None):
+        return FakeBatch(self, callback)
+
+    def occurrences(self, calendar_id, master):
+        """Start times of the occurrences of an event, less its EXDATEs and deleted instances"""
+        start = parse_time(master["start"]["dateTime"])
+        if not master.get("recurrence"):
+            return [start]
+        rules = rrule.rruleset()
+        for line in master["recurrence"]:
+            name, _, value = line.partition(":")
+            if name == "RRULE":
+                rules.rrule(rrule.rrulestr(value, dtstart=start))
+            elif name.startswith("EXDATE"):
+                for i in value.split(","):
+                    if i.endswith("Z"):
+                        rules.exdate(
+                            parse_time(i[:-1]).replace(tzinfo=datetime.timezone.utc)
+                        )
+                    else:
+                        rules.exdate(parse_time(i).replace(tzinfo=start.tzinfo))
+        deleted = {
+            i["originalStartTime"]["dateTime"]
+            for i in self.stored[calendar_id].values()
+            if i.get("recurringEventId") == master["id"] and i["status"] == "cancelled"
+        }
+        # Series that never end are expanded for two years
+        horizon = start + datetime.timedelta(days=730)
+        return [
+            i
+            for i in rules.between(start, horizon, inc=True)
+            if i.isoformat() not in deleted
+        ]
+
+    def masters(self, calendar_id):
+        return [
+            i
+            for i in self.stored[calendar_id].values()
+            if i["status"] != "cancelled" and not i.get("recurringEventId")
+        ]
+
+    def instances(self, calendar_id):
+        """Every occurrence of the live events of a calendar, as single events"""
+        instances = []
+        for master in self.masters(calendar_id):
+            duration = parse_time(master["end"]["dateTime"]) - parse_time(
+                master["start"]["dateTime"]
+            )
+            for start in self.occurrences(calendar_id, master):
+                instance = copy.deepcopy(master)
+                instance.pop("recurrence", None)
+                if master.get("recurrence"):
+                    instance["id"] = f"{master['id']}_{utc_key(start)}"
+                    instance["recurringEventId"] = master["id"]
+                instance["start"] = {"dateTime": start.isoformat()}
+                instance["end"] = {"dateTime": (start + duration).isoformat()}
+                instances.append(instance)
+        return sorted(instances, key=lambda i: parse_time(i["start"]["dateTime"]))
+
+
+class FakeEvents:
+    def __init__(self, service):
+        self.service = service
+
+    def request(self, name, fn):
+        return FakeRequest(self.service, name, fn)
+
+    def insert(self, calendarId, body):
+        def insert():
+            events = self.service.stored[calendarId]
+            if body.get("summary") in self.service.refused:
+                raise http_error(500)
+            event_id = body.get("id") or self.service.new_id("event")
+            if event_id in events:
+                raise http_error(409)
+            events[event_id] = {
+                **copy.deepcopy(body),
+                "id": event_id,
+                "status": "confirmed",
+            }
+            return copy.deepcopy(events[event_id])
+
+        return self.request("insert", insert)
+
+    def update(self, calendarId, eventId, body):
+        def update():
+            events = self.service.stored[calendarId]
+            if eventId not in events:
+                raise http_error(404)
+            events[eventId] = {
+                **copy.deepcopy(body),
+                "id": eventId,
+                "status": "confirmed",
+            }
+            return copy.deepcopy(events[eventId])
+
+        return self.request("update", update)
+
+    def patch(self, calendarId, eventId, body):
+        def patch():
+            event = self.service.stored[calendarId].get(eventId)
+            if event is None or event["status"] == "cancelled":
+                raise http_error(404)
+            event.update(copy.deepcopy(body))
+            return copy.deepcopy(event)
+
+        return self.request("patch", patch)
+
+    def delete(self, calendarId, eventId):
+        def delete():
+            if eventId in self.service.gone:
+                raise http_error(410)
+            events = self.service.stored[calendarId]
+            if eventId not in events and "_" in eventId:
+                master_id, key = eventId.split("_", 1)
+                master = events.get(master_id)
+                if master is None or master["status"] == "cancelled":
+                    raise http_error(404)
+                starts = {
+                    utc_key(i): i for i in self.service.occurrences(calendarId, master)
+                }
+                if key not in starts:
+                    raise http_error(410)
+                events[eventId] = {
+                    "id": eventId,
+                    "recurringEventId": master_id,
+                    "originalStartTime": {"dateTime": starts[key].isoformat()},
+                    "status": "cancelled",
+                }
+                return ""
+            if eventId not in events:
+                raise http_error(404)
+            if events[eventId]["status"] == "cancelled":
+                raise http_error(410)
+            events[eventId]["status"] = "cancelled"
+            return ""
+
+        return self.request("delete", delete)
+
+    def get(self, calendarId, eventId):
+        def get():
+            if eventId not in self.service.stored[calendarId]:
+                raise http_error(404)
+            return copy.deepcopy(self.service.stored[calendarId][eventId])
+
+        return self.request("get", get)
+
+    def instances(self, calendarId, eventId, timeMin, timeMax, pageToken=None):
+        def instances():
+            low, high = parse_time(timeMin), parse_time(timeMax)
+            items = [
+                i
+                for i in self.service.instances(calendarId)
+                if i.get("recurringEventId") == eventId
+                and low <= parse_time(i["start"]["dateTime"]) < high
+            ]
+            start = int(pageToken or 0)
+            page = {"items": items[start : start + self.service.page_size]}
+            if start + self.service.page_size < len(items):
+                page["nextPageToken"] = str(start + self.service.page_size)
+            return page
+
+        return self.request("instances", instances)
+
+    def list(
+        self,
+        calendarId,
+        timeMin=None,
+        timeMax=None,
+        singleEvents=False,
+        privateExtendedProperty=None,
+        q=None,
+        pageToken=None,
+        showDeleted=False,
+        **kwargs,
+    ):
+        def list_():
+            if singleEvents:
+                items = self.service.instances(calendarId)
+            else:
+                items = [
+                    i
+                    for i in self.service.stored[calendarId].values()
+                    # Deleted occurrences of recurring events are listed unless expanded
+                    if i["status"] != "cancelled"
+                    or i.get("recurringEventId")
+                    or showDeleted
+                ]
+            low = parse_time(timeMin) if timeMin else None
+            high = parse_time(timeMax) if timeMax else None
+            tags = dict(i.split("=", 1) for i in privateExtendedProperty or [])
+            matched = []
+            for i in items:
+                if "start" in i and not i.get("recurrence"):
+                    if low and parse_time(i["end"]["dateTime"]) <= low:
+                        continue
+                    if high and parse_time(i["start"]["dateTime"]) >= high:
+                        continue
+                private = i.get("extendedProperties", {}).get("private", {})
+                if any(private.get(k) != v for k, v in tags.items()):
+                    continue
+                if q and q.lower() not in i.get("summary", "").lower():
+                    continue
+                matched.append(copy.deepcopy(i))
+            return {"items": matched}
+
+        return self.request("list", list_)
+
+
+class FakeCalendars:
+    def __init__(self, service):
+        self.service = service
+
+    def insert(self, body):
+        def insert():
+            calendar_id = self.service.add_calendar(body["summary"])
+            return {**body, "id": calendar_id}
+
+        return FakeRequest(self.service, "calendars.insert", insert)
+
+    def delete(self, calendarId):
+        def delete():
+            if calendarId not in self.service.calendar_list:
+                raise http_error(404)
+            del self.service.calendar_list[calendarId]
+            self.service.stored.pop(calendarId, None)
+            return ""
+
+        return FakeRequest(self.service, "calendars.delete", delete)
+
+
+class FakeCalendarList:
+    def __init__(self, service):
+        self.service = service
+
+    def list(self, **kwargs):
+        return FakeRequest(
+            self.service,
+            "calendarList.list",
+            lambda: {"items": copy.deepcopy(list(self.service.calendar_list.values()))},
+        )
+
+    def patch(self, calendarId, body, **kwargs):
+        def patch():
+            self.service.calendar_list[calendarId].update(body)
+            return copy.deepcopy(self.service.calendar_list[calendarId])
+
+        return FakeRequest(self.service, "calendarList.patch", patch)
@@ -0,0 +1,52 @@
+import script
+
+
+def add_classes(service, timetable, catalogue, custom, layout):
+    custom = {**custom, "calendar_layout": layout}
+    for code in ("CS F211", "MATH F211"):
+        custom[code] = {"title": code, "desc": "", "color": ""}
+    script.register_colors(custom)
+    script.state.layout = layout
+    script.add_classes(
+        service,
+        script.build_classes(timetable, catalogue),
+        "2025-08-04",
+        "2025-11-28",
+        custom,
+    )
+
+
+def events(service):
+    """Live events made by the script in each calendar"""
+    return {
+        calendar_id: sorted(
+            k
+            for k, v in service.stored[calendar_id].items()
+            if v["status"] != "cancelled"
+        )
+        for calendar_id in service.calendar_list
+    }
+
+
+def test_courses_in_the_timetable_calendar_stay_there(
+    service, timetable, catalogue, custom
+):
+    add_classes(service, timetable, catalogue, custom, "single")
+    before = events(service)
+
+    add_classes(service, timetable, catalogue, custom, "course")
+
+    assert events(service) == before
+    assert script.sub_calendars() == {}
+
+
+def test_courses_keep_their_calendars_when_the_layout_changes(
+    service, timetable, catalogue, custom
+):
+    add_classes(service, timetable, catalogue, custom, "course")
+    before = events(service)
+
+    add_classes(service, timetable, catalogue, custom, "course_kind")
+
+    assert events(service) == before
+    assert sorted(script.sub_calendars()) == ["CS F211", "MATH F211"]
@@ -0,0 +1,82 @@
+import json
+
+import pytest
+
+import script
+
+COURSES = [
+    {
+        "id": "c1",
+        "name": "DATA STRUCTURES",
+        "midsemStartTime": "2025-10-05T04:00:00Z",
+        "midsemEndTime": "2025-10-05T05:30:00Z",
+        "compreStartTime": "2025-12-05T04:00:00Z",
+        "compreEndTime": "2025-12-05T07:00:00Z",
+        "sections": [{"number": 1}],
+    },
+    {
+        "id": "c2",
+        "name": "PROBABILITY",
+        "midsemStartTime": None,
+        "midsemEndTime": None,
+        "compreStartTime": "2025-12-01T04:00:00Z",
+        "compreEndTime": "2025-12-01T07:00:00Z",
+    },
+    {
+        "id": "c3",
+        "name": "THESIS",
+        "midsemStartTime": "2025-10-10T09:00:00Z",
+        "midsemEndTime": "2025-10-10T10:30:00Z",
+        "compreStartTime": None,
+        "compreEndTime": None,
+    },
+]
+
+
+class Response:
+    """Streamed response of the course API"""
+
+    encoding = "utf-8"
+
+    def __init__(self, text):
+        self.text = text
+
+    def iter_content(self, chunk_size, decode_unicode):
+        for i in range(0, len(self.text), 5):
+            yield self.text[i : i + 5]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+
+def old_exam_dates(courses):
+    """Exam dates as the script found them before the catalogue, from a dict of the courses"""
+    details = {i["id"]: i for i in courses}
+    dates = {}
+    for field in script.CourseCatalogue.EXAM_FIELDS:
+        times = [i[field] for i in details.values() if i[field]]
+        dates[field] = (min(times).split("T")[0], max(times).split("T")[0])
+    return dates
+
+
+@pytest.fixture
+def catalogue():
+    return script.load_course_catalogue(Response(json.dumps(COURSES)))
+
+
+def test_lookups_match_a_dict_of_the_courses(catalogue):
+    details = {i["id"]: i for i in COURSES}
+    assert len(catalogue) == len(details)
+    for course_id, course in details.items():
+        assert course_id in catalogue
+        assert catalogue.name(course_id) == course["name"]
+    assert "c4" not in catalogue
+    with pytest.raises(KeyError):
+        catalogue.name("c4")
+
+
+def test_exam_range_matches_the_old_dates(catalogue):
+    assert catalogue.exam_range() == old_exam_dates(COURSES)
@@ -0,0 +1,57 @@
+import script
+
+
+def exam(summary, **fields):
+    return {
+        "summary": summary,
+        "start": {"dateTime": "2025-10-05T09:30:00+05:30", "timeZone": "Asia/Kolkata"},
+        "end": {"dateTime": "2025-10-05T11:00:00+05:30", "timeZone": "Asia/Kolkata"},
+        **fields,
+    }
+
+
+def test_untagged_exams_get_their_room_by_title(service, timetable, capsys):
+    calendar_id = script.state.calendar_id
+    old = (
+        service.events()
+        .insert(calendarId=calendar_id, body=exam("CS F211 - MIDSEM"))
+        .execute()
+    )
+    other = (
+        service.events().insert(calendarId=calendar_id, body=exam("Dentist")).execute()
+    )
+
+    script.add_exam_rooms(
+        service,
+        {"CS F211": "F102", "MATH F211": "G101"},
+        "midsem",
+        exams=timetable["examTimes"],
+    )
+
+    assert service.stored[calendar_id][old["id"]]["location"] == "F102"
+    assert "location" not in service.stored[calendar_id][other["id"]]
+    assert "No midsem event found for MATH F211" in capsys.readouterr().out
+
+
+def test_tagged_exams_get_their_room(service, timetable):
+    calendar_id = script.state.calendar_id
+    tagged = (
+        service.events()
+        .insert(
+            calendarId=calendar_id,
+            body=exam(
+                "Data Structures - MIDSEM",
+                extendedProperties=script.event_tags(
+                    "exam", "CS F211", script.get_semester("2025-10-05")
+                ),
+            ),
+        )
+        .execute()
+    )
+
+    script.add_exam_rooms(
+        service, {"CS F211": "F102"}, "midsem", exams=timetable["examTimes"]
+    )
+
+    assert service.stored[calendar_id][tagged["id"]]["location"] == "F102"
+    assert service.calls["list"] == 1
@@ -0,0 +1,173 @@
+import pytest
+
+import script
+
+
+def event(summary, course=None, kind=None, day="2025-09-01", time="09:00", **fields):
+    """Event made by this script if course is given, on a day at a time in IST"""
+    body = {
+        "summary": summary,
+        "colorId": "2",
+        "start": {"dateTime": f"{day}T{time}:00+05:30", "timeZone": "Asia/Kolkata"},
+        "end": {"dateTime": f"{day}T23:00:00+05:30", "timeZone": "Asia/Kolkata"},
+        **fields,
+    }
+    if course:
+        body["extendedProperties"] = {
+            "private": {**script.TOOL_TAGS, "course": course, "kind": kind}
+        }
+    return body
+
+
+def matches(text, *events):
+    where = script.EventFilter(text)
+    return [bool(where.matching_days(i)) for i in events]
+
+
+A_CLASS = event("A", "A", "class")
+B_CLASS = event("B", "B", "class")
+B_EXAM = event("B", "B", "exam")
+
+
+def test_and_binds_tighter_than_or():
+    assert matches("course=A or course=B and kind=exam", A_CLASS, B_CLASS, B_EXAM) == [
+        True,
+        False,
+        True,
+    ]
+    assert matches(
+        "(course=A or course=B) and kind=exam", A_CLASS, B_CLASS, B_EXAM
+    ) == [False, False, True]
+
+
+def test_not_binds_tighter_than_and():
+    assert matches("not course=A and kind=class", A_CLASS, B_CLASS, B_EXAM) == [
+        False,
+        True,
+        False,
+    ]
+    assert matches("not (course=A or kind=exam)", A_CLASS, B_CLASS, B_EXAM) == [
+        False,
+        True,
+        False,
+    ]
+
+
+def test_and_is_implied_between_terms():
+    assert matches("course=B kind=exam", A_CLASS, B_CLASS, B_EXAM) == matches(
+        "course=B and kind=exam", A_CLASS, B_CLASS, B_EXAM
+    )
+    assert matches("course=B kind=exam", B_CLASS, B_EXAM) == [False, True]
+
+
+def test_quoted_values_are_taken_as_they_are():
+    lab = event('Lab (and "or")')
+    assert matches('summary="Lab (and \\"or\\")"', lab, event("Lab")) == [True, False]
+    assert matches('summary~"physics lab"', event("Physics Lab 2"), lab) == [
+        True,
+        False,
+    ]
+
+
+def test_regex_terms_search_the_title():
+    assert matches(
+        r"summary~/^CS F2\d\d$/", event("CS F211"), event("CS F211 Lab")
+    ) == [True, False]
+    with pytest.raises(ValueError):
+        script.EventFilter("course~/A/")
+
+
+@pytest.mark.parametrize(
+    "text, tags, query",
+    [
+        ("course=A and summary~lab", {**script.TOOL_TAGS, "course": "A"}, "lab"),
+        (
+            "kind=class summary~physics summary~lab",
+            {**script.TOOL_TAGS, "kind": "class"},
+            "physics lab",
+        ),
+        ("course=A or course=B", {}, None),
+        ("summary~lab or kind=exam", {}, None),
+        ("not summary~lab", {}, None),
+        ("not course=A", {}, None),
+        ("(course=A or kind=exam) and summary~lab", {}, "lab"),
+        ("course=A,B", {}, None),
+    ],
+)
+def test_only_terms_every_match_needs_are_pushed_down(text, tags, query):
+    assert script.EventFilter(text).pushdown() == (tags, query)
+
+
+def test_search_doesnt_narrow_an_or(service):
+    for i in ("Gym", "Dentist", "Lunch"):
+        service.events().insert(
+            calendarId=script.state.calendar_id, body=event(i)
+        ).execute()
+    script.del_events(
+        service,
+        "2025-09-01",
+        "2025-09-01",
+        "summary~gym or summary~dentist",
+        force=True,
+    )
+    left = [i["summary"] for i in service.instances(script.state.calendar_id)]
+    assert left == ["Lunch"]
+
+
+def test_matching_days_of_a_series():
+    series = event("A", "A", "class", recurrence=["RRULE:FREQ=WEEKLY;BYDAY=MO,WE"])
+    assert script.EventFilter("day=MO").matching_days(series) == {"MO"}
+    assert script.EventFilter("not day=MO").matching_days(series) == {"WE"}
+    assert script.EventFilter("day=MO or day=WE").matching_days(series) == {"MO", "WE"}
+    assert script.EventFilter("kind=class").matching_days(series) == {"MO", "WE"}
+    assert script.EventFilter("kind=exam").matching_days(series) == set()
+    assert script.EventFilter("day=TU").matching_days(series) == set()
+
+
+@pytest.mark.parametrize(
+    "text", ["(course=A", "course=A)", "course=", "room=F102", "time>=9am", "day=XX"]
+)
+def test_invalid_filters_are_refused(text):
+    with pytest.raises(ValueError):
+        script.EventFilter(text)
+
+
+def test_wide_ranges_are_confirmed_month_by_month(service, monkeypatch):
+    for day in ("2025-09-10", "2025-10-10", "2025-11-10"):
+        service.events().insert(
+            calendarId=script.state.calendar_id, body=event(day, day=day)
+        ).execute()
+    answers = iter(["y", "n", "y"])
+    monkeypatch.setattr("builtins.input", lambda prompt: next(answers))
+    script.del_events(service, "2025-09-01", "2025-11-30")
+    left = [i["summary"] for i in service.instances(script.state.calendar_id)]
+    assert left == ["2025-10-10"]
+
+
+def test_consecutive_months_confirmed_are_merged(monkeypatch):
+    answers = iter(["y", "y", "n", "y"])
+    monkeypatch.setattr("builtins.input", lambda prompt: next(answers))
+    assert script.confirm_ranges("2025-08-15", "2025-11-05") == [
+        ("2025-08-15", "2025-09-30"),
+        ("2025-11-01", "2025-11-05"),
+    ]
+
+
+def test_series_keep_their_occurrences_in_months_not_confirmed(service, monkeypatch):
+    service.events().insert(
+        calendarId=script.state.calendar_id,
+        body=event("Gym", recurrence=["RRULE:FREQ=WEEKLY;BYDAY=MO;COUNT=14"]),
+    ).execute()
+    answers = iter(["y", "n", "y"])
+    monkeypatch.setattr("builtins.input", lambda prompt: next(answers))
+    script.del_events(service, "2025-09-01", "2025-11-30")
+    days = [
+        i["start"]["dateTime"][:10] for i in service.instances(script.state.calendar_id)
+    ]
+    assert days == [
+        "2025-10-06",
+        "2025-10-13",
+        "2025-10-20",
+        "2025-10-27",
+        "2025-12-01",
+    ]
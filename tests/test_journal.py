@@ -0,0 +1,51 @@
+import script
+
+
+def event(event_id, day):
+    return {
+        "id": event_id,
+        "summary": "CS F211 Lecture",
+        "start": {"dateTime": f"{day}T09:00:00+05:30", "timeZone": "Asia/Kolkata"},
+        "end": {"dateTime": f"{day}T10:00:00+05:30", "timeZone": "Asia/Kolkata"},
+    }
+
+
+def journaled_run(service, events):
+    """Inserts events in a journaled run, then rolls the run back"""
+    journal = script.Journal("journal.jsonl")
+    journal.begin({"calendar_id": script.state.calendar_id})
+    script.state.journal = journal
+    for i in events:
+        script.insert_event(service, i)
+    journal.end()
+    journal.close()
+    script.state.journal = None
+    script.rollback(service, "journal.jsonl", journal.run)
+
+
+def live(service):
+    return {
+        k
+        for k, v in service.stored[script.state.calendar_id].items()
+        if v["status"] != "cancelled"
+    }
+
+
+def test_rollback_leaves_events_the_run_only_overwrote(service):
+    service.events().insert(
+        calendarId=script.state.calendar_id, body=event("existing", "2025-09-01")
+    ).execute()
+    journaled_run(
+        service, [event("existing", "2025-09-01"), event("new", "2025-09-02")]
+    )
+    assert live(service) == {"existing"}
+
+
+def test_rollback_deletes_events_the_run_restored(service):
+    calendar_id = script.state.calendar_id
+    service.events().insert(
+        calendarId=calendar_id, body=event("deleted", "2025-09-01")
+    ).execute()
+    service.events().delete(calendarId=calendar_id, eventId="deleted").execute()
+    journaled_run(service, [event("deleted", "2025-09-01")])
+    assert live(service) == set()
@@ -0,0 +1,39 @@
+import pytest
+
+import script
+
+TEXT = '[{"id": "c1", "name": "A \\"quoted\\", [bracketed] name"}, {"id": "c2", "sections": [[1, 2], {"a": {}}]}, {"id": "c3", "name": "\\u00e9t\\u00e9"}]'
+
+
+def chunked(text, size):
+    return [text[i : i + size] for i in range(0, len(text), size)]
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 7, len(TEXT)])
+def test_elements_are_the_same_whatever_the_chunk_boundaries(size):
+    assert list(script.iter_json_array(chunked(TEXT, size))) == script.json.loads(TEXT)
+
+
+def test_nested_arrays_and_objects():
+    text = '[[1, [2, [3]]], {"a": [{"b": []}]}, []]'
+    assert list(script.iter_json_array(chunked(text, 4))) == script.json.loads(text)
+
+
+def test_numbers_split_between_chunks():
+    assert list(script.iter_json_array(["[12", "34, 5", ".5]"])) == [1234, 5.5]
+
+
+@pytest.mark.parametrize("text", ["[]", " [ ] ", "[\n]"])
+def test_empty_array(text):
+    assert list(script.iter_json_array(chunked(text, 1))) == []
+
+
+@pytest.mark.parametrize("text", ['[{"id": "c1"}', '[{"id": "c1"}, {"id": "c', "[", ""])
+def test_truncated_input_raises(text):
+    with pytest.raises(ValueError):
+        list(script.iter_json_array(chunked(text, 3)))
+
+
+def test_input_that_isnt_an_array_raises():
+    with pytest.raises(ValueError):
+        list(script.iter_json_array(['{"id": "c1"}']))
@@ -0,0 +1,63 @@
+import pytest
+
+import script
+
+
+class Calls:
+    """Function that returns the number of times it was called"""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self):
+        self.count += 1
+        return self.count
+
+
+def test_least_recently_used_result_is_evicted():
+    prefetcher = script.Prefetcher(max_workers=1, max_entries=2)
+    prefetcher.set(("a",), 1)
+    prefetcher.set(("b",), 2)
+    assert prefetcher.result(("a",), Calls()) == 1
+    prefetcher.set(("c",), 3)
+    assert list(prefetcher.futures) == [("a",), ("c",)]
+
+
+def test_results_over_the_memory_limit_are_evicted():
+    prefetcher = script.Prefetcher(max_workers=1, max_bytes=2 * 2**10)
+    prefetcher.set(("small",), "x")
+    prefetcher.set(("big",), "x" * 2**11)
+    assert ("small",) not in prefetcher.futures
+    assert prefetcher.stats()["entries"] <= 1
+
+
+def test_expired_result_is_reloaded(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(script.time, "monotonic", lambda: now[0])
+    prefetcher = script.Prefetcher(max_workers=1)
+    calls = Calls()
+    assert prefetcher.result(("timetable",), calls, ttl=60) == 1
+    now[0] += 59
+    assert prefetcher.result(("timetable",), calls, ttl=60) == 1
+    now[0] += 2
+    assert prefetcher.result(("timetable",), calls, ttl=60) == 2
+
+
+def test_failed_job_is_run_again():
+    prefetcher = script.Prefetcher(max_workers=1)
+
+    def fail():
+        raise ConnectionError("offline")
+
+    with pytest.raises(ConnectionError):
+        prefetcher.result(("courses",), fail)
+    assert prefetcher.result(("courses",), Calls()) == 1
+
+
+def test_submitted_job_runs_once():
+    prefetcher = script.Prefetcher(max_workers=1)
+    calls = Calls()
+    first = prefetcher.submit(("holidays",), calls)
+    assert prefetcher.submit(("holidays",), calls) is first
+    assert prefetcher.result(("holidays",), calls) == 1
+    assert calls.count == 1
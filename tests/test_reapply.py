@@ -0,0 +1,54 @@
+import pytest
+
+import script
+
+ARGS = ("1", "2022A7PS0001H", "2025-08-04", "2025-08-31")
+
+
+@pytest.fixture
+def grouped(custom, timetable, catalogue, monkeypatch):
+    """Customisation with randomly colored courses, for the fake timetable"""
+    monkeypatch.setattr(script, "get_timetable", lambda timetable_ID: timetable)
+    monkeypatch.setattr(script, "get_course_catalogue", lambda: catalogue)
+    monkeypatch.setattr(script, "get_holiday_list", lambda: [])
+    return {**custom, "course_grouping": 1}
+
+
+def test_reapplying_again_makes_no_calls(service, grouped):
+    script.save_applied(script.initialise(service, *ARGS, custom=dict(grouped)), *ARGS)
+    colors = script.load_applied()["colors"]
+    changed = {**grouped, "reminder": 30}
+    assert script.reapply_customisation(service, dict(changed), script.load_applied())
+    service.calls.clear()
+
+    assert (
+        script.reapply_customisation(service, dict(changed), script.load_applied()) == 0
+    )
+    assert sum(service.calls.values()) == 0
+    assert script.load_applied()["colors"] == colors
+
+
+def test_resumed_run_keeps_the_colors_it_picked(service, grouped, monkeypatch):
+    monkeypatch.setattr(script.random, "choice", lambda l: l[0])
+    journal = script.Journal()
+    script.initialise(service, *ARGS, custom=dict(grouped), journal=journal)
+    params = script.read_journal()[journal.run]["params"]
+    before = {
+        i["id"]: i.get("colorId") for i in service.masters(script.state.calendar_id)
+    }
+    service.calls.clear()
+
+    monkeypatch.setattr(script.random, "choice", lambda l: l[-1])
+    script.initialise(
+        service,
+        *ARGS,
+        custom=params["customisation"],
+        journal=script.Journal(run=journal.run),
+        colors=params["colors"],
+    )
+
+    assert service.calls["insert"] == service.calls["update"] == 0
+    after = {
+        i["id"]: i.get("colorId") for i in service.masters(script.state.calendar_id)
+    }
+    assert after == before
@@ -0,0 +1,101 @@
+import datetime
+
+import script
+
+IST = script.IST
+
+
+def weekly_event(service, recurrence):
+    """Inserts a user's recurring event on Mondays at 9:00, from 2025-08-04"""
+    body = {
+        "summary": "Gym",
+        "colorId": "2",
+        "start": {"dateTime": "2025-08-04T09:00:00+05:30", "timeZone": "Asia/Kolkata"},
+        "end": {"dateTime": "2025-08-04T10:00:00+05:30", "timeZone": "Asia/Kolkata"},
+        "recurrence": recurrence,
+    }
+    return (
+        service.events()
+        .insert(calendarId=script.state.calendar_id, body=body)
+        .execute()
+    )
+
+
+def mondays(service, before="2025-12-31"):
+    return [
+        i["start"]["dateTime"][:10]
+        for i in service.instances(script.state.calendar_id)
+        if i["start"]["dateTime"][:10] < before
+    ]
+
+
+def test_unbounded_series_keeps_occurrences_after_an_interior_range(service):
+    master = weekly_event(service, ["RRULE:FREQ=WEEKLY;BYDAY=MO"])
+    action = script.del_series_in_range(
+        service,
+        master,
+        datetime.datetime(2025, 9, 1, tzinfo=IST),
+        datetime.datetime(2025, 9, 14, 23, 59, 59, tzinfo=IST),
+    )
+    assert action == "excluded"
+    stored = service.stored[script.state.calendar_id][master["id"]]
+    assert stored["recurrence"][0] == "RRULE:FREQ=WEEKLY;BYDAY=MO"
+    days = mondays(service)
+    assert "2025-09-01" not in days and "2025-09-08" not in days
+    assert "2025-08-25" in days and "2025-09-15" in days and "2025-12-29" in days
+
+
+def test_unbounded_series_moves_past_a_range_over_its_start(service):
+    master = weekly_event(service, ["RRULE:FREQ=WEEKLY;BYDAY=MO"])
+    action = script.del_series_in_range(
+        service,
+        master,
+        datetime.datetime(2025, 8, 1, tzinfo=IST),
+        datetime.datetime(2025, 8, 20, tzinfo=IST),
+    )
+    assert action == "moved"
+    days = mondays(service)
+    assert days[0] == "2025-08-25" and "2025-12-29" in days
+
+
+def test_unbounded_series_with_the_next_occurrence_excluded_isnt_moved(service):
+    master = weekly_event(
+        service,
+        ["RRULE:FREQ=WEEKLY;BYDAY=MO", "EXDATE;TZID=Asia/Kolkata:20250818T090000"],
+    )
+    action = script.del_series_in_range(
+        service,
+        master,
+        datetime.datetime(2025, 8, 1, tzinfo=IST),
+        datetime.datetime(2025, 8, 12, tzinfo=IST),
+    )
+    assert action == "excluded"
+    assert mondays(service)[0] == "2025-08-25"
+
+
+def test_bounded_series_is_shortened_at_its_end(service):
+    master = weekly_event(
+        service, ["RRULE:FREQ=WEEKLY;BYDAY=MO;UNTIL=20250930T000000Z"]
+    )
+    action = script.del_series_in_range(
+        service,
+        master,
+        datetime.datetime(2025, 9, 10, tzinfo=IST),
+        datetime.datetime(2025, 10, 10, tzinfo=IST),
+    )
+    assert action == "shortened"
+    assert mondays(service)[-1] == "2025-09-08"
+
+
+def test_instances_are_deleted_from_every_page(service):
+    master = weekly_event(service, ["RRULE:FREQ=WEEKLY;BYDAY=MO;COUNT=8"])
+    service.page_size = 3
+    service.gone.add(f"{master['id']}_20250811T033000Z")
+    deleted = script.del_instances_in_range(
+        service,
+        master,
+        datetime.datetime(2025, 8, 1, tzinfo=IST),
+        datetime.datetime(2025, 9, 30, tzinfo=IST),
+    )
+    assert deleted == 8
+    assert mondays(service) == ["2025-08-11"]
@@ -0,0 +1,73 @@
+import json
+import os
+
+import script
+
+
+def body(summary, day, **fields):
+    return {
+        "summary": summary,
+        "start": {"dateTime": f"{day}T18:00:00+05:30", "timeZone": "Asia/Kolkata"},
+        "end": {"dateTime": f"{day}T19:00:00+05:30", "timeZone": "Asia/Kolkata"},
+        **fields,
+    }
+
+
+def test_reset_keeps_deleted_occurrences_of_foreign_series_deleted(service):
+    calendar_id = script.state.calendar_id
+    master = (
+        service.events()
+        .insert(
+            calendarId=calendar_id,
+            body=body("Gym", "2025-09-01", recurrence=["RRULE:FREQ=DAILY;COUNT=5"]),
+        )
+        .execute()
+    )
+    service.events().delete(
+        calendarId=calendar_id, eventId=f"{master['id']}_20250902T123000Z"
+    ).execute()
+
+    new_id = script.reset_calendar(service, keep_foreign=True)
+
+    days = [i["start"]["dateTime"][:10] for i in service.instances(new_id)]
+    assert days == ["2025-09-01", "2025-09-03", "2025-09-04", "2025-09-05"]
+    assert not os.path.exists(script.FOREIGN_EVENTS_PATH)
+
+
+def test_reset_saves_the_events_it_couldnt_copy(service):
+    service.events().insert(
+        calendarId=script.state.calendar_id, body=body("Dentist", "2025-09-03")
+    ).execute()
+    service.refused.add("Dentist")
+
+    script.reset_calendar(service, keep_foreign=True)
+
+    with open(script.FOREIGN_EVENTS_PATH, "r") as f:
+        assert [i["summary"] for i in json.load(f)] == ["Dentist"]
+
+
+def test_reapply_after_reset_patches_the_new_calendar(
+    service, timetable, catalogue, custom, monkeypatch
+):
+    monkeypatch.setattr(script, "get_timetable", lambda timetable_ID: timetable)
+    monkeypatch.setattr(script, "get_course_catalogue", lambda: catalogue)
+    monkeypatch.setattr(script, "get_holiday_list", lambda: [])
+    args = ("1", "2022A7PS0001H", "2025-08-04", "2025-08-31")
+    script.initialise(service, *args, custom=dict(custom))
+    journal = script.Journal()  # A later run that died before it ended
+    journal.begin({"calendar_id": script.state.calendar_id})
+    journal.close()
+    script.save_applied(custom, *args)
+
+    new_id = script.reset_calendar(service)
+    assert script.read_journal()[journal.run]["status"] == "rolled_back"
+    script.initialise(service, *args, custom=dict(custom))
+    service.calls.clear()
+    recolored = {**custom, "classes_color_ids": {**custom["classes_color_ids"]}}
+    recolored["classes_color_ids"]["Lecture"] = "3"
+    script.reapply_customisation(service, recolored, script.load_applied())
+
+    assert service.calls["patch"] > 0
+    lectures = [i for i in service.masters(new_id) if "Lecture" in i["description"]]
+    assert lectures and all(i["colorId"] == "3" for i in lectures)
+    assert script.load_applied()["calendar_id"] == new_id
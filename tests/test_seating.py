@@ -0,0 +1,77 @@
+import script
+
+EXAMS = [
+    "CS F211|MIDSEM|2025-10-05T04:00:00Z|2025-10-05T05:30:00Z",
+    "MATH F211|MIDSEM|2025-10-06T04:00:00Z|2025-10-06T05:30:00Z",
+]
+STUDENT = "2022A7PS0050H"
+OTHER = "2022A7PS0150H"
+INDEX = [
+    ("CS F211 DATA STRUCTURES", "F102", "2022A7PS0001H to 2022A7PS0100H"),
+    ("CS F211 DATA STRUCTURES", "F105", "2022A7PS0101H to 2022A7PS0200H"),
+    ("MATH F211 PROBABILITY", "G101", "2022A7PS0001H to 2022A7PS0200H"),
+]
+
+
+def add_exam_events(service, rooms):
+    """Inserts the student's midsem exam events, in the rooms given by course"""
+    for i in EXAMS:
+        exam = script.ExamSlot.parse(i)
+        body = {
+            "id": script.exam_event_id(exam.code, exam.type, exam.start),
+            "summary": f"{exam.code} {exam.type}",
+            "location": rooms[exam.code],
+            "start": {"dateTime": exam.start},
+            "end": {"dateTime": exam.end},
+        }
+        service.events().insert(
+            calendarId=script.state.calendar_id, body=body
+        ).execute()
+
+
+def locations(service):
+    return {
+        i["summary"].split(" MIDSEM")[0]: i["location"]
+        for i in service.stored[script.state.calendar_id].values()
+    }
+
+
+def revise(service, old, new):
+    return script.revise_exam_rooms(service, old, new, EXAMS, STUDENT, "midsem")
+
+
+def test_unchanged_index_patches_nothing(service):
+    add_exam_events(service, {"CS F211": "F102", "MATH F211": "G101"})
+    assert revise(service, INDEX, list(INDEX)) == {}
+    assert service.calls["patch"] == 0
+
+
+def test_changed_room_is_patched(service):
+    add_exam_events(service, {"CS F211": "F102", "MATH F211": "G101"})
+    new = [("CS F211 DATA STRUCTURES", "F201", INDEX[0][2])] + INDEX[1:]
+    assert revise(service, INDEX, new) == {"CS F211": ("F102", "F201")}
+    assert service.calls["patch"] == 1
+    assert locations(service) == {"CS F211": "F201", "MATH F211": "G101"}
+
+
+def test_another_students_room_isnt_patched(service):
+    add_exam_events(service, {"CS F211": "F102", "MATH F211": "G101"})
+    new = INDEX[:1] + [("CS F211 DATA STRUCTURES", "F301", INDEX[1][2])] + INDEX[2:]
+    assert revise(service, INDEX, new) == {}
+    assert service.calls["patch"] == 0
+
+
+def test_removed_exam_has_its_room_cleared(service):
+    add_exam_events(service, {"CS F211": "F102", "MATH F211": "G101"})
+    assert revise(service, INDEX, INDEX[:2]) == {"MATH F211": ("G101", None)}
+    assert locations(service) == {"CS F211": "F102", "MATH F211": ""}
+
+
+def test_index_is_saved_per_student(service):
+    script.save_seating_index("midsem", STUDENT, "seating.pdf", INDEX)
+    assert script.load_seating_index("midsem", STUDENT) == [INDEX[0], INDEX[2]]
+    assert script.load_seating_index("midsem", OTHER) is None
+    assert script.load_seating_index("compre", STUDENT) is None
+    script.save_seating_index("midsem", OTHER, "seating.pdf", INDEX)
+    assert script.load_seating_index("midsem", OTHER) == [INDEX[1], INDEX[2]]
+    assert script.load_seating_index("midsem", STUDENT) == [INDEX[0], INDEX[2]]
@@ -0,0 +1,32 @@
+import time
+
+import script
+
+
+def test_each_job_starts_with_a_fresh_run_state(monkeypatch):
+    seen = []
+
+    def run_service_job(request):
+        seen.append((script.state.calendar_id, dict(script.state.in_timetable)))
+        script.state.calendar_id = request["student_ID"]
+        script.state.in_timetable[(request["student_ID"], "CS F211", None)] = True
+
+    monkeypatch.setattr(script, "run_service_job", run_service_job)
+    queue = script.JobQueue(workers=1)
+    jobs = [
+        queue.submit(
+            {
+                "action": "import",
+                "student_ID": student_ID,
+                "timetable_ID": "1",
+                "start_date": "2025-08-04",
+                "end_date": "2025-11-28",
+            }
+        )
+        for student_ID in ("2022A7PS0001H", "2022A7PS0002H")
+    ]
+    while any(queue.get(i["id"])["status"] not in ("done", "failed") for i in jobs):
+        time.sleep(0.01)
+
+    assert [queue.get(i["id"])["status"] for i in jobs] == ["done", "done"]
+    assert seen == [(None, {}), (None, {})]
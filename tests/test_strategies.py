@@ -0,0 +1,65 @@
+import pytest
+
+import script
+from fake_calendar import FakeService
+
+
+def calendar_after(strategy, timetable, catalogue, custom, monkeypatch):
+    """Adds the timetable to a new calendar with a strategy, and gets the events it ends with"""
+    monkeypatch.setattr(script, "state", script.RunState())
+    service = FakeService()
+    script.state.calendar_id = service.add_calendar()
+    script.initialise(
+        service,
+        "1",
+        "2022A7PS0001H",
+        "2025-08-04",
+        "2025-11-28",
+        custom=dict(custom),
+        strategy=strategy,
+    )
+    return sorted(
+        (i["id"], i["summary"], i["start"]["dateTime"], i.get("colorId"))
+        for i in service.instances(script.state.calendar_id)
+    )
+
+
+def test_every_strategy_makes_the_same_calendar(
+    service, timetable, catalogue, custom, monkeypatch
+):
+    monkeypatch.setattr(script, "get_timetable", lambda timetable_ID: timetable)
+    monkeypatch.setattr(script, "get_course_catalogue", lambda: catalogue)
+    monkeypatch.setattr(
+        script, "get_holiday_list", lambda: ["2025-08-15", "2025-10-02"]
+    )
+    calendars = {
+        i: calendar_after(i, timetable, catalogue, custom, monkeypatch)
+        for i in script.STRATEGIES
+    }
+    serial = calendars.pop("serial")
+    days = {i[2][:10] for i in serial}
+    assert days and "2025-08-15" not in days and "2025-10-02" not in days
+    assert all(i == serial for i in calendars.values())
+
+
+def plan(inserts, patches, deletes):
+    return {
+        "inserts": inserts,
+        "patches": patches,
+        "deletes": deletes,
+        "phases": [inserts, patches, deletes],
+    }
+
+
+def test_exdate_is_picked_when_it_saves_many_requests():
+    assert script.choose_strategy(plan(20, 20, 60)) == "exdate"
+
+
+@pytest.mark.parametrize("changes", [plan(4, 2, 0), plan(30, 10, 5)])
+def test_a_faster_strategy_is_picked_when_exdate_saves_little(changes):
+    assert script.choose_strategy(changes) in ("batched", "parallel")
+
+
+def test_budget_is_enforced():
+    with pytest.raises(script.BudgetExceeded):
+        script.choose_strategy(plan(20, 20, 60), "serial", budget=50)
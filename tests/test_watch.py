@@ -0,0 +1,90 @@
+import datetime
+import json
+import time
+
+import pytest
+
+import script
+
+
+class Stop(Exception):
+    pass
+
+
+class Clock:
+    """Stands in for the time module, so that the scheduler's polls run without waiting"""
+
+    def __init__(self, until):
+        self.now, self.until = 0, until
+
+    def time(self):
+        return self.now
+
+    def sleep(self, seconds):
+        if self.now + seconds > self.until:
+            raise Stop
+        self.now += seconds
+
+    def __getattr__(self, name):
+        return getattr(time, name)
+
+
+class Response:
+    def __init__(self, body):
+        self.body = body
+
+    def json(self):
+        return self.body
+
+
+def test_watch_resyncs_a_changed_course(
+    service, timetable, catalogue, custom, monkeypatch
+):
+    changed = json.loads(json.dumps(timetable))
+    changed["sections"][1]["roomTime"] = ["MATH F211:G101:F:4"]
+    polls = iter([Response(timetable), Response(changed)])
+
+    def conditional_get(url, validators, stream=False):
+        return None if url.endswith("/course") else next(polls)
+
+    monkeypatch.setattr(script, "conditional_get", conditional_get)
+    monkeypatch.setattr(script, "get_course_catalogue", lambda: catalogue)
+    monkeypatch.setattr(script, "api_build", lambda *args, **kwargs: service)
+    monkeypatch.setattr(script, "auth", lambda token_path: None)
+    monkeypatch.setattr(script, "get_holiday_list", lambda: [])
+    monkeypatch.setattr(script, "time", Clock(until=90))
+    with open("customisation.json", "w") as f:
+        json.dump(custom, f)
+    with open("watch.json", "w") as f:
+        json.dump(
+            {
+                "interval": 60,
+                "timetables": [
+                    {
+                        "timetable_ID": "1",
+                        "student_ID": "2022A7PS0001H",
+                        "start_date": "2025-08-04",
+                        "end_date": "2025-11-28",
+                    }
+                ],
+            },
+            f,
+        )
+
+    with pytest.raises(Stop):
+        script.watch("watch.json")
+
+    with open("watch_state.json", "r") as f:
+        watched = json.load(f)["1:2022A7PS0001H"]
+    assert "MATH F211" in watched["events"]
+    weekdays = {
+        datetime.datetime.fromisoformat(i["start"]["dateTime"]).weekday()
+        for i in service.instances(script.state.calendar_id)
+        if "MATH F211" in i["summary"]
+    }
+    assert weekdays == {4}
+    # Only the course that changed is synced, the rest are assumed to be in the calendar already
+    assert not any(
+        "CS F211" in i.get("summary", "")
+        for i in service.stored[script.state.calendar_id].values()
+    )